@@ -0,0 +1,40 @@
+from django.http import HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from rest_framework import status
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated
+from rest_framework.renderers import JSONRenderer
+
+from users.authentication import CachedTokenAuthentication
+
+
+class AsyncAPIView(View):
+    """Base of the async (ASGI) views, rendering responses and errors like DRF views."""
+
+    authentication_class = CachedTokenAuthentication
+    renderer_class = JSONRenderer
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        """
+        Exempt the view from CSRF checks like DRF's `APIView.as_view`. Requests are
+        authenticated with tokens, never with session cookies.
+        """
+
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def render(self, data, status_code: int = status.HTTP_200_OK) -> HttpResponse:
+        renderer = self.renderer_class()
+        return HttpResponse(
+            renderer.render(data), content_type=renderer.media_type, status=status_code
+        )
+
+    def handle_exception(self, exc: APIException) -> HttpResponse:
+        """Render API errors like DRF's default exception handler."""
+
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+        response: HttpResponse = self.render(data, exc.status_code)
+        if isinstance(exc, (AuthenticationFailed, NotAuthenticated)):
+            response["WWW-Authenticate"] = self.authentication_class().authenticate_header(None)
+        return response
@@ -0,0 +1,7 @@
+from django.db.backends.postgresql import base
+
+from app.backends.pooling import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    """PostgreSQL backend with pooled connections, see `PooledDatabaseWrapperMixin`."""
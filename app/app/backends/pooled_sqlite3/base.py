@@ -0,0 +1,7 @@
+from django.db.backends.sqlite3 import base
+
+from app.backends.pooling import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    """SQLite backend with pooled connections, see `PooledDatabaseWrapperMixin`."""
@@ -0,0 +1,200 @@
+import functools
+import threading
+import time
+from collections.abc import Callable
+
+from django.db.utils import OperationalError
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class ConnectionPool:
+    """
+    Thread safe pool of at most `max_size` DB-API connections, shared by the threads of a
+    process. Idle connections are reused most recently released first, so connections
+    left idle the longest can time out on the server without being handed out.
+
+    Connections open for more than `max_lifetime` seconds (if set) are closed instead of
+    being reused, so they are renewed periodically, e.g. to rebalance them once a database
+    behind a load balancer or failover address changed.
+    """
+
+    def __init__(self, max_size: int, timeout: float, max_lifetime: float | None = None):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.condition = threading.Condition()
+        self.idle: list = []
+        # Open connections, idle or in use
+        self.size: int = 0
+        # Time each open connection was opened at, by `id()`
+        self.opened_at: dict[int, float] = {}
+        self.closed: bool = False
+
+    def is_expired(self, connection) -> bool:
+        opened_at: float | None = self.opened_at.get(id(connection))
+        return (
+            self.max_lifetime is not None
+            and opened_at is not None
+            and time.monotonic() - opened_at > self.max_lifetime
+        )
+
+    def acquire(self, connect: Callable) -> tuple[object, bool]:
+        """
+        Return an idle connection, or one opened with `connect` while the pool is not
+        full, and whether it is reused. Waits up to `timeout` seconds for a connection to
+        be released when all of them are in use.
+        """
+
+        deadline: float = time.monotonic() + self.timeout
+        expired: list = []
+        try:
+            with self.condition:
+                while True:
+                    while not self.idle and self.size >= self.max_size:
+                        remaining: float = deadline - time.monotonic()
+                        if remaining <= 0 or not self.condition.wait(remaining):
+                            raise PoolTimeout(
+                                "No database connection was released within "
+                                f"{self.timeout} seconds, all {self.max_size} are in use."
+                            )
+                    if not self.idle:
+                        self.size += 1
+                        break
+                    connection = self.idle.pop()
+                    if not self.is_expired(connection):
+                        return connection, True
+                    self.size -= 1
+                    self.opened_at.pop(id(connection), None)
+                    expired.append(connection)
+        finally:
+            for connection in expired:
+                close_quietly(connection)
+
+        try:
+            connection = connect()
+        except BaseException:
+            self.forget()
+            raise
+        with self.condition:
+            self.opened_at[id(connection)] = time.monotonic()
+        return connection, False
+
+    def release(self, connection) -> None:
+        """
+        Return the connection to the pool, rolling back any transaction left open. Once the
+        pool is closed, or the connection expired, it is closed instead.
+        """
+
+        try:
+            connection.rollback()
+        except Exception:
+            self.discard(connection)
+            return
+        with self.condition:
+            if not self.closed and not self.is_expired(connection):
+                self.idle.append(connection)
+                self.condition.notify()
+                return
+        self.discard(connection)
+
+    def discard(self, connection) -> None:
+        """Close a broken or expired connection and make room for a new one."""
+
+        close_quietly(connection)
+        self.forget(connection)
+
+    def forget(self, connection=None) -> None:
+        with self.condition:
+            self.size -= 1
+            self.opened_at.pop(id(connection), None)
+            self.condition.notify()
+
+    def close(self) -> None:
+        """Close the idle connections. Connections in use are closed once released."""
+
+        with self.condition:
+            self.closed = True
+            idle, self.idle = self.idle, []
+            self.size -= len(idle)
+            for connection in idle:
+                self.opened_at.pop(id(connection), None)
+        for connection in idle:
+            connection.close()
+
+
+def close_quietly(connection) -> None:
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+pools: dict[str, ConnectionPool] = {}
+pools_lock = threading.Lock()
+
+
+def get_pool(alias: str, settings_dict: dict) -> ConnectionPool:
+    with pools_lock:
+        pool: ConnectionPool | None = pools.get(alias)
+        if pool is None:
+            options: dict = settings_dict.get("POOL", {})
+            pool = pools[alias] = ConnectionPool(
+                max_size=options.get("SIZE", 10),
+                timeout=options.get("TIMEOUT", 10),
+                max_lifetime=options.get("MAX_LIFETIME"),
+            )
+        return pool
+
+
+def close_pools() -> None:
+    """Close and forget all the pools, e.g. after their settings changed."""
+
+    with pools_lock:
+        for pool in pools.values():
+            pool.close()
+        pools.clear()
+
+
+def is_connection_usable(connection) -> bool:
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT 1")
+        cursor.close()
+    except Exception:
+        return False
+    return True
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Take connections from the `ConnectionPool` of the database alias instead of opening
+    them, and release them to the pool instead of closing them. Django still closes
+    connections at the end of requests according to `CONN_MAX_AGE`, which with a pool only
+    returns them for other threads to reuse. With `CONN_HEALTH_CHECKS`, reused connections
+    are checked before they are handed out.
+
+    The `POOL` entry of the database settings holds the `SIZE` of the pool, the `TIMEOUT`
+    in seconds to wait for a connection when all of them are in use and the optional
+    `MAX_LIFETIME` in seconds of the connections.
+    """
+
+    def get_new_connection(self, conn_params: dict):
+        # Connections are released to the pool they came from, even if it was closed since
+        self.pool: ConnectionPool = get_pool(self.alias, self.settings_dict)
+        connect: Callable = functools.partial(super().get_new_connection, conn_params)
+        while True:
+            connection, reused = self.pool.acquire(connect)
+            if (
+                not reused
+                or not self.settings_dict["CONN_HEALTH_CHECKS"]
+                or is_connection_usable(connection)
+            ):
+                return connection
+            self.pool.discard(connection)
+
+    def _close(self) -> None:
+        if self.connection is not None:
+            self.pool.release(self.connection)
@@ -0,0 +1,95 @@
+import os
+from collections.abc import Mapping
+
+from django.core.exceptions import ImproperlyConfigured
+
+ENGINES = {
+    "sqlite3": "django.db.backends.sqlite3",
+    "postgresql": "django.db.backends.postgresql",
+}
+# Cache backends keeping their entries in the memory of each process
+LOCAL_CACHE_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+POOLED_ENGINES = {
+    "django.db.backends.sqlite3": "app.backends.pooled_sqlite3",
+    "django.db.backends.postgresql": "app.backends.pooled_postgresql",
+}
+
+
+def get_database_settings(
+    prefix: str, default_name: str | os.PathLike, environ: Mapping[str, str] = os.environ
+) -> dict:
+    """
+    Build a `DATABASES` entry from the environment variables starting with `prefix`:
+
+    - `ENGINE`: "sqlite3" (default), "postgresql" or the path of a database backend.
+    - `NAME`, `USER`, `PASSWORD`, `HOST`, `PORT`: the connection parameters.
+    - `CONN_MAX_AGE`: seconds to keep connections open between requests, "none" to keep
+      them open for good. Defaults to 0, which closes them at the end of each request.
+    - `CONN_HEALTH_CHECKS`: check persistent or pooled connections before reusing them.
+    - `POOL_SIZE`: switches to the pooled backend of the engine with at most this many
+      connections per process, see `app/backends/pooling.py`.
+    - `POOL_TIMEOUT`: seconds to wait for a pooled connection when all are in use.
+    - `POOL_MAX_LIFETIME`: seconds after which pooled connections are closed rather than
+      reused, 0 to keep them for good. Defaults to an hour.
+    """
+
+    def get(name: str, default: str = "") -> str:
+        return environ.get(f"{prefix}{name}", default)
+
+    def get_number(name: str, default: str, type_: type = int):
+        try:
+            value = type_(get(name, default))
+        except ValueError:
+            raise ImproperlyConfigured(f"{prefix}{name} must be a number.")
+        if value < 0:
+            raise ImproperlyConfigured(f"{prefix}{name} must not be negative.")
+        return value
+
+    engine: str = ENGINES.get(get("ENGINE", "sqlite3"), get("ENGINE", "sqlite3"))
+    database: dict = {
+        "ENGINE": engine,
+        "NAME": get("NAME") or default_name,
+        "USER": get("USER"),
+        "PASSWORD": get("PASSWORD"),
+        "HOST": get("HOST"),
+        "PORT": get("PORT"),
+        "CONN_MAX_AGE": (
+            None if get("CONN_MAX_AGE").lower() == "none" else get_number("CONN_MAX_AGE", "0")
+        ),
+        "CONN_HEALTH_CHECKS": get("CONN_HEALTH_CHECKS").lower() in ("1", "true", "yes"),
+    }
+
+    pool_size: int = get_number("POOL_SIZE", "0")
+    if pool_size:
+        if engine not in POOLED_ENGINES:
+            raise ImproperlyConfigured(f"{engine} has no pooled backend.")
+        database["ENGINE"] = POOLED_ENGINES[engine]
+        database["POOL"] = {
+            "SIZE": pool_size,
+            "TIMEOUT": get_number("POOL_TIMEOUT", "10", float),
+            "MAX_LIFETIME": get_number("POOL_MAX_LIFETIME", "3600", float) or None,
+        }
+    return database
+
+
+def check_replica_settings(
+    replicas: list[str], caches: Mapping[str, dict], pin_cache_alias: str
+) -> None:
+    """
+    Replica reads need the primary pins of the users who just wrote to be seen by every
+    process, so `pin_cache_alias` must be a cache shared by all of them when replicas are
+    configured, see `app/routers.py`.
+    """
+
+    if not replicas:
+        return
+    if pin_cache_alias not in caches:
+        raise ImproperlyConfigured(f"DATABASE_REPLICA_PIN_CACHE_ALIAS: no {pin_cache_alias} cache.")
+    if caches[pin_cache_alias]["BACKEND"] in LOCAL_CACHE_BACKENDS:
+        raise ImproperlyConfigured(
+            f"DATABASE_REPLICA_PIN_CACHE_ALIAS: the {pin_cache_alias} cache is local to each "
+            "process, DATABASE_REPLICAS need a cache shared by all of them, e.g. Redis."
+        )
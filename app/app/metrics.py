@@ -0,0 +1,284 @@
+import contextlib
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpRequest, HttpResponse
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from rest_framework import serializers
+from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+class RequestMetrics:
+    """
+    SQL queries and time spent by a single request. Queries made by serializers, e.g. to
+    fetch tags, count towards both the database and the serializer time.
+    """
+
+    def __init__(self):
+        self.queries: int = 0
+        self.db_time: float = 0.0
+        self.serializer_time: float = 0.0
+        self.total_time: float = 0.0
+
+    def record_query(self, execute: Callable, sql, params, many: bool, context: dict):
+        """`execute_wrapper` of the database connections."""
+
+        start: float = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+    def get_server_timing(self) -> str:
+        return (
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries", '
+            f"serializer;dur={self.serializer_time * 1000:.1f}, "
+            f"total;dur={self.total_time * 1000:.1f}"
+        )
+
+
+current_request_metrics: ContextVar[RequestMetrics | None] = ContextVar(
+    "current_request_metrics", default=None
+)
+
+
+@contextlib.contextmanager
+def serializer_timer() -> Iterator[None]:
+    """Add the time spent in the block to the serializer time of the current request."""
+
+    metrics: RequestMetrics | None = current_request_metrics.get()
+    if metrics is None:
+        yield
+        return
+
+    start: float = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_time += time.perf_counter() - start
+
+
+class TimedSerializerMixin:
+    """Record the time spent computing `.data` as serializer time of the request."""
+
+    @property
+    def data(self):
+        with serializer_timer():
+            return super().data
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
+
+
+class Histogram:
+    """Prometheus style histogram with fixed buckets."""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        # The last count is the `+Inf` bucket
+        self.counts: list[int] = [0] * (len(buckets) + 1)
+        self.sum: float = 0
+        self.count: int = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Histograms of the request metrics per view, aggregated in the memory of the process.
+    Each request costs a few additions under a lock, so it can stay enabled in production.
+    """
+
+    duration_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    query_buckets = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+    metrics = {
+        # name: (help, buckets, RequestMetrics attribute)
+        "http_request_duration_seconds": (
+            "Total time of the request.", duration_buckets, "total_time",
+        ),
+        "http_request_db_duration_seconds": (
+            "Time spent executing SQL queries.", duration_buckets, "db_time",
+        ),
+        "http_request_serializer_duration_seconds": (
+            "Time spent in serializers.", duration_buckets, "serializer_time",
+        ),
+        "http_request_db_queries": (
+            "Number of SQL queries.", query_buckets, "queries",
+        ),
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms: dict[tuple[str, str], Histogram] = {}
+
+    def observe(self, view: str, request_metrics: RequestMetrics) -> None:
+        with self.lock:
+            for name, (_, buckets, attribute) in self.metrics.items():
+                histogram: Histogram | None = self.histograms.get((name, view))
+                if histogram is None:
+                    histogram = self.histograms[(name, view)] = Histogram(buckets)
+                histogram.observe(getattr(request_metrics, attribute))
+
+    def clear(self) -> None:
+        with self.lock:
+            self.histograms.clear()
+
+    def render_prometheus(self) -> str:
+        """Render all the histograms in the Prometheus text exposition format."""
+
+        lines: list[str] = []
+        with self.lock:
+            for name, (description, buckets, _) in self.metrics.items():
+                lines += [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+                for (metric_name, view), histogram in sorted(self.histograms.items()):
+                    if metric_name != name:
+                        continue
+                    label: str = f'view="{view}"'
+                    cumulative: int = 0
+                    for bound, count in zip(buckets + ("+Inf",), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{label},le="{bound}"}} {cumulative}')
+                    lines.append(f"{name}_sum{{{label}}} {histogram.sum}")
+                    lines.append(f"{name}_count{{{label}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def get_view_name(request: HttpRequest) -> str:
+    """
+    Name requests by view and viewset action, e.g. `NoteViewSet.list`. Unresolved URLs
+    share a single name, so the number of histograms stays bounded.
+    """
+
+    match = request.resolver_match
+    if match is None:
+        return "unresolved"
+
+    view_class = getattr(match.func, "cls", None) or getattr(match.func, "view_class", None)
+    if view_class is None:
+        return match.view_name
+    action: str | None = (getattr(match.func, "actions", None) or {}).get(
+        request.method.lower()
+    )
+    return f"{view_class.__name__}.{action}" if action else view_class.__name__
+
+
+def record_current_query(execute: Callable, sql, params, many: bool, context: dict):
+    """`execute_wrapper` of the database connections, see `install_query_recorder`."""
+
+    metrics: RequestMetrics | None = current_request_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics.record_query(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection) -> None:
+    """
+    Record the queries of a connection in the metrics of the request running them. The
+    wrapper stays installed, as async requests run their queries in other threads, on
+    connections of their own. It goes first so it is never removed by the `pop()` of
+    `execute_wrapper()` blocks.
+    """
+
+    if record_current_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_current_query)
+
+
+@receiver(connection_created)
+def install_connection_query_recorder(sender, connection, **kwargs) -> None:
+    install_query_recorder(connection)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record the SQL query count, database time, serializer time and total time of every
+    request, aggregate them per view in `registry` and, if
+    `REQUEST_METRICS_SERVER_TIMING` is enabled, return them in a `Server-Timing` header.
+    It supports both sync and async requests.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable):
+        self.get_response = get_response
+        self.async_mode: bool = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.async_mode:
+            return self.__acall__(request)
+
+        # Connections opened before this module was imported did not get the recorder
+        for connection in connections.all():
+            install_query_recorder(connection)
+        with self.record(request) as request_metrics:
+            response: HttpResponse = self.get_response(request)
+        return self.process_response(request, request_metrics, response)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        with self.record(request) as request_metrics:
+            response: HttpResponse = await self.get_response(request)
+        return self.process_response(request, request_metrics, response)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def record(request: HttpRequest) -> Iterator[RequestMetrics]:
+        request_metrics = RequestMetrics()
+        token = current_request_metrics.set(request_metrics)
+        start: float = time.perf_counter()
+        try:
+            yield request_metrics
+        finally:
+            current_request_metrics.reset(token)
+        request_metrics.total_time = time.perf_counter() - start
+
+    @staticmethod
+    def process_response(
+        request: HttpRequest, request_metrics: RequestMetrics, response: HttpResponse
+    ) -> HttpResponse:
+        registry.observe(get_view_name(request), request_metrics)
+        if settings.REQUEST_METRICS_SERVER_TIMING:
+            response["Server-Timing"] = request_metrics.get_server_timing()
+        return response
+
+
+class PrometheusRenderer(BaseRenderer):
+    media_type = "text/plain"
+    format = "prometheus"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        # Errors, e.g. of the permission checks, are rendered as their detail message
+        if isinstance(data, dict):
+            data = f"{data.get('detail', data)}\n"
+        return data.encode(self.charset)
+
+
+class MetricsView(APIView):
+    """Request metrics of this process per view, in the Prometheus text format."""
+
+    permission_classes = [IsAdminUser]
+    renderer_classes = [PrometheusRenderer]
+
+    def get(self, request) -> Response:
+        return Response(registry.render_prometheus())
@@ -0,0 +1,96 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.db import DEFAULT_DB_ALIAS
+
+from rest_framework.permissions import SAFE_METHODS
+
+# Whether reads of the routed models may use a replica, set per request by `ReplicaReadMixin`
+replica_reads: ContextVar[bool] = ContextVar("replica_reads", default=False)
+
+
+def get_pin_cache() -> BaseCache:
+    return caches[settings.DATABASE_REPLICA_PIN_CACHE_ALIAS]
+
+
+def get_pin_key(user_id: int) -> str:
+    return f"primary-pin:{user_id}"
+
+
+def pin_to_primary(user_id: int) -> None:
+    """Read from the primary for the next `DATABASE_REPLICA_PIN_SECONDS` for this user."""
+
+    get_pin_cache().set(get_pin_key(user_id), True, settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user_id: int) -> bool:
+    return get_pin_cache().get(get_pin_key(user_id), False)
+
+
+class PrimaryReplicaRouter:
+    """
+    Send reads of the `route_app_labels` models to one of the `DATABASE_REPLICAS` aliases,
+    picked at random, while `replica_reads` is set, and otherwise to the primary `default`
+    database. Their writes always go to the primary, also for instances loaded from a
+    replica. Other models are left to Django's default routing.
+    """
+
+    route_app_labels = {"notes"}
+
+    def db_for_read(self, model, **hints) -> str | None:
+        if model._meta.app_label not in self.route_app_labels:
+            return None
+        if replica_reads.get() and settings.DATABASE_REPLICAS:
+            return random.choice(settings.DATABASE_REPLICAS)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints) -> str | None:
+        if model._meta.app_label not in self.route_app_labels:
+            return None
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool | None:
+        """Replicas hold the same rows as the primary, so relations may span them."""
+
+        databases: set[str] = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    Read from a replica for safe requests, see `PrimaryReplicaRouter`. Users who changed
+    anything in the last `DATABASE_REPLICA_PIN_SECONDS` read from the primary, so they
+    always see their own writes even while the replicas lag behind.
+
+    The `primary_read_actions` always read from the primary, e.g. when reading rows a
+    replica has not received yet would be missed for good rather than just late.
+    """
+
+    primary_read_actions: tuple[str, ...] = ()
+
+    def initial(self, request, *args, **kwargs) -> None:
+        super().initial(request, *args, **kwargs)
+        # Authentication ran in `initial`, pinning depends on the user
+        use_replica: bool = (
+            request.method in SAFE_METHODS
+            and getattr(self, "action", None) not in self.primary_read_actions
+            and not (request.user.is_authenticated and is_pinned_to_primary(request.user.id))
+        )
+        self.replica_reads_token = replica_reads.set(use_replica)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "replica_reads_token", None)
+        if token is not None:
+            replica_reads.reset(token)
+            self.replica_reads_token = None
+        if (
+            request.method not in SAFE_METHODS
+            and request.user.is_authenticated
+            and response.status_code < 400
+        ):
+            pin_to_primary(request.user.id)
+        return super().finalize_response(request, response, *args, **kwargs)
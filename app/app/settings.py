@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from app.database import check_replica_settings, get_database_settings
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -49,6 +52,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "app.metrics.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -82,17 +86,59 @@ WSGI_APPLICATION = "app.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# Configured by the DATABASE_* and DATABASE_REPLICA_* environment variables, e.g.
+# DATABASE_ENGINE=postgresql, DATABASE_CONN_MAX_AGE=60 or DATABASE_POOL_SIZE=20, see
+# `app/database.py`. Both default to SQLite files.
 DATABASES = {
+    "default": get_database_settings("DATABASE_", BASE_DIR / "db.sqlite3"),
+    # Stands in for a read replica of "default" locally, e.g. a copy of db.sqlite3. It is only
+    # read from once listed in DATABASE_REPLICAS.
+    "replica": get_database_settings("DATABASE_REPLICA_", BASE_DIR / "db.replica.sqlite3"),
+}
+
+# Safe requests of the notes API read from one of the DATABASE_REPLICAS, see
+# `app/routers.py`. Users who wrote in the last DATABASE_REPLICA_PIN_SECONDS read from
+# "default", which should exceed the replication lag. The pins are kept in the
+# DATABASE_REPLICA_PIN_CACHE_ALIAS cache, which must be shared by all the processes (e.g.
+# Redis or Memcached): with the per-process local-memory cache, a write would only pin the
+# reads served by the same process, so it is rejected once DATABASE_REPLICAS are set.
+DATABASE_ROUTERS = ["app.routers.PrimaryReplicaRouter"]
+DATABASE_REPLICAS: list[str] = [
+    alias for alias in os.environ.get("DATABASE_REPLICAS", "").split(",") if alias
+]
+DATABASE_REPLICA_PIN_SECONDS = 5
+DATABASE_REPLICA_PIN_CACHE_ALIAS = "default"
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# The local-memory backend evicts the least recently used entries once MAX_ENTRIES is
+# reached. When switching to Redis, configure `maxmemory-policy allkeys-lru` instead.
+
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {
+            "MAX_ENTRIES": 10000,
+        },
     }
 }
 
+check_replica_settings(DATABASE_REPLICAS, CACHES, DATABASE_REPLICA_PIN_CACHE_ALIAS)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
+# The first hasher hashes new passwords, the others still verify existing hashes. Hashing
+# runs in at most PASSWORD_HASHING_MAX_WORKERS threads, see `users/hashing.py`.
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+PASSWORD_HASHING_MAX_WORKERS = os.cpu_count() or 1
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -144,8 +190,49 @@ REST_FRAMEWORK = {
         "rest_framework.renderers.JSONRenderer",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework.authentication.TokenAuthentication",
+        "users.authentication.CachedTokenAuthentication",
     ),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20
 }
+
+# Full text search backend for notes, see `notes/search.py`.
+# Use "notes.search.PostgresSearchBackend" with a PostgreSQL database.
+NOTES_SEARCH_BACKEND = "notes.search.SQLiteSearchBackend"
+
+# Cache alias and timeout (in seconds) of the cached notes list responses.
+NOTES_CACHE_ALIAS = "default"
+NOTES_CACHE_TIMEOUT = 300
+
+# Note bodies of at least NOTES_BODY_COMPRESSION_MIN_LENGTH bytes are stored zlib compressed
+# on SQLite, see `notes/fields.py`. None stores them uncompressed. Notes lists return the first
+# NOTES_EXCERPT_LENGTH characters of the bodies unless `?fields=body` is requested.
+NOTES_BODY_COMPRESSION_MIN_LENGTH = None
+NOTES_EXCERPT_LENGTH = 200
+
+# Soft deleted notes are purged after NOTES_PURGE_RETENTION_DAYS days, see `notes/retention.py`
+NOTES_PURGE_RETENTION_DAYS = 30
+NOTES_PURGE_BATCH_SIZE = 1000
+
+# The notes sync feed only returns changes older than NOTES_SYNC_SETTLE_SECONDS seconds, so
+# transactions still in flight with an earlier `last_modified_at` are not skipped by cursors.
+# `last_modified_at` is stamped when a note is written, not when the transaction commits, so
+# the window must exceed the longest transaction writing notes: bulk requests (up to 100
+# operations), import batches, bulk deletes and restores, tag renames. Changes committed
+# later than that after being stamped can be skipped by a cursor.
+NOTES_SYNC_SETTLE_SECONDS = 10
+
+# Token authentication lookup cache, see `users/authentication.py`. Lookups are cached per
+# process for up to AUTH_TOKEN_CACHE_TIMEOUT seconds, which bounds how long other processes
+# may still accept a deleted token. Set AUTH_TOKEN_CACHE_ALIAS to also share lookups between
+# processes through a Django cache, which is invalidated for all of them: the per-process
+# entries then only live AUTH_TOKEN_CACHE_LOCAL_TIMEOUT seconds in front of it.
+AUTH_TOKEN_CACHE_TIMEOUT = 60
+AUTH_TOKEN_CACHE_MAX_ENTRIES = 10000
+AUTH_TOKEN_CACHE_ALIAS = None
+AUTH_TOKEN_CACHE_LOCAL_TIMEOUT = 1
+
+# Request metrics, see `app/metrics.py`. They are aggregated per view and served to admin
+# users at /metrics/. Enable REQUEST_METRICS_SERVER_TIMING to also send the timings of each
+# request to clients in a `Server-Timing` header, which exposes server internals to them.
+REQUEST_METRICS_SERVER_TIMING = False
@@ -0,0 +1,100 @@
+from collections.abc import Callable, Iterable
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+from rest_framework.test import APIClient
+
+# Maximum number of SQL queries of a single request, per endpoint (method and URL name).
+# Every request of the API tests is checked against it by `QueryBudgetAPIClient`, so it is
+# the upper bound for the worst case: a cold token cache, several filters, tags to create
+# or remove, etc. Budgets must not depend on the amount of data, which
+# `QueryBudgetMixin.assertConstantQueries` checks for the main endpoints.
+QUERY_BUDGETS: dict[tuple[str, str], int] = {
+    # Auth, count, notes, tags
+    ("GET", "notes:notes-list"): 4,
+    # Auth, savepoint, insert, tag resolution (3), link diff and insert (4), release, tags
+    ("POST", "notes:notes-list"): 12,
+    # Auth, ETag, note, tags
+    ("GET", "notes:notes-detail"): 4,
+    # Auth, savepoint, locked note and tags (2), savepoint, update, tag resolution (3), link
+    # diff with removals and additions (7), release, tags, release
+    ("PUT", "notes:notes-detail"): 19,
+    ("PATCH", "notes:notes-detail"): 19,
+    # Auth, savepoint, locked note and tags (2), soft delete, tag counts (2), release
+    ("DELETE", "notes:notes-detail"): 8,
+    # Auth, notes, savepoint, insert, update, soft delete (4), tag resolution and link
+    # diff (9), release, saved notes with tags (2)
+    ("POST", "notes:notes-bulk"): 20,
+    # Auth, streamed notes, tags of each chunk of `export_chunk_size` notes (a single chunk
+    # in the tests)
+    ("GET", "notes:notes-export"): 3,
+    # Auth, savepoint, matching notes, update, tag counts (2), release
+    ("POST", "notes:notes-bulk-delete"): 7,
+    ("POST", "notes:notes-bulk-restore"): 7,
+    # Auth, changes, tags
+    ("GET", "notes:notes-sync"): 3,
+    # Auth, import, one batch (10), completion
+    ("POST", "notes:notes-import"): 13,
+    # Auth, tags
+    ("GET", "notes:tags-list"): 2,
+    # Savepoint, insert, release. Duplicate usernames fail the insert: savepoint, insert,
+    # rollback, release, username check
+    ("POST", "users:register"): 5,
+    # User, token, savepoint, token insert, release
+    ("POST", "users:token"): 5,
+}
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryBudgetAPIClient(APIClient):
+    """
+    `APIClient` failing any request that runs more queries than the `QUERY_BUDGETS` of its
+    endpoint, or that has no budget. The query count is set on responses as `queries`.
+
+    Streaming responses are consumed right away, so the queries run while streaming count
+    too. Their content can still be read from `streaming_content`.
+    """
+
+    def request(self, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            response = super().request(**kwargs)
+            if response.streaming:
+                response.streaming_content = list(response.streaming_content)
+        response.queries = len(queries)
+
+        match = resolve(kwargs["PATH_INFO"])
+        endpoint: tuple[str, str] = (kwargs["REQUEST_METHOD"], match.view_name)
+        budget: int | None = QUERY_BUDGETS.get(endpoint)
+        if budget is None:
+            raise QueryBudgetExceeded(f"{endpoint} has no query budget in QUERY_BUDGETS.")
+        if len(queries) > budget:
+            raise QueryBudgetExceeded(
+                f"{endpoint} ran {len(queries)} queries, its budget is {budget}:\n"
+                + "\n".join(query["sql"] for query in queries.captured_queries)
+            )
+        return response
+
+
+class QueryBudgetMixin:
+    """Test case mixin checking the query budgets of all the requests of `self.client`."""
+
+    client_class = QueryBudgetAPIClient
+
+    def assertConstantQueries(self, request: Callable[[int], object], sizes: Iterable[int]):
+        """
+        Call `request(size)` for each size, e.g. the number of notes or tags it creates
+        before sending its request, and check all the responses took the same number of
+        queries. The first call warms up caches and is not compared.
+        """
+
+        sizes = list(sizes)
+        request(sizes[0])
+        queries: dict[int, int] = {size: request(size).queries for size in sizes}
+        self.assertEqual(
+            len(set(queries.values())), 1, f"Query count depends on the size: {queries}"
+        )
@@ -0,0 +1,196 @@
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase
+
+from freezegun import freeze_time
+
+from app.backends.pooling import ConnectionPool, PoolTimeout, close_pools, get_pool
+from app.database import check_replica_settings, get_database_settings
+
+
+class DatabaseSettingsTestCase(SimpleTestCase):
+    def test_defaults(self):
+        self.assertEqual(get_database_settings("DATABASE_", "db.sqlite3", environ={}), {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": "db.sqlite3",
+            "USER": "",
+            "PASSWORD": "",
+            "HOST": "",
+            "PORT": "",
+            "CONN_MAX_AGE": 0,
+            "CONN_HEALTH_CHECKS": False,
+        })
+
+    def test_environment(self):
+        database = get_database_settings("DATABASE_", "db.sqlite3", environ={
+            "DATABASE_ENGINE": "postgresql",
+            "DATABASE_NAME": "notes",
+            "DATABASE_HOST": "db",
+            "DATABASE_CONN_MAX_AGE": "60",
+            "DATABASE_CONN_HEALTH_CHECKS": "true",
+            "DATABASE_REPLICA_NAME": "replica",
+        })
+        self.assertEqual(database["ENGINE"], "django.db.backends.postgresql")
+        self.assertEqual(database["NAME"], "notes")
+        self.assertEqual(database["HOST"], "db")
+        self.assertEqual(database["CONN_MAX_AGE"], 60)
+        self.assertTrue(database["CONN_HEALTH_CHECKS"])
+
+        database = get_database_settings(
+            "DATABASE_", "db.sqlite3", environ={"DATABASE_CONN_MAX_AGE": "None"}
+        )
+        self.assertIsNone(database["CONN_MAX_AGE"])
+
+    def test_pool(self):
+        database = get_database_settings("DATABASE_", "db.sqlite3", environ={
+            "DATABASE_ENGINE": "postgresql", "DATABASE_POOL_SIZE": "20",
+        })
+        self.assertEqual(database["ENGINE"], "app.backends.pooled_postgresql")
+        self.assertEqual(
+            database["POOL"], {"SIZE": 20, "TIMEOUT": 10.0, "MAX_LIFETIME": 3600.0}
+        )
+
+        database = get_database_settings("DATABASE_", "db.sqlite3", environ={
+            "DATABASE_POOL_SIZE": "20", "DATABASE_POOL_MAX_LIFETIME": "0",
+        })
+        self.assertIsNone(database["POOL"]["MAX_LIFETIME"])
+
+        with self.assertRaisesMessage(ImproperlyConfigured, "has no pooled backend"):
+            get_database_settings("DATABASE_", "db.sqlite3", environ={
+                "DATABASE_ENGINE": "django.db.backends.mysql", "DATABASE_POOL_SIZE": "20",
+            })
+
+    def test_invalid_numbers(self):
+        for environ in (
+            {"DATABASE_CONN_MAX_AGE": "forever"},
+            {"DATABASE_POOL_SIZE": "-1"},
+            {"DATABASE_POOL_SIZE": "1", "DATABASE_POOL_TIMEOUT": "soon"},
+        ):
+            with self.assertRaises(ImproperlyConfigured):
+                get_database_settings("DATABASE_", "db.sqlite3", environ=environ)
+
+    def test_replica_pin_cache(self):
+        caches = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "shared": {"BACKEND": "django.core.cache.backends.redis.RedisCache"},
+        }
+        check_replica_settings([], caches, "default")
+        check_replica_settings(["replica"], caches, "shared")
+
+        # Pins must be seen by every process
+        for alias in ("default", "missing"):
+            with self.assertRaises(ImproperlyConfigured):
+                check_replica_settings(["replica"], caches, alias)
+
+
+class ConnectionPoolTestCase(SimpleTestCase):
+    def setUp(self):
+        self.addCleanup(close_pools)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings_dict = get_database_settings("DATABASE_", Path(directory.name) / "db", {
+            "DATABASE_POOL_SIZE": "2",
+            "DATABASE_POOL_TIMEOUT": "0.1",
+            "DATABASE_CONN_HEALTH_CHECKS": "true",
+        })
+
+    def get_connection(self):
+        connection = ConnectionHandler({"default": self.settings_dict})["default"]
+        self.addCleanup(connection.close)
+        connection.ensure_connection()
+        return connection
+
+    def test_connections_are_reused(self):
+        connection = self.get_connection()
+        raw_connection = connection.connection
+        connection.close()
+
+        # Another thread gets the released connection instead of opening one
+        reused = []
+
+        def reuse():
+            connection = ConnectionHandler({"default": self.settings_dict})["default"]
+            connection.ensure_connection()
+            reused.append(connection.connection)
+            connection.close()
+
+        thread = threading.Thread(target=reuse)
+        thread.start()
+        thread.join()
+        self.assertIs(reused[0], raw_connection)
+        self.assertEqual(get_pool("default", self.settings_dict).size, 1)
+
+    def test_pool_size(self):
+        connections = [self.get_connection(), self.get_connection()]
+        with self.assertRaises(PoolTimeout):
+            self.get_connection()
+
+        connections[0].close()
+        self.assertIsNotNone(self.get_connection().connection)
+
+    def test_broken_connections_are_replaced(self):
+        connection = self.get_connection()
+        broken_connection = connection.connection
+        connection.close()
+        broken_connection.close()
+
+        self.assertIsNot(self.get_connection().connection, broken_connection)
+        self.assertEqual(get_pool("default", self.settings_dict).size, 1)
+
+    def test_expired_connections_are_replaced(self):
+        self.settings_dict["POOL"]["MAX_LIFETIME"] = 60
+        pool = get_pool("default", self.settings_dict)
+        with freeze_time() as frozen_time:
+            connection = self.get_connection()
+            raw_connection = connection.connection
+            connection.close()
+            frozen_time.tick(30)
+            connection = self.get_connection()
+            self.assertIs(connection.connection, raw_connection)
+
+            # Expired connections in use are closed once released, idle ones once acquired
+            frozen_time.tick(31)
+            connection.close()
+            self.assertEqual((pool.idle, pool.size), ([], 0))
+            with self.assertRaises(sqlite3.ProgrammingError):
+                raw_connection.execute("SELECT 1")
+
+            connection = self.get_connection()
+            raw_connection = connection.connection
+            connection.close()
+            frozen_time.tick(61)
+            self.assertIsNot(self.get_connection().connection, raw_connection)
+            self.assertEqual(pool.size, 1)
+            with self.assertRaises(sqlite3.ProgrammingError):
+                raw_connection.execute("SELECT 1")
+
+    def test_close_with_connections_in_use(self):
+        connection = self.get_connection()
+        raw_connection = connection.connection
+        pool = get_pool("default", self.settings_dict)
+        close_pools()
+
+        # The connection in use is closed once released, not kept by the closed pool
+        connection.close()
+        self.assertEqual(pool.idle, [])
+        self.assertEqual(pool.size, 0)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            raw_connection.execute("SELECT 1")
+
+    def test_open_transactions_are_rolled_back(self):
+        pool = ConnectionPool(max_size=1, timeout=0)
+        connection = self.get_connection()
+        connection.set_autocommit(False)
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE TABLE note (title TEXT)")
+            cursor.execute("INSERT INTO note VALUES ('title')")
+        pool.release(connection.connection)
+
+        raw_connection, reused = pool.acquire(connect=None)
+        self.assertTrue(reused)
+        self.assertFalse(raw_connection.in_transaction)
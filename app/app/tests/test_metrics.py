@@ -0,0 +1,126 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from app.metrics import RequestMetricsMiddleware, registry
+from notes.cache import get_cache
+from notes.tests.factories import NoteFactory
+from users.authentication import token_cache
+
+
+async def async_get_response(request):
+    pass
+
+
+class RequestMetricsTestCase(APITestCase):
+    def setUp(self):
+        get_cache().clear()
+        token_cache.clear()
+        registry.clear()
+        self.user = get_user_model().objects.create_user(username="user", password="password")
+        self.token = Token.objects.create(user=self.user)
+        NoteFactory.create_batch(3, creator=self.user)
+
+    def authenticate(self, user=None):
+        token = self.token if user is None else Token.objects.create(user=user)
+        self.client.credentials(**{"HTTP_AUTHORIZATION": f"Token {token.key}"})
+
+    @async_to_sync
+    async def async_get(self, *args, **kwargs):
+        return await self.async_client.get(*args, **kwargs)
+
+    def get_metrics(self):
+        admin = get_user_model().objects.create_user(
+            username="admin", password="password", is_staff=True
+        )
+        self.authenticate(admin)
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        return response.content.decode()
+
+    @override_settings(REQUEST_METRICS_SERVER_TIMING=True)
+    def test_server_timing(self):
+        self.authenticate()
+        response = self.client.get(reverse("notes:notes-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # 1. fetch user (auth) 2. count 3. fetch notes 4. fetch tags
+        timing = response["Server-Timing"]
+        self.assertRegex(
+            timing,
+            r'^db;dur=[\d.]+;desc="4 queries", serializer;dur=[\d.]+, total;dur=[\d.]+$',
+        )
+        db, serializer, total = map(float, re.findall(r"dur=([\d.]+)", timing))
+        self.assertLessEqual(db, total)
+        self.assertLessEqual(serializer, total)
+
+        with override_settings(REQUEST_METRICS_SERVER_TIMING=False):
+            response = self.client.get(reverse("notes:notes-list"))
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(REQUEST_METRICS_SERVER_TIMING=True)
+    def test_async_request(self):
+        self.assertTrue(iscoroutinefunction(RequestMetricsMiddleware(async_get_response)))
+        self.assertFalse(iscoroutinefunction(RequestMetricsMiddleware(lambda request: None)))
+
+        # 1. fetch user (auth) 2. count 3. fetch notes 4. fetch tags, run in another thread
+        # than the middleware
+        response = self.async_get(
+            reverse("notes:notes-async-list"), authorization=f"Token {self.token.key}"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[\d.]+;desc="4 queries", ')
+        self.assertIn(
+            'http_request_db_queries_sum{view="AsyncNoteReadView"} 4', self.get_metrics()
+        )
+
+    def test_metrics_per_view(self):
+        self.authenticate()
+        self.client.get(reverse("notes:notes-list"))
+        self.client.get(reverse("notes:notes-list"), {"cursor": ""})
+        self.client.post(reverse("notes:notes-list"), {"title": "title", "body": "body"})
+        self.client.post(
+            reverse("users:register"),
+            {"username": "new", "password": "xK8#pq2!zr", "password2": "xK8#pq2!zr"},
+        )
+        self.client.post(reverse("users:token"), {"username": "user", "password": "password"})
+        self.client.get("/unknown/url/")
+
+        metrics = self.get_metrics()
+        self.assertIn("# TYPE http_request_duration_seconds histogram", metrics)
+        self.assertIn('http_request_duration_seconds_count{view="NoteViewSet.list"} 2', metrics)
+        self.assertIn('http_request_duration_seconds_count{view="NoteViewSet.create"} 1', metrics)
+        self.assertIn('http_request_duration_seconds_count{view="UserRegisterView"} 1', metrics)
+        self.assertIn('http_request_duration_seconds_count{view="ObtainAuthToken"} 1', metrics)
+        self.assertIn('http_request_duration_seconds_count{view="unresolved"} 1', metrics)
+
+        # Buckets are cumulative, the list requests ran 4 and 2 (cached token) queries
+        label = 'view="NoteViewSet.list"'
+        self.assertIn(f'http_request_db_queries_bucket{{{label},le="1"}} 0', metrics)
+        self.assertIn(f'http_request_db_queries_bucket{{{label},le="2"}} 1', metrics)
+        self.assertIn(f'http_request_db_queries_bucket{{{label},le="5"}} 2', metrics)
+        self.assertIn(f'http_request_db_queries_bucket{{{label},le="+Inf"}} 2', metrics)
+        self.assertIn(f"http_request_db_queries_sum{{{label}}} 6", metrics)
+
+    def test_metrics_requires_admin(self):
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.authenticate()
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_no_extra_queries(self):
+        self.authenticate()
+        self.client.get(reverse("notes:notes-detail", kwargs={"pk": NoteFactory().pk}))
+        # Recording the metrics does not run any query
+        with self.assertNumQueries(2):
+            self.client.get(reverse("notes:notes-list"), {"cursor": ""})
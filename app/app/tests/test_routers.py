@@ -0,0 +1,134 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db import router
+from django.test import override_settings
+from django.utils import timezone
+
+from freezegun import freeze_time
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from app.routers import get_pin_key, replica_reads
+from notes.models import Note
+from notes.tests.factories import NoteFactory
+from users.authentication import token_cache
+
+
+@override_settings(DATABASE_REPLICAS=["replica"], NOTES_CACHE_TIMEOUT=0)
+class PrimaryReplicaRouterTestCase(APITestCase):
+    """The primary and the replica are separate SQLite databases, nothing is replicated."""
+
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.user = get_user_model().objects.create(username="user")
+        self.user.save(using="replica")
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=self.user).key}"
+        )
+
+        self.replicated_note = NoteFactory(creator=self.user, title="replicated")
+        self.replicated_note.save(using="replica")
+        self.primary_note = NoteFactory(creator=self.user, title="primary")
+
+    def get_titles(self):
+        response = self.client.get(reverse("notes:notes-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {note["title"] for note in response.json()["results"]}
+
+    def test_reads_use_replica(self):
+        self.assertEqual(self.get_titles(), {"replicated"})
+
+        response = self.client.get(reverse("notes:notes-detail", args=[self.primary_note.pk]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get(reverse("notes:notes-export", args=["ndjson"]))
+        self.assertIn(b'"title":"replicated"', b"".join(response.streaming_content))
+
+    def test_writes_use_primary(self):
+        response = self.client.patch(
+            reverse("notes:notes-detail", args=[self.primary_note.pk]), {"title": "updated"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.primary_note.refresh_from_db()
+        self.assertEqual(self.primary_note.title, "updated")
+        self.assertFalse(Note.objects.using("replica").filter(title="updated").exists())
+
+    def test_read_your_writes(self):
+        with freeze_time("2026-01-01") as frozen_time:
+            response = self.client.post(
+                reverse("notes:notes-list"), {"title": "new", "body": "body"}, format="json"
+            )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(self.get_titles(), {"replicated", "primary", "new"})
+
+            # Other users read from the replica
+            other_user = get_user_model().objects.create(username="other")
+            self.client.credentials(
+                HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=other_user).key}"
+            )
+            self.assertEqual(self.get_titles(), set())
+
+            frozen_time.tick(6)
+            self.client.force_authenticate(self.user)
+            self.assertEqual(self.get_titles(), {"replicated"})
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "shared": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "shared",
+            },
+        },
+        DATABASE_REPLICA_PIN_CACHE_ALIAS="shared",
+    )
+    def test_pin_cache(self):
+        response = self.client.patch(
+            reverse("notes:notes-detail", args=[self.primary_note.pk]), {"title": "updated"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(caches["shared"].get(get_pin_key(self.user.id)))
+        self.assertIsNone(caches["default"].get(get_pin_key(self.user.id)))
+        self.assertIn("updated", self.get_titles())
+
+    @override_settings(NOTES_CACHE_TIMEOUT=300)
+    def test_cached_lists_read_from_primary(self):
+        # The notes were just created and the replica may not have them yet, so the list
+        # to be cached is read from the primary
+        self.assertEqual(self.get_titles(), {"replicated", "primary"})
+
+        # Once the replica caught up, lists are read from it
+        with freeze_time(timezone.now() + timezone.timedelta(seconds=6)):
+            response = self.client.get(reverse("notes:notes-list"), {"ordering": "title"})
+        self.assertEqual([note["title"] for note in response.json()["results"]], ["replicated"])
+
+    def test_sync_reads_from_primary(self):
+        with freeze_time(timezone.now() + timezone.timedelta(minutes=1)):
+            response = self.client.get(reverse("notes:notes-sync"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {note["title"] for note in response.json()["results"]}, {"replicated", "primary"}
+        )
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        self.assertEqual(self.get_titles(), {"replicated", "primary"})
+
+    def test_routing(self):
+        self.assertEqual(router.db_for_read(Note), "default")
+
+        token = replica_reads.set(True)
+        try:
+            self.assertEqual(router.db_for_read(Note), "replica")
+            self.assertEqual(router.db_for_read(get_user_model()), "default")
+            # Instances read from the replica are saved to the primary
+            note = Note.objects.get(pk=self.replicated_note.pk)
+            self.assertEqual(note._state.db, "replica")
+            self.assertEqual(router.db_for_write(Note, instance=note), "default")
+        finally:
+            replica_reads.reset(token)
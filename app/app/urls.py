@@ -20,6 +20,8 @@ from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework.permissions import AllowAny
 
+from .metrics import MetricsView
+
 schema_view = get_schema_view(
    openapi.Info(
       title="Notes",
@@ -37,6 +39,7 @@ urlpatterns = [
         name="schema-swagger-ui",
     ),
     path("admin/", admin.site.urls),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
     path("notes/", include("notes.urls", namespace="notes")),
     path("users/", include("users.urls", namespace="users")),
 ]
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Note, Tag
+from .models import Note, NoteImport, Tag
 
 
 @admin.register(Note)
@@ -15,3 +15,9 @@ class NoteAdmin(admin.ModelAdmin):
 class TagAdmin(admin.ModelAdmin):
     search_fields = ["title"]
     list_display = ["title"]
+
+
+@admin.register(NoteImport)
+class NoteImportAdmin(admin.ModelAdmin):
+    list_select_related = ("creator",)
+    list_display = ["name", "creator", "lines_processed", "imported_count", "error_count"]
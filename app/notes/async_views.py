@@ -0,0 +1,76 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ValidationError
+from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponse
+
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.request import Request
+
+from app.async_views import AsyncAPIView
+
+from .models import Note
+from .serializers import NoteReadSerializer
+from .views import NoteViewSet
+
+
+class AsyncNoteReadView(AsyncAPIView):
+    """
+    Async counterpart of the `NoteViewSet` list and retrieve endpoints for ASGI servers.
+
+    Authentication, the notes query and the tags query are awaited, so requests waiting on
+    the database do not hold a worker thread. Filtering, search, ordering, pagination and
+    visibility are delegated to a `NoteViewSet` and the JSON is rendered by
+    `NoteReadSerializer`, so responses match the sync endpoints, `?fields=` included.
+    Responses are neither cached nor conditional.
+    """
+
+    viewset_class = NoteViewSet
+
+    async def get(self, request: HttpRequest, pk: str | None = None) -> HttpResponse:
+        try:
+            if pk is None:
+                return await self.list_notes(request)
+            return await self.retrieve_note(request, pk)
+        except APIException as exc:
+            return self.handle_exception(exc)
+
+    async def list_notes(self, request: HttpRequest) -> HttpResponse:
+        viewset: NoteViewSet = await self.get_viewset(request, "list")
+        queryset: QuerySet = viewset.filter_queryset(viewset.get_queryset())
+        page: list[dict] = await viewset.paginator.apaginate_queryset(
+            queryset, viewset.request, viewset
+        )
+        data: list[dict] = await self.serialize(viewset, page)
+        return self.render(viewset.paginator.get_paginated_response(data).data)
+
+    async def retrieve_note(self, request: HttpRequest, pk: str) -> HttpResponse:
+        viewset: NoteViewSet = await self.get_viewset(request, "retrieve", pk=pk)
+        queryset: QuerySet = viewset.filter_queryset(viewset.get_queryset())
+        try:
+            note: dict = await queryset.aget(pk=pk)
+        except (Note.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise NotFound()
+        return self.render((await self.serialize(viewset, [note]))[0])
+
+    async def get_viewset(self, request: HttpRequest, action: str, **kwargs) -> NoteViewSet:
+        """
+        Authenticate the request and return a `NoteViewSet` set up for the action, to build
+        the querysets with. Building querysets does not touch the database.
+        """
+
+        drf_request = Request(request, authenticators=[])
+        credentials = await self.authentication_class().aauthenticate(drf_request)
+        drf_request.user, drf_request.auth = credentials or (AnonymousUser(), None)
+        viewset: NoteViewSet = self.viewset_class(
+            action=action, request=drf_request, args=(), kwargs=kwargs, format_kwarg=None
+        )
+        viewset.fieldset = viewset.get_fieldset(drf_request)
+        return viewset
+
+    @staticmethod
+    async def serialize(viewset: NoteViewSet, notes: list[dict]) -> list[dict]:
+        serializer = NoteReadSerializer(context={"fields": viewset.fieldset})
+        tags: dict | None = None
+        if "tags" in serializer.get_field_names():
+            tags = await serializer.aget_tags([note["id"] for note in notes])
+        return [serializer.to_representation(note, tags) for note in notes]
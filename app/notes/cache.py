@@ -0,0 +1,150 @@
+import datetime
+import hashlib
+import uuid
+from collections.abc import Iterable
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.db import transaction
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from app.routers import replica_reads
+
+# Cached note lists are tagged with groups. Invalidating a group replaces its generation
+# token, which changes the cache keys of every response tagged with it. Stale entries
+# are never read again and get evicted by the cache backend's LRU policy. Tokens are
+# stamped with the time they were created at, which bounds the last modification of the
+# lists tagged with them.
+ALL_NOTES = "all"
+PUBLIC_NOTES = "public"
+
+
+def get_cache() -> BaseCache:
+    return caches[settings.NOTES_CACHE_ALIAS]
+
+
+def get_user_notes_group(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def get_generation_key(group: str) -> str:
+    return f"notes:generation:{group}"
+
+
+def new_generation() -> str:
+    return f"{uuid.uuid4().hex}@{timezone.now().timestamp()}"
+
+
+def get_generation_time(generation: str) -> datetime.datetime:
+    return datetime.datetime.fromtimestamp(
+        float(generation.rpartition("@")[2]), tz=datetime.timezone.utc
+    )
+
+
+def get_generations(groups: list[str]) -> list[str]:
+    """
+    Return the current generation token of each group. Missing tokens (never set, or
+    evicted) get a new random token, so they can never match a stale entry again.
+    """
+
+    cache: BaseCache = get_cache()
+    keys: list[str] = [get_generation_key(group) for group in groups]
+    generations: dict[str, str] = cache.get_many(keys)
+    for key in set(keys) - generations.keys():
+        cache.add(key, new_generation(), timeout=None)
+        generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def invalidate(groups: Iterable[str]) -> None:
+    """
+    Invalidate all the cached responses tagged with any of the groups.
+
+    Invalidation happens right away and again once the current transaction commits,
+    so a response cached by a concurrent request before the commit is not kept.
+    """
+
+    groups: set[str] = set(groups)
+    if not groups:
+        return
+
+    def set_generations() -> None:
+        get_cache().set_many(
+            {get_generation_key(group): new_generation() for group in groups}, timeout=None
+        )
+
+    set_generations()
+    transaction.on_commit(set_generations)
+
+
+def get_list_generations(request) -> list[str]:
+    """
+    Return the generations of the note groups visible to the viewer of a notes list
+    request. They are read once per request.
+    """
+
+    generations: list[str] | None = getattr(request, "_notes_list_generations", None)
+    if generations is None:
+        groups: list[str] = [ALL_NOTES, PUBLIC_NOTES]
+        if request.user.is_authenticated:
+            groups.append(get_user_notes_group(request.user.pk))
+        generations = request._notes_list_generations = get_generations(groups)
+    return generations
+
+
+def get_list_cache_key(request) -> str:
+    """
+    Build the cache key of a notes list response from the viewer, the generations of
+    the note groups visible to them and all the query params (filters, search,
+    ordering, page or cursor). The key is computed once per request.
+    """
+
+    key: str | None = getattr(request, "_notes_list_cache_key", None)
+    if key is not None:
+        return key
+
+    viewer: str = str(request.user.pk) if request.user.is_authenticated else "anonymous"
+    params: list[tuple[str, str]] = sorted(
+        (key, value)
+        for key in request.query_params
+        for value in request.query_params.getlist(key)
+    )
+    raw_key: str = repr(
+        (request.build_absolute_uri(request.path), viewer, get_list_generations(request), params)
+    )
+    request._notes_list_cache_key = f"notes:list:{hashlib.sha256(raw_key.encode()).hexdigest()}"
+    return request._notes_list_cache_key
+
+
+class CachedListMixin:
+    """
+    Cache list responses per viewer and query params. Cached responses are invalidated
+    by note and tag changes, see `notes/receivers.py`. Responses cached within
+    `DATABASE_REPLICA_PIN_SECONDS` of a change are read from the primary.
+    """
+
+    def list(self, request, *args, **kwargs) -> Response:
+        key: str = get_list_cache_key(request)
+        data = get_cache().get(key)
+        if data is not None:
+            return Response(data)
+
+        # The response to cache is read from the primary while a replica may not have the
+        # changes that created the generations yet, which it would serve until the next one
+        newest: datetime.datetime = max(map(get_generation_time, get_list_generations(request)))
+        lagging: bool = timezone.now() - newest < datetime.timedelta(
+            seconds=settings.DATABASE_REPLICA_PIN_SECONDS
+        )
+        token = replica_reads.set(
+            replica_reads.get() and not (lagging and settings.NOTES_CACHE_TIMEOUT != 0)
+        )
+        try:
+            response: Response = super().list(request, *args, **kwargs)
+        finally:
+            replica_reads.reset(token)
+        if response.status_code == status.HTTP_200_OK:
+            get_cache().set(key, response.data, settings.NOTES_CACHE_TIMEOUT)
+        return response
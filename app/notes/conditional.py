@@ -0,0 +1,163 @@
+import datetime
+import hashlib
+from collections.abc import MutableMapping
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import QuerySet
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from rest_framework import permissions, status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from .cache import get_generation_time, get_list_generations
+from .models import Note
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "Precondition failed."
+    default_code = "precondition_failed"
+
+
+class Validators:
+    """The `ETag` and `Last-Modified` validators of a representation."""
+
+    def __init__(self, *parts, last_modified: datetime.datetime | None):
+        raw: str = repr(parts + (last_modified and last_modified.isoformat(),))
+        self.etag: str = quote_etag(hashlib.sha256(raw.encode()).hexdigest()[:32])
+        self.last_modified: int | None = last_modified and int(last_modified.timestamp())
+
+    def get_conditional_response(self, request) -> HttpResponse | None:
+        """
+        Return a 304 (safe methods) or 412 (unsafe methods) response if the request
+        preconditions fail, `None` otherwise.
+        """
+
+        return get_conditional_response(
+            request._request, etag=self.etag, last_modified=self.last_modified
+        )
+
+    def set_headers(self, headers: MutableMapping) -> None:
+        headers["ETag"] = self.etag
+        if self.last_modified is not None:
+            headers["Last-Modified"] = http_date(self.last_modified)
+
+
+class ConditionalRequestMixin:
+    """
+    Conditional request handling for notes.
+
+    `If-None-Match`/`If-Modified-Since` on list and retrieve return a 304 without fetching
+    or serializing any note: list validators are derived from the cache generations of the
+    lists (see `notes/cache.py`), retrieve ones from the `last_modified_at` of the note.
+    `If-Match`/`If-Unmodified-Since` on update and destroy provide optimistic concurrency.
+
+    Every change to a note (including tag changes and soft deletes) touches
+    `last_modified_at`, which is what makes these validators sound. Sparse fieldsets (see
+    `SparseFieldsetMixin.get_fieldset_key`) are separate representations with their own
+    validators, while preconditions of writes are checked against the full note.
+    """
+
+    locking_actions = ("update", "partial_update", "destroy")
+
+    def get_list_validators(self) -> Validators:
+        """
+        Compute the list validators from the generations of the note groups visible to the
+        viewer, without any query. Every change to a note of these groups, including notes
+        leaving the list, replaces a generation, and the `Last-Modified` is the time the
+        newest one was created at.
+
+        `Last-Modified` has a one second granularity: a client only sending
+        `If-Modified-Since` can miss a change made in the same second as its previous
+        response, `If-None-Match` does not.
+        """
+
+        generations: list[str] = get_list_generations(self.request)
+        viewer = self.request.user.pk if self.request.user.is_authenticated else None
+        return Validators(
+            self.request.get_full_path(),
+            viewer,
+            *generations,
+            last_modified=max(get_generation_time(generation) for generation in generations),
+        )
+
+    def get_object_validators(self) -> Validators | None:
+        """
+        Compute the validators of the requested representation of the note with a single
+        column query, `None` if it does not exist.
+        """
+
+        lookup_url_kwarg: str = self.lookup_url_kwarg or self.lookup_field
+        try:
+            note: tuple | None = (
+                self.get_visible_queryset(Note.active_objects.all())
+                .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+                .values_list("pk", "last_modified_at")
+                .first()
+            )
+        except (TypeError, ValueError, ValidationError):
+            return None
+        return note and Validators(
+            str(note[0]), self.get_fieldset_key(), last_modified=note[1]
+        )
+
+    @staticmethod
+    def get_instance_validators(
+        instance: Note, fieldset_key: tuple[str, ...] | None = None
+    ) -> Validators:
+        return Validators(str(instance.pk), fieldset_key, last_modified=instance.last_modified_at)
+
+    def get_queryset(self) -> QuerySet[Note]:
+        """Lock the note to be changed until the precondition checked write is done."""
+
+        queryset: QuerySet[Note] = super().get_queryset()
+        if self.action in self.locking_actions:
+            queryset = queryset.select_for_update(of=("self",))
+        return queryset
+
+    def get_object(self) -> Note:
+        """Check the `If-Match`/`If-Unmodified-Since` preconditions of unsafe requests."""
+
+        instance: Note = super().get_object()
+        if self.request.method not in permissions.SAFE_METHODS:
+            validators: Validators = self.get_instance_validators(instance)
+            if validators.get_conditional_response(self.request) is not None:
+                raise PreconditionFailed()
+        return instance
+
+    def list(self, request, *args, **kwargs) -> HttpResponse:
+        validators: Validators = self.get_list_validators()
+        response: HttpResponse | None = validators.get_conditional_response(request)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        validators.set_headers(response.headers)
+        return response
+
+    def retrieve(self, request, *args, **kwargs) -> HttpResponse:
+        validators: Validators | None = self.get_object_validators()
+        if validators is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        response: HttpResponse | None = validators.get_conditional_response(request)
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        validators.set_headers(response.headers)
+        return response
+
+    @transaction.atomic
+    def update(self, request, *args, **kwargs) -> Response:
+        return super().update(request, *args, **kwargs)
+
+    def perform_update(self, serializer) -> None:
+        super().perform_update(serializer)
+        self.get_instance_validators(
+            serializer.instance, self.get_fieldset_key()
+        ).set_headers(self.headers)
+
+    @transaction.atomic
+    def destroy(self, request, *args, **kwargs) -> Response:
+        return super().destroy(request, *args, **kwargs)
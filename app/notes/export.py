@@ -0,0 +1,62 @@
+import csv
+from collections.abc import Iterator
+
+from django.db.models import QuerySet
+
+from rest_framework.renderers import JSONRenderer
+
+from .serializers import NoteReadSerializer
+
+
+class Echo:
+    """File-like object that returns what is written, for streaming `csv.writer` rows."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_notes(queryset: QuerySet, chunk_size: int) -> Iterator[dict]:
+    """
+    Serialize the notes of a `.values()` queryset like the notes API. Notes are streamed
+    from the database `chunk_size` rows at a time and the tags of each chunk are fetched
+    with a single query, so memory use does not depend on the number of notes.
+    """
+
+    serializer = NoteReadSerializer()
+    chunk: list[dict] = []
+    for note in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(note)
+        if len(chunk) == chunk_size:
+            yield from serialize_chunk(serializer, chunk, queryset.db)
+            chunk = []
+    if chunk:
+        yield from serialize_chunk(serializer, chunk, queryset.db)
+
+
+def serialize_chunk(
+    serializer: NoteReadSerializer, notes: list[dict], using: str | None = None
+) -> Iterator[dict]:
+    tags: dict = serializer.get_tags([note["id"] for note in notes], using)
+    for note in notes:
+        yield serializer.to_representation(note, tags)
+
+
+def render_ndjson(notes: Iterator[dict]) -> Iterator[bytes]:
+    """Render one JSON document per line."""
+
+    renderer = JSONRenderer()
+    for note in notes:
+        yield renderer.render(note) + b"\n"
+
+
+def render_csv(notes: Iterator[dict]) -> Iterator[str]:
+    """Render a CSV header and one row per note. Tags are joined into a single cell."""
+
+    columns: list[str] = [
+        "id", "title", "body", "tags", "creator", "is_public", "created_at", "last_modified_at",
+    ]
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for note in notes:
+        note["tags"] = ",".join(tag["title"] for tag in note["tags"])
+        yield writer.writerow([note[column] for column in columns])
@@ -0,0 +1,72 @@
+import zlib
+
+from django.conf import settings
+from django.db import models
+
+ELLIPSIS = "…"
+
+
+def compress_text(value: str) -> str | bytes:
+    """
+    Compress texts of at least `NOTES_BODY_COMPRESSION_MIN_LENGTH` bytes with zlib, if that
+    makes them smaller. Shorter texts are returned as is.
+    """
+
+    min_length: int | None = settings.NOTES_BODY_COMPRESSION_MIN_LENGTH
+    if min_length is None or not isinstance(value, str) or len(value) < min_length / 4:
+        return value
+
+    encoded: bytes = value.encode()
+    if len(encoded) < min_length:
+        return value
+    compressed: bytes = zlib.compress(encoded)
+    return compressed if len(compressed) < len(encoded) else value
+
+
+def decompress_text(value: str | bytes | None) -> str | None:
+    if isinstance(value, (bytes, memoryview)):
+        return zlib.decompress(value).decode()
+    return value
+
+
+def get_excerpt(value: str | bytes | None, length: int) -> str | None:
+    """The first `length` characters of a text, followed by an ellipsis if it is longer."""
+
+    value = decompress_text(value)
+    if value is None or len(value) <= length:
+        return value
+    return value[:length] + ELLIPSIS
+
+
+def register_sqlite_functions(connection) -> None:
+    """
+    SQL function reading texts stored by `CompressedTextField`, for the search index
+    triggers. It must be registered on every SQLite connection.
+    """
+
+    connection.create_function("notes_text", 1, decompress_text, deterministic=True)
+
+
+class CompressedTextField(models.TextField):
+    """
+    Text field storing long values zlib compressed on SQLite, see `compress_text`. SQLite
+    columns are dynamically typed, so compressed values are stored as BLOBs in the same
+    text column, next to the uncompressed ones, and are decompressed when loaded.
+
+    Other databases store plain text. PostgreSQL already compresses large values itself
+    (TOAST). The field deconstructs as a `TextField`, since the storage format does not
+    change the schema.
+    """
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        return name, "django.db.models.TextField", args, kwargs
+
+    def from_db_value(self, value, expression, connection):
+        return decompress_text(value)
+
+    def get_db_prep_save(self, value, connection):
+        value = super().get_db_prep_save(value, connection)
+        if connection.vendor == "sqlite":
+            return compress_text(value)
+        return value
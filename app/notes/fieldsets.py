@@ -0,0 +1,71 @@
+from rest_framework.exceptions import ValidationError
+
+
+def parse_field_names(value: str) -> list[str]:
+    """Split a comma separated list of field names, e.g. `id,title`."""
+
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+class SparseFieldsetMixin:
+    """
+    Let clients pick the fields of the responses with `?fields=` (e.g. `?fields=id,title`)
+    and leave some of the default ones out with `?omit=` (e.g. `?omit=body,tags`).
+
+    The requested fields of the action are validated before it runs and set as `fieldset`,
+    for the view to only load what is needed, and passed to the serializers as the
+    `fields` context. `fieldset` is `None` for the actions that always return every field.
+    """
+
+    fields_query_param = "fields"
+    omit_query_param = "omit"
+    fieldset_actions: tuple[str, ...] = ()
+    fieldset: set[str] | None = None
+
+    def get_fieldset_fields(self) -> tuple[list[str], list[str]]:
+        """
+        Return the fields available to the current action and its default ones. By default,
+        all the readable fields of the serializer are available and returned. Views with
+        serializers that are not `Serializer`s, or with optional fields, override it.
+        """
+
+        serializer = self.get_serializer()
+        fields: list[str] = [
+            name for name, field in serializer.fields.items() if not field.write_only
+        ]
+        return fields, fields
+
+    def get_fieldset(self, request) -> set[str] | None:
+        """Return the fields requested for the current action, with the defaults as a base."""
+
+        if self.action not in self.fieldset_actions:
+            return None
+
+        available, default = self.get_fieldset_fields()
+        fieldset: set[str] = set(default)
+        for param in (self.fields_query_param, self.omit_query_param):
+            if param not in request.query_params:
+                continue
+            names: list[str] = parse_field_names(request.query_params[param])
+            unknown: list[str] = [name for name in names if name not in available]
+            if unknown:
+                raise ValidationError({param: f"Unknown fields: {', '.join(unknown)}."})
+            fieldset = set(names) if param == self.fields_query_param else fieldset - set(names)
+        return fieldset
+
+    def get_fieldset_key(self) -> tuple[str, ...] | None:
+        """
+        Identify the requested representation, e.g. for its validators: the sorted requested
+        fields, or `None` when every field or the default ones are requested.
+        """
+
+        if self.fieldset is None or self.fieldset == set(self.get_fieldset_fields()[1]):
+            return None
+        return tuple(sorted(self.fieldset))
+
+    def initial(self, request, *args, **kwargs) -> None:
+        super().initial(request, *args, **kwargs)
+        self.fieldset = self.get_fieldset(request)
+
+    def get_serializer_context(self) -> dict:
+        return {**super().get_serializer_context(), "fields": self.fieldset}
@@ -1,6 +1,9 @@
 import django_filters
+from django.db.models import Exists, OuterRef, QuerySet
+from rest_framework.filters import SearchFilter
 
-from .models import Note
+from .models import Note, Tag
+from .search import get_search_backend
 
 
 class CommaSeparatedCharFilter(django_filters.BaseInFilter, django_filters.CharFilter):
@@ -18,10 +21,61 @@ class CommaSeparatedUUIDFilter(django_filters.BaseInFilter, django_filters.UUIDF
 class NoteFilter(django_filters.FilterSet):
     """Filters for Note model."""
 
-    tag_titles = CommaSeparatedCharFilter(field_name="tags__title", distinct=True)
-    tag_ids = CommaSeparatedCharFilter(field_name="tags__id", distinct=True)
+    MATCH_ANY, MATCH_ALL = "any", "all"
+
+    tag_titles = CommaSeparatedCharFilter(field_name="title", method="filter_tags")
+    tag_ids = CommaSeparatedUUIDFilter(field_name="id", method="filter_tags")
+    match = django_filters.ChoiceFilter(
+        choices=[(MATCH_ANY, MATCH_ANY), (MATCH_ALL, MATCH_ALL)],
+        method="filter_match",
+        help_text="Whether notes need any (default) or all of the filtered tags.",
+    )
     ids = CommaSeparatedUUIDFilter(field_name="id")
 
     class Meta:
         model = Note
-        fields = ["ids", "tag_titles", "tag_ids", "is_public"]
+        fields = ["ids", "tag_titles", "tag_ids", "match", "is_public"]
+
+    def filter_tags(self, queryset: QuerySet, name: str, value: list) -> QuerySet:
+        """
+        Filter notes by tags with `EXISTS` subqueries on the note-tag through table. Unlike
+        a join, this can never duplicate notes, so no `DISTINCT` is needed.
+        """
+
+        links: QuerySet = Note.tags.through.objects.filter(note_id=OuterRef("pk"))
+        if self.form.cleaned_data.get("match") == self.MATCH_ALL:
+            for tag in set(value):
+                queryset = queryset.filter(Exists(links.filter(**{f"tag__{name}": tag})))
+            return queryset
+
+        return queryset.filter(Exists(links.filter(**{f"tag__{name}__in": value})))
+
+    def filter_match(self, queryset: QuerySet, name: str, value: str) -> QuerySet:
+        """`match` only changes how the tag filters are applied."""
+
+        return queryset
+
+
+class TagFilter(django_filters.FilterSet):
+    """Filters for Tag model."""
+
+    # Served by the case insensitive `notes_tag_title_prefix_idx` index
+    prefix = django_filters.CharFilter(field_name="title", lookup_expr="istartswith")
+
+    class Meta:
+        model = Tag
+        fields = ["prefix"]
+
+
+class NoteSearchFilter(SearchFilter):
+    """
+    Full text search over note titles and bodies with the configured search backend.
+    Results are ordered by relevance unless an explicit `ordering` is requested.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_terms: list[str] = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+
+        return get_search_backend().search(queryset, search_terms)
@@ -0,0 +1,115 @@
+import json
+from collections.abc import Callable, Iterable
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Note, NoteImport
+from .serializers import NoteImportRowSerializer
+
+
+class ImportConflict(Exception):
+    """The checkpoint of the import moved, another run is importing the same file."""
+
+
+class NoteImporter:
+    """
+    Import notes from NDJSON lines, one note (`title`, `body`, `tags`, `is_public`) per
+    line, for the creator of the given `NoteImport`.
+
+    Lines are read lazily and imported `batch_size` at a time: the batch is validated,
+    its notes are saved with a single `bulk_create` and their tags are resolved and linked
+    once for the whole batch (`Note.bulk_update_note_tags`). Each batch is committed
+    together with the checkpoint of the import, so lines before `lines_processed` are
+    skipped when the same input is imported again. Invalid lines are reported and skipped.
+    """
+
+    batch_size = 1000
+    max_reported_errors = 100
+
+    def __init__(
+        self,
+        note_import: NoteImport,
+        batch_size: int | None = None,
+        on_batch: Callable[[NoteImport, list[dict]], None] | None = None,
+    ):
+        self.note_import = note_import
+        self.batch_size = batch_size or self.batch_size
+        self.on_batch = on_batch
+        # The first `max_reported_errors` errors, all of them are passed to `on_batch`
+        self.errors: list[dict] = []
+
+    def run(self, lines: Iterable[bytes | str]) -> NoteImport:
+        """Import the lines after the checkpoint and mark the import as completed."""
+
+        batch: list[tuple[int, bytes | str]] = []
+        for line_number, line in enumerate(lines, start=1):
+            if line_number <= self.note_import.lines_processed:
+                continue
+            batch.append((line_number, line))
+            if len(batch) == self.batch_size:
+                self.import_batch(batch)
+                batch = []
+        if batch:
+            self.import_batch(batch)
+
+        self.note_import.completed_at = timezone.now()
+        self.note_import.save(update_fields=["completed_at", "last_modified_at"])
+        return self.note_import
+
+    def import_batch(self, batch: list[tuple[int, bytes | str]]) -> None:
+        notes: list[Note] = []
+        tags_by_note: dict[Note, list[dict]] = {}
+        errors: list[dict] = []
+        for line_number, line in batch:
+            if not line.strip():
+                continue
+            data, line_errors = self.validate_line(line)
+            if line_errors:
+                errors.append({"line": line_number, "errors": line_errors})
+                continue
+
+            tags: list[dict] = data.pop("tags", [])
+            note = Note(creator_id=self.note_import.creator_id, **data)
+            notes.append(note)
+            if tags:
+                tags_by_note[note] = tags
+
+        checkpoint: int = self.note_import.lines_processed
+        with transaction.atomic():
+            Note.objects.bulk_create(notes)
+            Note.bulk_update_note_tags(tags_by_note)
+
+            self.note_import.lines_processed = batch[-1][0]
+            self.note_import.imported_count += len(notes)
+            self.note_import.error_count += len(errors)
+            self.note_import.last_modified_at = timezone.now()
+            # Only moves the checkpoint it started from, concurrent runs roll back instead
+            updated: int = NoteImport.objects.filter(
+                pk=self.note_import.pk, lines_processed=checkpoint
+            ).update(
+                lines_processed=self.note_import.lines_processed,
+                imported_count=self.note_import.imported_count,
+                error_count=self.note_import.error_count,
+                last_modified_at=self.note_import.last_modified_at,
+            )
+            if not updated:
+                raise ImportConflict(f"Import {self.note_import.pk} is already in progress.")
+
+        self.errors += errors[:self.max_reported_errors - len(self.errors)]
+        if self.on_batch is not None:
+            self.on_batch(self.note_import, errors)
+
+    @staticmethod
+    def validate_line(line: bytes | str) -> tuple[dict, dict | None]:
+        """Return the validated data of a line, or its errors."""
+
+        try:
+            data = json.loads(line)
+        except ValueError as exc:
+            return {}, {"non_field_errors": [f"Invalid JSON: {exc}"]}
+
+        serializer = NoteImportRowSerializer(data=data)
+        if not serializer.is_valid():
+            return {}, serializer.errors
+        return dict(serializer.validated_data), None
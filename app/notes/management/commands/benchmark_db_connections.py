@@ -0,0 +1,117 @@
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.utils import ConnectionHandler
+
+from app.backends.pooling import close_pools
+from app.database import POOLED_ENGINES
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the connection setup time of the default database under concurrent load "
+        "with a new connection per request, persistent connections (CONN_MAX_AGE) and a "
+        "connection pool. Each simulated request opens or reuses a connection like Django "
+        "does around requests and runs a single query."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4 * (os.cpu_count() or 1),
+            help="Threads sending requests, e.g. the number of server threads.",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=200, help="Requests per thread and configuration."
+        )
+        parser.add_argument(
+            "--pool-size", type=int, default=None, help="Pool size, defaults to the threads."
+        )
+
+    def handle(self, *args, **options):
+        if min(options["concurrency"], options["requests"], options["pool_size"] or 1) < 1:
+            raise CommandError("--concurrency, --requests and --pool-size must be positive.")
+
+        database: dict = {
+            key: value for key, value in connections["default"].settings_dict.items()
+            if key not in ("POOL", "TEST")
+        }
+        # Compare with the plain backend when the default database is already pooled
+        plain_engines: dict[str, str] = {
+            pooled: plain for plain, pooled in POOLED_ENGINES.items()
+        }
+        engine: str = plain_engines.get(database["ENGINE"], database["ENGINE"])
+        if engine not in POOLED_ENGINES:
+            raise CommandError(f"{engine} has no pooled backend to compare with.")
+
+        pool_size: int = options["pool_size"] or options["concurrency"]
+        configurations: dict[str, dict] = {
+            "new connection per request": {
+                **database, "ENGINE": engine, "CONN_MAX_AGE": 0,
+            },
+            "persistent connections": {
+                **database, "ENGINE": engine, "CONN_MAX_AGE": 600, "CONN_HEALTH_CHECKS": True,
+            },
+            f"pool of {pool_size}": {
+                **database,
+                "ENGINE": POOLED_ENGINES[engine],
+                "CONN_MAX_AGE": 0,
+                "CONN_HEALTH_CHECKS": True,
+                "POOL": {"SIZE": pool_size, "TIMEOUT": 30},
+            },
+        }
+
+        self.stdout.write(
+            f"{database['ENGINE']} {database['NAME']}, {options['concurrency']} threads, "
+            f"{options['requests']} requests each"
+        )
+        for name, settings_dict in configurations.items():
+            setup_times, elapsed = self.measure(
+                settings_dict, options["concurrency"], options["requests"]
+            )
+            self.stdout.write(
+                f"  {name:<28} {len(setup_times) / elapsed:9.1f} requests/s  connection setup "
+                f"mean {statistics.fmean(setup_times) * 1000:7.3f} ms  "
+                f"max {max(setup_times) * 1000:7.3f} ms"
+            )
+
+    def measure(
+        self, settings_dict: dict, concurrency: int, requests: int
+    ) -> tuple[list[float], float]:
+        """Return the connection setup time of every request and the elapsed seconds."""
+
+        handler = ConnectionHandler({"default": settings_dict})
+        setup_times: list[float] = []
+        lock = threading.Lock()
+
+        def send_requests(_) -> None:
+            connection = handler["default"]
+            timings: list[float] = []
+            try:
+                for _ in range(requests):
+                    # `request_started` and `request_finished` close obsolete connections
+                    connection.close_if_unusable_or_obsolete()
+                    start: float = time.perf_counter()
+                    connection.ensure_connection()
+                    timings.append(time.perf_counter() - start)
+                    with connection.cursor() as cursor:
+                        cursor.execute("SELECT 1")
+                    connection.close_if_unusable_or_obsolete()
+            finally:
+                connection.close()
+            with lock:
+                setup_times.extend(timings)
+
+        try:
+            start: float = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                list(executor.map(send_requests, range(concurrency)))
+            return setup_times, time.perf_counter() - start
+        finally:
+            close_pools()
@@ -0,0 +1,78 @@
+import statistics
+import time
+from collections.abc import Callable
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Prefetch
+
+from rest_framework.renderers import JSONRenderer
+
+from notes.models import Note, Tag
+from notes.serializers import NoteReadSerializer, NoteSerializer
+from notes.tests.factories import NoteFactory, TagFactory
+from users.tests.factories import UserFactory
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the list serialization time of NoteSerializer and NoteReadSerializer. "
+        "Test data is created in a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--notes", type=int, default=100, help="Notes per page.")
+        parser.add_argument("--tags", type=int, default=5, help="Tags per note.")
+        parser.add_argument("--repeat", type=int, default=50, help="Runs per serializer.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options["notes"], options["tags"])
+            self.run(options["repeat"])
+            transaction.set_rollback(True)
+
+    def seed(self, notes: int, tags: int) -> None:
+        creator = UserFactory()
+        tag_pool: list[Tag] = TagFactory.create_batch(max(tags * 4, 1))
+        for index in range(notes):
+            NoteFactory(
+                creator=creator,
+                tags=[tag_pool[(index + offset) % len(tag_pool)] for offset in range(tags)],
+            )
+
+    def run(self, repeat: int) -> None:
+        def serialize_models() -> bytes:
+            notes = Note.active_objects.order_by("-created_at").select_related(
+                "creator"
+            ).prefetch_related(Prefetch("tags", queryset=Tag.objects.order_by("title")))
+            return JSONRenderer().render(NoteSerializer(notes, many=True).data)
+
+        def serialize_values() -> bytes:
+            notes = Note.active_objects.order_by("-created_at").values(*NoteReadSerializer.values)
+            return JSONRenderer().render(NoteReadSerializer(notes, many=True).data)
+
+        if serialize_models() != serialize_values():
+            raise CommandError("NoteReadSerializer output differs from NoteSerializer.")
+
+        results: dict[str, list[float]] = {
+            "NoteSerializer": self.measure(serialize_models, repeat),
+            "NoteReadSerializer": self.measure(serialize_values, repeat),
+        }
+        for name, timings in results.items():
+            self.stdout.write(
+                f"{name:<20} median {statistics.median(timings) * 1000:8.2f} ms  "
+                f"min {min(timings) * 1000:8.2f} ms"
+            )
+        speedup = statistics.median(results["NoteSerializer"]) / statistics.median(
+            results["NoteReadSerializer"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"NoteReadSerializer is {speedup:.1f}x faster"))
+
+    @staticmethod
+    def measure(function: Callable, repeat: int) -> list[float]:
+        timings: list[float] = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - start)
+        return timings
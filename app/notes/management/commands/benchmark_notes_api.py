@@ -0,0 +1,228 @@
+import itertools
+import json
+import platform
+import random
+import re
+import statistics
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+import factory.random
+from rest_framework.authtoken.models import Token
+
+from notes.models import Note, Tag
+from notes.tests.factories import NoteFactory, TagFactory
+from users.models import User
+from users.tests.factories import UserFactory
+
+SERVER_TIMING = re.compile(r'db;dur=(?P<db>[\d.]+);desc="(?P<queries>\d+) queries"')
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the notes API hot paths (list, filter, search, create with tags, update, "
+        "delete) on a large seeded dataset and print the throughput, latency percentiles "
+        "and query counts of each as JSON. Tag usage follows a Zipf distribution. Test "
+        "data is created in a transaction that is rolled back afterwards."
+    )
+
+    seed_batch_size = 5000
+
+    def add_arguments(self, parser):
+        parser.add_argument("--notes", type=int, default=1_000_000, help="Notes to seed.")
+        parser.add_argument("--tags", type=int, default=100_000, help="Tags to seed.")
+        parser.add_argument("--users", type=int, default=1000, help="Note creators to seed.")
+        parser.add_argument(
+            "--tags-per-note", type=int, default=3, help="Average number of tags per note."
+        )
+        parser.add_argument(
+            "--skew", type=float, default=1.1, help="Zipf exponent of the tag popularity."
+        )
+        parser.add_argument(
+            "--requests", type=int, default=200, help="Requests per benchmarked endpoint."
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the generated data.")
+        parser.add_argument("--output", help="Write the JSON results to a file.")
+
+    def handle(self, *args, **options):
+        if min(options["notes"], options["tags"], options["users"], options["requests"]) < 1:
+            raise CommandError("--notes, --tags, --users and --requests must be positive.")
+
+        random.seed(options["seed"])
+        factory.random.reseed_random(options["seed"])
+
+        with transaction.atomic():
+            start = time.perf_counter()
+            user: User = self.seed(options)
+            seed_seconds: float = time.perf_counter() - start
+
+            client = Client(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}")
+            with override_settings(
+                ALLOWED_HOSTS=["testserver"],
+                NOTES_CACHE_TIMEOUT=0,
+                REQUEST_METRICS_SERVER_TIMING=True,
+            ):
+                results: dict = {
+                    name: self.measure(client, scenario, options["requests"])
+                    for name, scenario in self.get_scenarios(user).items()
+                }
+            transaction.set_rollback(True)
+
+        database: str = connection.vendor
+        if connection.vendor == "sqlite":
+            database += f" {connection.Database.sqlite_version}"
+        report: dict = {
+            "created_at": timezone.now().isoformat(),
+            "environment": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": database,
+            },
+            "options": {
+                key: options[key]
+                for key in ("notes", "tags", "users", "tags_per_note", "skew", "requests", "seed")
+            },
+            "seed_seconds": round(seed_seconds, 2),
+            "results": results,
+        }
+        output: str = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output + "\n")
+        self.stdout.write(output)
+
+    def seed(self, options: dict) -> User:
+        """
+        Seed the users, tags and notes with the factories, saving them with `bulk_create`.
+        Returns the user sending the benchmarked requests, one of the note creators.
+        """
+
+        # Hashing a password per user would dominate the seeding time
+        users: list[User] = User.objects.bulk_create(
+            UserFactory.build_batch(options["users"], password=make_password(None))
+        )
+        tags: list[Tag] = Tag.objects.bulk_create(
+            TagFactory.build_batch(options["tags"], title=factory.Sequence(lambda n: f"tag {n}"))
+        )
+        # Tag `i` is used proportionally to 1 / (i + 1) ** skew
+        tag_weights: list[float] = list(itertools.accumulate(
+            1 / (rank + 1) ** options["skew"] for rank in range(len(tags))
+        ))
+
+        note_counts: Counter = Counter()
+        remaining: int = options["notes"]
+        while remaining:
+            notes: list[Note] = [
+                NoteFactory.build(creator=random.choice(users), is_public=random.random() < 0.3)
+                for _ in range(min(remaining, self.seed_batch_size))
+            ]
+            remaining -= len(notes)
+            Note.objects.bulk_create(notes)
+
+            links: list = []
+            for note in notes:
+                count: int = random.randint(0, 2 * options["tags_per_note"])
+                note_tags: set[Tag] = set(random.choices(tags, cum_weights=tag_weights, k=count))
+                links += [Note.tags.through(note_id=note.pk, tag_id=tag.pk) for tag in note_tags]
+                note_counts.update(tag.pk for tag in note_tags)
+            Note.tags.through.objects.bulk_create(links)
+        Tag.objects.update_note_counts(note_counts)
+
+        return users[0]
+
+    def get_scenarios(self, user: User) -> dict[str, Callable[[Client], object]]:
+        """Return a function sending one request, for each benchmarked endpoint."""
+
+        popular_tags: list[str] = list(
+            Tag.objects.order_by("-note_count").values_list("title", flat=True)[:2]
+        )
+        note_ids: Iterator = iter(
+            Note.active_objects.filter(creator=user).values_list("pk", flat=True)
+        )
+        note: Note | None = Note.active_objects.filter(creator=user).first()
+        if note is None or not popular_tags:
+            raise CommandError("Not enough notes or tags were seeded to run the benchmark.")
+        search_term: str = note.body.split()[0].strip(".")
+
+        list_url: str = reverse("notes:notes-list")
+        counter = itertools.count()
+
+        def detail_url() -> str:
+            try:
+                return reverse("notes:notes-detail", kwargs={"pk": next(note_ids)})
+            except StopIteration:
+                raise CommandError("The user has too few notes for the update and delete runs.")
+
+        def create(client: Client):
+            index: int = next(counter)
+            return client.post(list_url, {
+                "title": f"benchmark {index}",
+                "body": "body",
+                "tags": [{"title": popular_tags[0]}, {"title": f"benchmark tag {index}"}],
+            }, content_type="application/json")
+
+        def update(client: Client):
+            return client.patch(detail_url(), {
+                "title": "updated", "tags": [{"title": popular_tags[1]}],
+            }, content_type="application/json")
+
+        return {
+            "list": lambda client: client.get(list_url),
+            "list_cursor": lambda client: client.get(list_url, {"cursor": ""}),
+            "filter_tag": lambda client: client.get(list_url, {"tag_titles": popular_tags[0]}),
+            "filter_all_tags": lambda client: client.get(
+                list_url, {"tag_titles": ",".join(popular_tags), "match": "all"}
+            ),
+            "search": lambda client: client.get(list_url, {"search": search_term}),
+            "create_with_tags": create,
+            "update": update,
+            "delete": lambda client: client.delete(detail_url()),
+        }
+
+    @staticmethod
+    def measure(client: Client, scenario: Callable[[Client], object], requests: int) -> dict:
+        """Send the requests one after another and summarize their latency and queries."""
+
+        latencies: list[float] = []
+        db_times: list[float] = []
+        queries: list[int] = []
+        start: float = time.perf_counter()
+        for _ in range(requests):
+            request_start: float = time.perf_counter()
+            response = scenario(client)
+            latencies.append((time.perf_counter() - request_start) * 1000)
+            if response.status_code >= 400:
+                raise CommandError(f"Request failed with {response.status_code}: {response}")
+
+            timing = SERVER_TIMING.search(response["Server-Timing"])
+            db_times.append(float(timing["db"]))
+            queries.append(int(timing["queries"]))
+        elapsed: float = time.perf_counter() - start
+
+        percentiles: list[float] = (
+            statistics.quantiles(latencies, n=100, method="inclusive")
+            if len(latencies) > 1 else latencies * 99
+        )
+        return {
+            "requests": requests,
+            "throughput_rps": round(requests / elapsed, 1),
+            "latency_ms": {
+                "mean": round(statistics.fmean(latencies), 2),
+                "p50": round(percentiles[49], 2),
+                "p90": round(percentiles[89], 2),
+                "p95": round(percentiles[94], 2),
+                "p99": round(percentiles[98], 2),
+                "max": round(max(latencies), 2),
+            },
+            "db_ms_mean": round(statistics.fmean(db_times), 2),
+            "queries": {"min": min(queries), "max": max(queries)},
+        }
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import QuerySet, Sum
+
+from notes.models import Note, OctetLength
+
+
+class Command(BaseCommand):
+    help = (
+        "Rewrite the bodies of all the notes in the storage format set by "
+        "NOTES_BODY_COMPRESSION_MIN_LENGTH, e.g. to compress the existing notes after "
+        "enabling compression, or decompress them after disabling it. Notes are rewritten "
+        "in batches with a short transaction each."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Notes rewritten per transaction."
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        size_before: int = self.get_body_size()
+        # The visibility and creator are used to invalidate the cached lists
+        notes: QuerySet[Note] = Note.objects.order_by("pk").only(
+            "pk", "body", "creator_id", "is_public"
+        )
+        rewritten: int = 0
+        batch: list[Note] = list(notes[:options["batch_size"]])
+        while batch:
+            with transaction.atomic():
+                Note.objects.bulk_update(batch, ["body"])
+            rewritten += len(batch)
+            batch = list(notes.filter(pk__gt=batch[-1].pk)[:options["batch_size"]])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rewrote {rewritten} note bodies, stored in {self.get_body_size()} bytes instead "
+            f"of {size_before}. Run VACUUM to return the freed space to the file system."
+        ))
+
+    @staticmethod
+    def get_body_size() -> int:
+        return Note.objects.aggregate(size=Sum(OctetLength("body")))["size"] or 0
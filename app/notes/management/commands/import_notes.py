@@ -0,0 +1,73 @@
+import json
+import sys
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.importer import ImportConflict, NoteImporter
+from notes.models import NoteImport
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Import notes from an NDJSON file, one note per line. Progress is saved after every "
+        "batch, an interrupted import continues where it stopped with --resume."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="NDJSON file to import, '-' reads standard input.")
+        parser.add_argument("--user", help="Username of the creator of the imported notes.")
+        parser.add_argument(
+            "--resume", metavar="IMPORT_ID", help="Id of an interrupted import of the same file."
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=NoteImporter.batch_size, help="Lines per batch."
+        )
+
+    def handle(self, *args, **options):
+        note_import: NoteImport = self.get_import(options)
+        self.stdout.write(
+            f"Importing {options['path']} as {note_import.pk}, "
+            f"starting after line {note_import.lines_processed}"
+        )
+
+        importer = NoteImporter(
+            note_import, batch_size=options["batch_size"], on_batch=self.report_batch
+        )
+        try:
+            if options["path"] == "-":
+                importer.run(sys.stdin.buffer)
+            else:
+                with open(options["path"], "rb") as lines:
+                    importer.run(lines)
+        except (OSError, ImportConflict) as exc:
+            raise CommandError(exc)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {note_import.imported_count} notes, {note_import.error_count} lines "
+            f"failed"
+        ))
+
+    def get_import(self, options: dict) -> NoteImport:
+        if options["resume"]:
+            try:
+                return NoteImport.objects.get(pk=options["resume"])
+            except (NoteImport.DoesNotExist, ValidationError):
+                raise CommandError(f"Import {options['resume']} does not exist.")
+
+        if not options["user"]:
+            raise CommandError("--user is required for a new import.")
+        try:
+            creator = User.objects.get(username=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['user']} does not exist.")
+        return NoteImport.objects.create(creator=creator, name=options["path"])
+
+    def report_batch(self, note_import: NoteImport, errors: list[dict]) -> None:
+        for error in errors:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['errors'])}")
+        self.stdout.write(
+            f"line {note_import.lines_processed}: {note_import.imported_count} imported, "
+            f"{note_import.error_count} failed"
+        )
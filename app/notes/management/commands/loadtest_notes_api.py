@@ -0,0 +1,81 @@
+import asyncio
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+
+from notes.models import Tag
+from notes.tests.factories import NoteFactory, TagFactory
+from users.tests.factories import UserFactory
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test the sync (GET /notes/) and async (GET /notes/async/) notes list at high "
+        "concurrency, in process through the ASGI handler. List response caching is "
+        "disabled, so every request reaches the database. Test data is committed, as ASGI "
+        "requests run on other threads, and deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--notes", type=int, default=200, help="Notes of the user.")
+        parser.add_argument("--requests", type=int, default=1000, help="Requests per endpoint.")
+        parser.add_argument("--concurrency", type=int, default=100, help="Concurrent requests.")
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1 or options["requests"] < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+
+        user = UserFactory()
+        tags: list[Tag] = TagFactory.create_batch(5)
+        try:
+            NoteFactory.create_batch(options["notes"], creator=user, tags=tags)
+            token: Token = Token.objects.create(user=user)
+            with override_settings(ALLOWED_HOSTS=["testserver"], NOTES_CACHE_TIMEOUT=0):
+                for name in ("notes:notes-list", "notes:notes-async-list"):
+                    timings, elapsed = asyncio.run(self.load(
+                        reverse(name), token.key, options["requests"], options["concurrency"]
+                    ))
+                    self.report(name, timings, elapsed)
+        finally:
+            user.delete()
+            Tag.objects.filter(pk__in=[tag.pk for tag in tags]).delete()
+
+    @staticmethod
+    async def load(
+        url: str, token: str, requests: int, concurrency: int
+    ) -> tuple[list[float], float]:
+        """Send `requests` GETs with at most `concurrency` in flight at any time."""
+
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+        timings: list[float] = []
+
+        async def request() -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(url, authorization=f"Token {token}")
+                timings.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    raise CommandError(f"{url} returned {response.status_code}.")
+
+        # Warm up, so both endpoints start with the token lookup cached
+        await request()
+        timings.clear()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(request() for _ in range(requests)))
+        return timings, time.perf_counter() - start
+
+    def report(self, name: str, timings: list[float], elapsed: float) -> None:
+        percentiles: list[float] = statistics.quantiles(timings, n=100)
+        self.stdout.write(
+            f"{name:<24} {len(timings) / elapsed:8.1f} req/s  "
+            f"p50 {percentiles[49] * 1000:8.2f} ms  "
+            f"p95 {percentiles[94] * 1000:8.2f} ms  "
+            f"p99 {percentiles[98] * 1000:8.2f} ms"
+        )
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.retention import purge_deleted_notes
+
+
+class Command(BaseCommand):
+    help = (
+        "Permanently delete notes soft deleted more than --days ago and the tags no longer "
+        "linked to any note. Rows are deleted in batches with a short transaction each."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.NOTES_PURGE_RETENTION_DAYS,
+            help="Days soft deleted notes are kept for.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.NOTES_PURGE_BATCH_SIZE,
+            help="Rows deleted per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 0 or options["batch_size"] < 1:
+            raise CommandError("--days cannot be negative and --batch-size must be positive.")
+
+        purged: dict[str, int] = purge_deleted_notes(options["days"], options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Purged {purged['notes']} notes, {purged['tag_links']} tag links and "
+            f"{purged['tags']} orphaned tags ({purged['bytes']} bytes of titles and bodies)"
+        ))
@@ -0,0 +1,21 @@
+# Generated by Django 4.1.13 on 2026-10-17 20:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(condition=models.Q(('is_deleted', False), ('is_public', True)), fields=['-created_at', 'id'], name='note_public_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['creator', '-created_at', 'id'], name='note_creator_created_at_idx'),
+        ),
+    ]
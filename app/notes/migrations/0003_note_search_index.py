@@ -0,0 +1,74 @@
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    'CREATE TABLE "notes_note_fts_docs" ('
+    '"id" integer NOT NULL PRIMARY KEY AUTOINCREMENT, '
+    '"note_id" char(32) NOT NULL UNIQUE)',
+    'CREATE VIRTUAL TABLE "notes_note_fts" USING fts5(title, body)',
+    'CREATE TRIGGER "notes_note_fts_insert" AFTER INSERT ON "notes_note" '
+    'WHEN NOT new."is_deleted" BEGIN '
+    'INSERT INTO "notes_note_fts_docs" ("note_id") VALUES (new."id"); '
+    'INSERT INTO "notes_note_fts" ("rowid", "title", "body") '
+    'VALUES (last_insert_rowid(), new."title", new."body"); '
+    'END',
+    'CREATE TRIGGER "notes_note_fts_update" AFTER UPDATE OF "title", "body", "is_deleted" '
+    'ON "notes_note" BEGIN '
+    'INSERT OR IGNORE INTO "notes_note_fts_docs" ("note_id") VALUES (new."id"); '
+    'DELETE FROM "notes_note_fts" WHERE "rowid" = '
+    '(SELECT "id" FROM "notes_note_fts_docs" WHERE "note_id" = new."id"); '
+    'INSERT INTO "notes_note_fts" ("rowid", "title", "body") '
+    'SELECT "id", new."title", new."body" FROM "notes_note_fts_docs" '
+    'WHERE "note_id" = new."id" AND NOT new."is_deleted"; '
+    'END',
+    'CREATE TRIGGER "notes_note_fts_delete" AFTER DELETE ON "notes_note" BEGIN '
+    'DELETE FROM "notes_note_fts" WHERE "rowid" = '
+    '(SELECT "id" FROM "notes_note_fts_docs" WHERE "note_id" = old."id"); '
+    'DELETE FROM "notes_note_fts_docs" WHERE "note_id" = old."id"; '
+    'END',
+    'INSERT INTO "notes_note_fts_docs" ("note_id") '
+    'SELECT "id" FROM "notes_note" WHERE NOT "is_deleted"',
+    'INSERT INTO "notes_note_fts" ("rowid", "title", "body") '
+    'SELECT "notes_note_fts_docs"."id", "notes_note"."title", "notes_note"."body" '
+    'FROM "notes_note" INNER JOIN "notes_note_fts_docs" '
+    'ON "notes_note_fts_docs"."note_id" = "notes_note"."id"',
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER "notes_note_fts_delete"',
+    'DROP TRIGGER "notes_note_fts_update"',
+    'DROP TRIGGER "notes_note_fts_insert"',
+    'DROP TABLE "notes_note_fts"',
+    'DROP TABLE "notes_note_fts_docs"',
+]
+
+# Must match the expression built by `notes.search.PostgresSearchBackend`
+POSTGRESQL_FORWARD = [
+    'CREATE INDEX "notes_note_search_idx" ON "notes_note" USING GIN ('
+    "to_tsvector('english'::regconfig, "
+    "COALESCE(\"title\", '') || ' ' || COALESCE(\"body\", '')))",
+]
+
+POSTGRESQL_BACKWARD = [
+    'DROP INDEX "notes_note_search_idx"',
+]
+
+
+def run_statements(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0002_note_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_statements({"sqlite": SQLITE_FORWARD, "postgresql": POSTGRESQL_FORWARD}),
+            run_statements({"sqlite": SQLITE_BACKWARD, "postgresql": POSTGRESQL_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,68 @@
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+SQLITE_FORWARD = [
+    # Django's (i)startswith is a case insensitive `LIKE` on SQLite, which can only use a
+    # NOCASE index
+    'CREATE INDEX "notes_tag_title_prefix_idx" ON "notes_tag" ("title" COLLATE NOCASE)',
+]
+
+SQLITE_BACKWARD = [
+    'DROP INDEX "notes_tag_title_prefix_idx"',
+]
+
+# Must match the `UPPER(...) LIKE UPPER(...)` expression of Django's istartswith lookup
+POSTGRESQL_FORWARD = [
+    'CREATE INDEX "notes_tag_title_prefix_idx" ON "notes_tag" '
+    '(UPPER("title"::text) text_pattern_ops)',
+]
+
+POSTGRESQL_BACKWARD = [
+    'DROP INDEX "notes_tag_title_prefix_idx"',
+]
+
+
+def run_statements(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+def count_tag_notes(apps, schema_editor):
+    Tag = apps.get_model("notes", "Tag")
+    Through = apps.get_model("notes", "Note").tags.through
+    links = (
+        Through.objects.filter(tag_id=models.OuterRef("pk"), note__is_deleted=False)
+        .order_by()
+        .values("tag_id")
+        .annotate(count=models.Count("pk"))
+        .values("count")
+    )
+    Tag.objects.update(
+        note_count=Coalesce(models.Subquery(links), models.Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_note_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tag",
+            name="note_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="tag",
+            index=models.Index(fields=["-note_count", "id"], name="tag_note_count_idx"),
+        ),
+        migrations.RunPython(count_tag_notes, migrations.RunPython.noop),
+        migrations.RunPython(
+            run_statements({"sqlite": SQLITE_FORWARD, "postgresql": POSTGRESQL_FORWARD}),
+            run_statements({"sqlite": SQLITE_BACKWARD, "postgresql": POSTGRESQL_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-17 20:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0005_note_import'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(condition=models.Q(('is_deleted', True)), fields=['deleted_at'], name='note_deleted_at_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-17 21:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0006_note_deleted_at_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['creator', 'last_modified_at', 'id'], name='note_creator_modified_at_idx'),
+        ),
+    ]
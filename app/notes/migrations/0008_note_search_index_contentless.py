@@ -0,0 +1,73 @@
+import importlib
+
+from django.db import migrations
+
+search_index = importlib.import_module("notes.migrations.0003_note_search_index")
+
+# The index no longer keeps a copy of the titles and bodies. Rows of a contentless FTS5 table
+# are removed with the 'delete' command and the values they were indexed with, which are
+# those of the note before the change (only notes that are not deleted are indexed).
+# Bodies are read with `notes_text`, which decompresses the ones stored compressed. It is a
+# Python function registered on the connections opened by Django (see
+# `notes.fields.register_sqlite_functions`), so writes to the notes from other clients, such
+# as the sqlite3 shell, fail with "no such function: notes_text".
+SQLITE_FORWARD = [
+    'DROP TRIGGER "notes_note_fts_delete"',
+    'DROP TRIGGER "notes_note_fts_update"',
+    'DROP TRIGGER "notes_note_fts_insert"',
+    'DROP TABLE "notes_note_fts"',
+    'CREATE VIRTUAL TABLE "notes_note_fts" USING fts5(title, body, content=\'\')',
+    'CREATE TRIGGER "notes_note_fts_insert" AFTER INSERT ON "notes_note" '
+    'WHEN NOT new."is_deleted" BEGIN '
+    'INSERT INTO "notes_note_fts_docs" ("note_id") VALUES (new."id"); '
+    'INSERT INTO "notes_note_fts" ("rowid", "title", "body") '
+    'VALUES (last_insert_rowid(), new."title", notes_text(new."body")); '
+    'END',
+    'CREATE TRIGGER "notes_note_fts_update" AFTER UPDATE OF "title", "body", "is_deleted" '
+    'ON "notes_note" BEGIN '
+    'INSERT INTO "notes_note_fts" ("notes_note_fts", "rowid", "title", "body") '
+    'SELECT \'delete\', "id", old."title", notes_text(old."body") FROM "notes_note_fts_docs" '
+    'WHERE "note_id" = old."id" AND NOT old."is_deleted"; '
+    'INSERT OR IGNORE INTO "notes_note_fts_docs" ("note_id") VALUES (new."id"); '
+    'INSERT INTO "notes_note_fts" ("rowid", "title", "body") '
+    'SELECT "id", new."title", notes_text(new."body") FROM "notes_note_fts_docs" '
+    'WHERE "note_id" = new."id" AND NOT new."is_deleted"; '
+    'END',
+    'CREATE TRIGGER "notes_note_fts_delete" AFTER DELETE ON "notes_note" BEGIN '
+    'INSERT INTO "notes_note_fts" ("notes_note_fts", "rowid", "title", "body") '
+    'SELECT \'delete\', "id", old."title", notes_text(old."body") FROM "notes_note_fts_docs" '
+    'WHERE "note_id" = old."id" AND NOT old."is_deleted"; '
+    'DELETE FROM "notes_note_fts_docs" WHERE "note_id" = old."id"; '
+    'END',
+    'INSERT INTO "notes_note_fts" ("rowid", "title", "body") '
+    'SELECT "notes_note_fts_docs"."id", "notes_note"."title", notes_text("notes_note"."body") '
+    'FROM "notes_note" INNER JOIN "notes_note_fts_docs" '
+    'ON "notes_note_fts_docs"."note_id" = "notes_note"."id" '
+    'WHERE NOT "notes_note"."is_deleted"',
+]
+
+# The previous index reads the bodies as they are stored, so the compressed ones are
+# decompressed once the triggers are dropped.
+SQLITE_BACKWARD = [
+    'DROP TRIGGER "notes_note_fts_delete"',
+    'DROP TRIGGER "notes_note_fts_update"',
+    'DROP TRIGGER "notes_note_fts_insert"',
+    'DROP TABLE "notes_note_fts"',
+    'UPDATE "notes_note" SET "body" = notes_text("body") WHERE typeof("body") = \'blob\'',
+    'DELETE FROM "notes_note_fts_docs"',
+    *search_index.SQLITE_FORWARD[1:],
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0007_note_sync_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            search_index.run_statements({"sqlite": SQLITE_FORWARD}),
+            search_index.run_statements({"sqlite": SQLITE_BACKWARD}),
+        ),
+    ]
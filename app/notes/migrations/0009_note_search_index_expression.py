@@ -0,0 +1,53 @@
+import importlib
+
+from django.db import migrations
+
+search_index = importlib.import_module("notes.migrations.0003_note_search_index")
+
+
+def get_search_index():
+    """
+    The GIN index of the search vector, the same expression as
+    `PostgresSearchBackend.get_vector` at the time of this migration. It is inlined, so
+    replaying the migration always creates the same schema.
+    """
+
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    return GinIndex(
+        SearchVector("title", "body", config="english"), name="notes_note_search_idx"
+    )
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Replace the hand written PostgreSQL search index with one built by `SearchVector`, so
+    the index matches the search queries.
+    """
+
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute(search_index.POSTGRESQL_BACKWARD[0])
+    schema_editor.add_index(apps.get_model("notes", "Note"), get_search_index())
+
+
+def restore_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.remove_index(apps.get_model("notes", "Note"), get_search_index())
+    for statement in search_index.POSTGRESQL_FORWARD:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0008_note_search_index_contentless'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, restore_search_index),
+    ]
@@ -1,11 +1,174 @@
 import uuid
+from collections import Counter
+from collections.abc import Iterable, Mapping
 
 from django.conf import settings
-from django.db import models
+from django.db import connections, models, transaction
 from django.utils import timezone
 
+from .fields import CompressedTextField
+from .signals import notes_bulk_saved, notes_restored, notes_soft_deleted
 
-class ActiveNoteManager(models.Manager):
+
+def delete_rows(queryset: models.QuerySet) -> int:
+    """
+    Delete the rows of the queryset with a single DELETE query and return their number.
+    Unlike `QuerySet.delete()`, the rows are neither loaded nor sent delete signals, for
+    bulk deletes of rows that no receiver needs to know about.
+    """
+
+    connection = connections[queryset.db]
+    opts = queryset.model._meta
+    sql, params = queryset.values("pk").query.get_compiler(queryset.db).as_sql()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {connection.ops.quote_name(opts.db_table)} "
+            f"WHERE {connection.ops.quote_name(opts.pk.column)} IN ({sql})",
+            params,
+        )
+        return cursor.rowcount
+
+
+class OctetLength(models.Func):
+    """Size of a text value in bytes."""
+
+    function = "OCTET_LENGTH"
+    output_field = models.PositiveBigIntegerField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection, template="LENGTH(CAST(%(expressions)s AS BLOB))", **extra_context
+        )
+
+
+class NoteQuerySet(models.QuerySet):
+    """QuerySet for Note model."""
+
+    def bulk_create(self, objs, *args, **kwargs) -> list["Note"]:
+        """Bulk create notes and send `notes_bulk_saved`."""
+
+        notes: list[Note] = super().bulk_create(objs, *args, **kwargs)
+        notes_bulk_saved.send(sender=self.model, notes=notes)
+        return notes
+
+    def bulk_update(self, objs, fields, *args, **kwargs) -> int:
+        """Bulk update notes and send `notes_bulk_saved`."""
+
+        objs = list(objs)
+        updated: int = super().bulk_update(objs, fields, *args, **kwargs)
+        notes_bulk_saved.send(sender=self.model, notes=objs)
+        return updated
+
+    def soft_delete(self) -> int:
+        """
+        Soft delete all the notes of the queryset with a single UPDATE query and send
+        `notes_soft_deleted` with the affected notes.
+        """
+
+        with transaction.atomic(using=self.db):
+            notes: list[Note] = list(
+                self.filter(is_deleted=False).select_for_update(of=("self",))
+                .only("id", "creator_id", "is_public")
+            )
+            if not notes:
+                return 0
+
+            # The notes are locked, except on SQLite where another transaction may soft
+            # delete some of them until the UPDATE, which then blocks every other writer. So
+            # the UPDATE checks again that they are active, and the tag counts only change
+            # for the notes it did change (the ones deleted at `now`).
+            now = timezone.now()
+            note_ids: list[uuid.UUID] = [note.pk for note in notes]
+            updated: int = self.model.objects.filter(pk__in=note_ids, is_deleted=False).update(
+                is_deleted=True, deleted_at=now, last_modified_at=now
+            )
+            if updated < len(notes):
+                changed: set[uuid.UUID] = set(
+                    self.model.objects.filter(pk__in=note_ids, deleted_at=now)
+                    .values_list("pk", flat=True)
+                )
+                notes = [note for note in notes if note.pk in changed]
+            Tag.objects.remove_notes_from_counts([note.pk for note in notes])
+        notes_soft_deleted.send(sender=self.model, notes=notes)
+        return updated
+
+    def restore(self) -> int:
+        """
+        Restore all the soft deleted notes of the queryset with a single UPDATE query and
+        send `notes_restored` with the affected notes.
+        """
+
+        with transaction.atomic(using=self.db):
+            notes: list[Note] = list(
+                self.filter(is_deleted=True).select_for_update(of=("self",))
+                .only("id", "creator_id", "is_public")
+            )
+            if not notes:
+                return 0
+
+            # Same as `soft_delete`, the tag counts only change for the notes restored by
+            # the UPDATE (the ones modified at `now`)
+            now = timezone.now()
+            note_ids: list[uuid.UUID] = [note.pk for note in notes]
+            updated: int = self.model.objects.filter(pk__in=note_ids, is_deleted=True).update(
+                is_deleted=False, deleted_at=None, last_modified_at=now
+            )
+            if updated < len(notes):
+                changed: set[uuid.UUID] = set(
+                    self.model.objects.filter(
+                        pk__in=note_ids, is_deleted=False, last_modified_at=now
+                    ).values_list("pk", flat=True)
+                )
+                notes = [note for note in notes if note.pk in changed]
+            Tag.objects.add_notes_to_counts([note.pk for note in notes])
+        notes_restored.send(sender=self.model, notes=notes)
+        return updated
+
+    def touch(self) -> int:
+        """
+        Mark the active notes of the queryset as modified with a single UPDATE query, for
+        changes to the tags or creators embedded in their representation. This changes
+        their validators and brings them back in the sync feed.
+        """
+
+        return self.filter(is_deleted=False).update(last_modified_at=timezone.now())
+
+    def purge(self, batch_size: int = 1000) -> dict[str, int]:
+        """
+        Permanently delete the soft deleted notes of the queryset and their tag links, in
+        batches of `batch_size` notes with a short transaction each, so locks are never
+        held for long. Returns the number of deleted notes and tag links and the size of
+        the deleted titles and bodies in bytes.
+        """
+
+        purged: dict[str, int] = {"notes": 0, "tag_links": 0, "bytes": 0}
+        purgeable: NoteQuerySet = self.filter(is_deleted=True)
+        batches = purgeable.select_for_update().order_by().annotate(
+            size=OctetLength("title") + OctetLength("body")
+        ).values_list("pk", "size")
+        while True:
+            with transaction.atomic(using=self.db):
+                batch: list[tuple[uuid.UUID, int]] = list(batches[:batch_size])
+                if not batch:
+                    return purged
+
+                # The batch is locked, except on SQLite where a note can still be restored
+                # until the first write of the transaction, which then blocks every other
+                # writer. So both deletes check again that the notes are purgeable.
+                notes: NoteQuerySet = purgeable.filter(pk__in=[note_id for note_id, _ in batch])
+                purged["tag_links"] += delete_rows(
+                    Note.tags.through.objects.using(self.db).filter(
+                        note_id__in=notes.values("pk")
+                    )
+                )
+                # Soft deleted notes are no longer part of any cached list or tag count,
+                # so the per instance delete signals (and the query loading the instances
+                # for them) are skipped
+                purged["notes"] += delete_rows(notes)
+                purged["bytes"] += sum(size for _, size in batch)
+
+
+class ActiveNoteManager(models.Manager.from_queryset(NoteQuerySet)):
     """Manager to manage all the active (non-deleted) notes."""
 
     def get_queryset(self) -> models.QuerySet:
@@ -14,6 +177,92 @@ class ActiveNoteManager(models.Manager):
         return super().get_queryset().filter(is_deleted=False)
 
 
+class TagManager(models.Manager):
+    """Manager for Tag model."""
+
+    batch_size = 500
+
+    def get_or_create_by_titles(self, titles: Iterable[str]) -> dict[str, "Tag"]:
+        """
+        Fetch the tags with the given titles, creating the missing ones, and return them
+        mapped by title. Uses a constant number of queries regardless of the tag count.
+
+        Missing tags are inserted with `ignore_conflicts` and read back afterwards, so
+        concurrent requests creating the same tag still end up with a single row.
+        """
+
+        titles = set(titles)
+        if not titles:
+            return {}
+
+        tags: dict[str, Tag] = {tag.title: tag for tag in self.filter(title__in=titles)}
+        missing: set[str] = titles - tags.keys()
+        if missing:
+            self.bulk_create([Tag(title=title) for title in missing], ignore_conflicts=True)
+            tags.update((tag.title, tag) for tag in self.filter(title__in=missing))
+        return tags
+
+    def update_note_counts(self, deltas: Mapping[uuid.UUID, int]) -> None:
+        """Add the given deltas to the `note_count` of the tags, one UPDATE per batch."""
+
+        deltas = {tag_id: delta for tag_id, delta in deltas.items() if delta}
+        tag_ids: list[uuid.UUID] = list(deltas)
+        for start in range(0, len(tag_ids), self.batch_size):
+            batch: list[uuid.UUID] = tag_ids[start:start + self.batch_size]
+            delta = models.Case(
+                *(models.When(pk=tag_id, then=models.Value(deltas[tag_id])) for tag_id in batch),
+                default=models.Value(0),
+            )
+            self.filter(pk__in=batch).update(note_count=models.F("note_count") + delta)
+
+    def count_note_links(self, note_ids: list[uuid.UUID]) -> Counter[uuid.UUID]:
+        """Return the number of the given notes linked to each tag."""
+
+        links: Counter[uuid.UUID] = Counter()
+        for start in range(0, len(note_ids), self.batch_size):
+            links.update(
+                Note.tags.through.objects.filter(
+                    note_id__in=note_ids[start:start + self.batch_size]
+                ).values_list("tag_id", flat=True)
+            )
+        return links
+
+    def add_notes_to_counts(self, note_ids: list[uuid.UUID]) -> None:
+        """Increment the `note_count` of the tags of notes that are active again."""
+
+        self.update_note_counts(self.count_note_links(note_ids))
+
+    def remove_notes_from_counts(self, note_ids: list[uuid.UUID]) -> None:
+        """Decrement the `note_count` of the tags of notes that are no longer active."""
+
+        links: Counter[uuid.UUID] = self.count_note_links(note_ids)
+        self.update_note_counts({tag_id: -count for tag_id, count in links.items()})
+
+    def purge_orphans(self, batch_size: int = 1000) -> dict[str, int]:
+        """
+        Delete the tags that are not linked to any note, active or soft deleted, in
+        batches. Returns the number of deleted tags and the size of their titles in bytes.
+        """
+
+        purged: dict[str, int] = {"tags": 0, "bytes": 0}
+        orphans: models.QuerySet = self.filter(note_count=0).exclude(
+            models.Exists(Note.tags.through.objects.filter(tag_id=models.OuterRef("pk")))
+        )
+        batches = orphans.order_by().annotate(size=OctetLength("title")).values_list("pk", "size")
+        while True:
+            with transaction.atomic(using=self.db):
+                batch: list[tuple[uuid.UUID, int]] = list(batches[:batch_size])
+                if not batch:
+                    return purged
+
+                # Orphans are checked again by the DELETE, in case a note was tagged since.
+                # Unlinked tags are not part of any cached response either.
+                purged["tags"] += delete_rows(
+                    orphans.filter(pk__in=[tag_id for tag_id, _ in batch])
+                )
+                purged["bytes"] += sum(size for _, size in batch)
+
+
 class Note(models.Model):
     """Represent a note with all the information including a creator user."""
 
@@ -22,7 +271,7 @@ class Note(models.Model):
         settings.AUTH_USER_MODEL, related_name="notes", on_delete=models.CASCADE
     )
     title = models.CharField(max_length=100)
-    body = models.TextField()
+    body = CompressedTextField()
     tags = models.ManyToManyField(to="notes.Tag", related_name="notes")
     is_public = models.BooleanField(default=False)
     is_deleted = models.BooleanField(default=False)
@@ -31,30 +280,119 @@ class Note(models.Model):
     last_modified_at = models.DateTimeField(auto_now=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
 
-    objects = models.Manager()
+    objects = NoteQuerySet.as_manager()
     active_objects = ActiveNoteManager()
 
+    class Meta:
+        indexes = [
+            # Access paths of the notes list: public notes and the notes of the requesting
+            # user, both ordered by `-created_at` with `id` as the pagination tiebreaker.
+            models.Index(
+                fields=["-created_at", "id"],
+                condition=models.Q(is_deleted=False, is_public=True),
+                name="note_public_created_at_idx",
+            ),
+            models.Index(
+                fields=["creator", "-created_at", "id"],
+                condition=models.Q(is_deleted=False),
+                name="note_creator_created_at_idx",
+            ),
+            # Changes of the notes of a user in the sync feed, tombstones included
+            models.Index(
+                fields=["creator", "last_modified_at", "id"],
+                name="note_creator_modified_at_idx",
+            ),
+            # Soft deleted notes due to be purged, see `NoteQuerySet.purge`
+            models.Index(
+                fields=["deleted_at"],
+                condition=models.Q(is_deleted=True),
+                name="note_deleted_at_idx",
+            ),
+        ]
+
     def __str__(self) -> str:
         return f"{self.title} - {self.created_at}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values) -> "Note":
+        """Remember the loaded visibility, so changing it can be detected on save."""
+
+        instance: Note = super().from_db(db, field_names, values)
+        instance._loaded_is_public = instance.__dict__.get("is_public")
+        return instance
+
     def update_note_tags(self, tags: list[dict] | set[dict]) -> None:
         """
         Set the given tags to the note. Any tags not included in the `tags` arg are
         removed from the instance.
         """
 
-        selected_tags: set[Tag] = set()
-        for tag in tags:
-            selected_tag, _ = Tag.objects.get_or_create(**tag)
-            selected_tags.add(selected_tag)
-        self.tags.set(selected_tags)
+        selected_tags = Tag.objects.get_or_create_by_titles(tag["title"] for tag in tags)
+        # `set` diffs against the current links and only inserts/deletes the changes
+        self.tags.set(selected_tags.values())
+
+    @classmethod
+    def bulk_update_note_tags(cls, tags_by_note: dict["Note", Iterable[dict]]) -> None:
+        """
+        Batched version of `update_note_tags` for several notes. All tags are resolved at
+        once and only the changed links are deleted and inserted, using a constant number
+        of queries regardless of the note and tag count.
+        """
+
+        if not tags_by_note:
+            return
+
+        tags: dict[str, Tag] = Tag.objects.get_or_create_by_titles(
+            tag["title"] for note_tags in tags_by_note.values() for tag in note_tags
+        )
+        selected_links: set[tuple[uuid.UUID, uuid.UUID]] = {
+            (note.pk, tags[tag["title"]].pk)
+            for note, note_tags in tags_by_note.items()
+            for tag in note_tags
+        }
+
+        through = cls.tags.through
+        current_links: set[tuple[uuid.UUID, uuid.UUID]] = set(
+            through.objects.filter(note_id__in=[note.pk for note in tags_by_note])
+            .values_list("note_id", "tag_id")
+        )
+
+        removed_tags: dict[uuid.UUID, set[uuid.UUID]] = {}
+        for note_id, tag_id in current_links - selected_links:
+            removed_tags.setdefault(note_id, set()).add(tag_id)
+        if removed_tags:
+            query = models.Q()
+            for note_id, tag_ids in removed_tags.items():
+                query |= models.Q(note_id=note_id, tag_id__in=tag_ids)
+            through.objects.filter(query).delete()
+
+        added_links = selected_links - current_links
+        if added_links:
+            through.objects.bulk_create(
+                [through(note_id=note_id, tag_id=tag_id) for note_id, tag_id in added_links],
+                ignore_conflicts=True,
+            )
+
+        # Links are diffed here rather than with `m2m_changed`, so the counts are as well
+        deleted_note_ids: set[uuid.UUID] = {note.pk for note in tags_by_note if note.is_deleted}
+        deltas: Counter[uuid.UUID] = Counter()
+        for note_id, tag_id in added_links:
+            if note_id not in deleted_note_ids:
+                deltas[tag_id] += 1
+        for note_id, tag_ids in removed_tags.items():
+            if note_id not in deleted_note_ids:
+                deltas.subtract(tag_ids)
+        Tag.objects.update_note_counts(deltas)
 
     def soft_delete(self) -> None:
         """Soft delete and add the time of deletion."""
 
+        was_deleted: bool = self.is_deleted
         self.is_deleted = True
         self.deleted_at = timezone.now()
-        self.save()
+        self.save(update_fields=["is_deleted", "deleted_at", "last_modified_at"])
+        if not was_deleted:
+            Tag.objects.remove_notes_from_counts([self.pk])
 
 
 class Tag(models.Model):
@@ -62,6 +400,60 @@ class Tag(models.Model):
 
     id = models.UUIDField(default=uuid.uuid4, primary_key=True, editable=False)
     title = models.CharField(max_length=30, unique=True)
+    # Number of active notes linked to the tag, kept up to date incrementally by the tag
+    # link and soft delete hooks instead of being counted on read.
+    note_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = TagManager()
+
+    class Meta:
+        indexes = [
+            # Tags by popularity, with `id` as the pagination tiebreaker. Prefix search on
+            # the title has a case insensitive index created in the migrations.
+            models.Index(fields=["-note_count", "id"], name="tag_note_count_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.title
+
+    @classmethod
+    def from_db(cls, db, field_names, values) -> "Tag":
+        """Remember the loaded title, so renames can be detected on save."""
+
+        instance: Tag = super().from_db(db, field_names, values)
+        instance._loaded_title = instance.__dict__.get("title")
+        return instance
+
+    def save(self, *args, update_fields=None, **kwargs) -> None:
+        """Never overwrite the incrementally maintained `note_count` with a stale value."""
+
+        if not self._state.adding and update_fields is None:
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "note_count"
+            ]
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+
+class NoteImport(models.Model):
+    """
+    Progress of an NDJSON import of notes. `lines_processed` is the checkpoint, it is
+    updated in the same transaction as each imported batch, so an interrupted import can be
+    resumed from it without importing any line twice.
+    """
+
+    id = models.UUIDField(default=uuid.uuid4, primary_key=True, editable=False)
+    creator = models.ForeignKey(
+        settings.AUTH_USER_MODEL, related_name="note_imports", on_delete=models.CASCADE
+    )
+    name = models.CharField(max_length=255, blank=True)
+    lines_processed = models.PositiveBigIntegerField(default=0)
+    imported_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_modified_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"{self.name or self.pk} - {self.lines_processed} lines"
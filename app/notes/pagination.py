@@ -0,0 +1,333 @@
+import base64
+import binascii
+import datetime
+import json
+import uuid
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Field, Model, Q, QuerySet
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class OrderingKey(NamedTuple):
+    name: str
+    attname: str
+    field: Field
+    descending: bool
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginate by seeking past the boundary row of the previous page instead of using OFFSET.
+
+    The ordering already applied to the queryset (by `OrderingFilter`, the search rank or
+    the view default) is extended with `id` as a tiebreaker, so every row has a unique
+    position. Cursors hold the ordering values of the boundary row, which makes deep pages
+    as cheap as the first one and no `COUNT(*)` query is needed.
+
+    Views may split the queryset into disjoint branches with `split_queryset()`, e.g. one
+    per index able to return its rows in order. The page is then read from a UNION ALL of
+    the branches, which the database merges without sorting the rows.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    ordering = "-created_at"
+    tiebreaker = "id"
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> list[Model]:
+        return self.set_page(list(self.get_page_queryset(queryset, request, view)))
+
+    async def apaginate_queryset(self, queryset: QuerySet, request, view=None) -> list[Model]:
+        """Async version of `paginate_queryset`."""
+
+        page_queryset: QuerySet = self.get_page_queryset(queryset, request, view)
+        return self.set_page([row async for row in page_queryset.aiterator()])
+
+    def get_page_queryset(self, queryset: QuerySet, request, view=None) -> QuerySet:
+        """Return the queryset of the requested page, with one extra row to detect more."""
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.keys: list[OrderingKey] = self.get_ordering_keys(queryset)
+
+        self.position, self.reverse = self.decode_cursor(request)
+        queryset = queryset.order_by(*self.get_order_by())
+        # The rows of `.values()` querysets must hold the ordering keys of the cursors
+        if queryset._fields:
+            missing: list[str] = [
+                key.attname for key in self.keys if key.attname not in queryset._fields
+            ]
+            if missing:
+                queryset = queryset.values(*queryset._fields, *missing)
+        if self.position is not None:
+            queryset = queryset.filter(self.get_seek_filter(self.position))
+        return self.combine_branches(queryset, view)[:self.page_size + 1]
+
+    def combine_branches(self, queryset: QuerySet, view=None) -> QuerySet:
+        """Combine the branches the view splits the queryset into, if any, with UNION ALL."""
+
+        split_queryset = getattr(view, "split_queryset", None)
+        if split_queryset is None:
+            return queryset
+        branches: list[QuerySet] = [branch.order_by() for branch in split_queryset(queryset)]
+        if len(branches) < 2:
+            return queryset
+        return branches[0].union(*branches[1:], all=True).order_by(*self.get_order_by())
+
+    def set_page(self, results: list[Model]) -> list[Model]:
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_previous, self.has_next = has_more, self.position is not None
+        else:
+            self.has_previous, self.has_next = self.position is not None, has_more
+        return self.page
+
+    def get_paginated_response(self, data) -> Response:
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_ordering_keys(self, queryset: QuerySet) -> list[OrderingKey]:
+        """
+        Resolve the queryset ordering into keys ending with the tiebreaker field. Model
+        fields and annotations (e.g. a search rank) can be used as keys.
+        """
+
+        ordering: tuple[str, ...] = tuple(queryset.query.order_by) or (self.ordering,)
+        opts = queryset.model._meta
+        keys: list[OrderingKey] = []
+        for item in ordering:
+            if not isinstance(item, str):
+                raise ValueError("Keyset pagination only supports ordering by field names.")
+            name = item.lstrip("-")
+            descending = item.startswith("-")
+            if name in queryset.query.annotations:
+                field = queryset.query.annotations[name].output_field
+                keys.append(OrderingKey(name, name, field, descending))
+                continue
+            try:
+                field = opts.pk if name == "pk" else opts.get_field(name)
+            except FieldDoesNotExist:
+                raise ValueError(f"Keyset pagination cannot order by `{item}`.")
+            keys.append(OrderingKey(field.name, field.attname, field, descending))
+
+        if all(key.name != self.tiebreaker for key in keys):
+            field = opts.get_field(self.tiebreaker)
+            keys.append(OrderingKey(field.name, field.attname, field, False))
+        return keys
+
+    def get_order_by(self) -> list[str]:
+        """Return the `order_by` arguments for the requested direction."""
+
+        return [
+            f"-{key.name}" if key.descending != self.reverse else key.name for key in self.keys
+        ]
+
+    def get_seek_filter(self, position: list) -> Q:
+        """
+        Build the lexicographic "comes after `position`" condition for the ordering keys,
+        e.g. `created_at < x OR (created_at = x AND id > y)`.
+        """
+
+        condition, equal = Q(), Q()
+        for key, value in zip(self.keys, position):
+            lookup = "lt" if key.descending != self.reverse else "gt"
+            condition |= equal & Q(**{f"{key.name}__{lookup}": value})
+            equal &= Q(**{key.name: value})
+        return condition
+
+    def get_signature(self) -> list[str]:
+        return [f"-{key.name}" if key.descending else key.name for key in self.keys]
+
+    def encode_cursor(self, instance: Model | dict, reverse: bool) -> str:
+        """
+        Return the url for the page before or after the given boundary instance, or
+        row of a `.values()` queryset.
+        """
+
+        position = [
+            self.to_cursor_value(
+                instance[key.attname] if isinstance(instance, dict)
+                else getattr(instance, key.attname)
+            )
+            for key in self.keys
+        ]
+        payload = json.dumps(
+            {"o": self.get_signature(), "p": position, "r": reverse}, separators=(",", ":")
+        )
+        encoded = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request) -> tuple[list | None, bool]:
+        """Return the boundary position and direction stored in the request cursor."""
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            if payload["o"] != self.get_signature() or len(payload["p"]) != len(self.keys):
+                raise ValueError
+            position = [
+                key.field.to_python(value) for key, value in zip(self.keys, payload["p"])
+            ]
+            return position, bool(payload["r"])
+        except (
+            binascii.Error, UnicodeDecodeError, KeyError, TypeError, ValueError, ValidationError
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def to_cursor_value(value):
+        """Convert a field value to a lossless JSON serializable value."""
+
+        if isinstance(value, (datetime.datetime, datetime.date)):
+            return value.isoformat()
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return value
+
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "The cursor is older than the retention of deleted notes, resync all notes."
+    default_code = "cursor_expired"
+
+
+class SyncPagination(KeysetPagination):
+    """
+    Keyset pagination of the notes sync feed, oldest change first. The `next` cursor is
+    returned on every page, the last one included, for clients to store and resume from on
+    their next sync. Cursors older than `NOTES_PURGE_RETENTION_DAYS` are rejected, since the
+    tombstones of the notes purged in the meantime are gone.
+    """
+
+    ordering = "last_modified_at"
+    page_size = 500
+
+    def decode_cursor(self, request) -> tuple[list | None, bool]:
+        position, reverse = super().decode_cursor(request)
+        if reverse:
+            raise NotFound(self.invalid_cursor_message)
+        retention = datetime.timedelta(days=settings.NOTES_PURGE_RETENTION_DAYS)
+        if position is not None and position[0] < timezone.now() - retention:
+            raise CursorExpired()
+        return position, reverse
+
+    def get_next_link(self) -> str:
+        # Without new changes, the client syncs from the same cursor next time
+        if not self.page:
+            return self.base_url
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_paginated_response(self, data) -> Response:
+        return Response({
+            "next": self.get_next_link(),
+            "has_more": self.has_next,
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "format": "uri"},
+                "has_more": {"type": "boolean"},
+                "results": schema,
+            },
+        }
+
+
+class TagPagination(KeysetPagination):
+    """Keyset pagination of tags, most used first by default."""
+
+    ordering = "-note_count"
+
+
+class NotePagination(PageNumberPagination):
+    """
+    Page number pagination by default. Switches to keyset pagination when the `cursor`
+    query param is present; an empty `cursor` requests the first page.
+    """
+
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> list[Model] | None:
+        self.keyset_paginator = None
+        if self.keyset_pagination_class.cursor_query_param in request.query_params:
+            self.keyset_paginator = self.keyset_pagination_class()
+            return self.keyset_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(
+        self, queryset: QuerySet, request, view=None
+    ) -> list[Model] | None:
+        """
+        Async version of `paginate_queryset`. Mirrors `PageNumberPagination`, with the
+        count and the page rows fetched asynchronously.
+        """
+
+        self.keyset_paginator = None
+        if self.keyset_pagination_class.cursor_query_param in request.query_params:
+            self.keyset_paginator = self.keyset_pagination_class()
+            return await self.keyset_paginator.apaginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size: int | None = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # `Paginator.count` is a cached property, the page lookup below uses this value
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(
+                self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            )
+        self.page.object_list = [row async for row in self.page.object_list.aiterator()]
+        return list(self.page)
+
+    def get_paginated_response(self, data) -> Response:
+        if self.keyset_paginator is not None:
+            return self.keyset_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -4,7 +4,7 @@ from rest_framework import permissions
 class IsCreatorOrReadOnly(permissions.IsAuthenticatedOrReadOnly):
     """
     Object-level permission to only allow the creator of an object to edit it.
-    Assumes the model instance has an `creator` attribute.
+    Assumes the model instance has a `creator` foreign key.
     """
 
     def has_object_permission(self, request, view, obj) -> bool:
@@ -16,4 +16,5 @@ class IsCreatorOrReadOnly(permissions.IsAuthenticatedOrReadOnly):
         if request.method in permissions.SAFE_METHODS:
             return True
 
-        return obj.creator == request.user
+        # The creator is not always loaded, e.g. for sparse fieldsets without it
+        return obj.creator_id == request.user.pk
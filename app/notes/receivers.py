@@ -0,0 +1,135 @@
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import cache
+from .fields import register_sqlite_functions
+from .models import Note, Tag
+from .signals import notes_bulk_saved, notes_restored, notes_soft_deleted
+
+
+@receiver(connection_created)
+def register_notes_sqlite_functions(sender, connection, **kwargs) -> None:
+    if connection.vendor == "sqlite":
+        register_sqlite_functions(connection.connection)
+
+
+def get_note_groups(notes: list[Note]) -> set[str]:
+    """Return the cache groups of the note lists the given notes appear in."""
+
+    groups: set[str] = set()
+    for note in notes:
+        groups.add(cache.get_user_notes_group(note.creator_id))
+        if note.is_public or getattr(note, "_loaded_is_public", False):
+            groups.add(cache.PUBLIC_NOTES)
+    return groups
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+def invalidate_note_cache(sender, instance: Note, **kwargs) -> None:
+    cache.invalidate(get_note_groups([instance]))
+    instance._loaded_is_public = instance.is_public
+
+
+@receiver(notes_bulk_saved, sender=Note)
+@receiver(notes_soft_deleted, sender=Note)
+@receiver(notes_restored, sender=Note)
+def invalidate_notes_cache(sender, notes: list[Note], **kwargs) -> None:
+    cache.invalidate(get_note_groups(notes))
+
+
+@receiver(post_delete, sender=Tag)
+def invalidate_tag_cache(sender, instance: Tag, **kwargs) -> None:
+    cache.invalidate([cache.ALL_NOTES])
+
+
+@receiver(post_save, sender=Tag)
+def touch_renamed_tag_notes(sender, instance: Tag, created: bool, **kwargs) -> None:
+    """
+    Tag titles are part of the notes, renaming a tag modifies the notes linked to it. Saving
+    a tag without renaming it (or creating one, which is not linked to any note yet) does
+    not change any note.
+    """
+
+    if not created and instance.title != getattr(instance, "_loaded_title", instance.title):
+        Note.objects.filter(tags=instance).touch()
+        cache.invalidate([cache.ALL_NOTES])
+    instance._loaded_title = instance.title
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def touch_renamed_creator_notes(sender, instance, created: bool, **kwargs) -> None:
+    """Usernames are part of the notes, renaming a user modifies the notes they created."""
+
+    loaded_username: str = getattr(instance, "_loaded_username", instance.username)
+    if not created and instance.username != loaded_username:
+        Note.objects.filter(creator_id=instance.pk).touch()
+        cache.invalidate([cache.ALL_NOTES])
+    instance._loaded_username = instance.username
+
+
+@receiver(m2m_changed, sender=Note.tags.through)
+def invalidate_note_tags_cache(sender, instance, action: str, reverse: bool, **kwargs) -> None:
+    if not action.startswith("post_"):
+        return
+
+    if reverse:
+        cache.invalidate([cache.ALL_NOTES])
+    else:
+        cache.invalidate(get_note_groups([instance]))
+
+
+def count_active_tag_links(
+    instance: Note | Tag, reverse: bool, pk_set: set | None
+) -> Counter[uuid.UUID]:
+    """
+    Count the links between the instance and the `pk_set` objects (all of them if `None`)
+    that belong to active notes, per tag.
+    """
+
+    if not reverse:
+        if instance.is_deleted:
+            return Counter()
+        links: QuerySet = Note.tags.through.objects.filter(note_id=instance.pk)
+        if pk_set is not None:
+            links = links.filter(tag_id__in=pk_set)
+    else:
+        links = Note.tags.through.objects.filter(tag_id=instance.pk, note__is_deleted=False)
+        if pk_set is not None:
+            links = links.filter(note_id__in=pk_set)
+    return Counter(links.values_list("tag_id", flat=True))
+
+
+@receiver(m2m_changed, sender=Note.tags.through)
+def update_tag_note_counts(
+    sender, instance: Note | Tag, action: str, reverse: bool, pk_set: set | None, **kwargs
+) -> None:
+    """
+    Keep `Tag.note_count` in line with the links of active notes. The links about to be
+    removed are counted before the removal, as `pk_set` may hold unlinked objects.
+    """
+
+    if action in ("pre_remove", "pre_clear"):
+        instance._removed_tag_links = count_active_tag_links(instance, reverse, pk_set)
+    elif action in ("post_remove", "post_clear"):
+        removed: Counter[uuid.UUID] = instance.__dict__.pop("_removed_tag_links", Counter())
+        Tag.objects.update_note_counts({tag_id: -count for tag_id, count in removed.items()})
+    elif action == "post_add" and pk_set:
+        # `pk_set` only holds the newly linked objects on add
+        if not reverse and not instance.is_deleted:
+            Tag.objects.update_note_counts(dict.fromkeys(pk_set, 1))
+        elif reverse:
+            Tag.objects.update_note_counts(count_active_tag_links(instance, reverse, pk_set))
+
+
+@receiver(pre_delete, sender=Note)
+def remove_deleted_note_from_tag_counts(sender, instance: Note, **kwargs) -> None:
+    # The links of a deleted note are removed without `m2m_changed`
+    if not instance.is_deleted:
+        Tag.objects.remove_notes_from_counts([instance.pk])
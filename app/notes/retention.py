@@ -0,0 +1,30 @@
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Note, Tag
+
+
+def purge_deleted_notes(
+    retention_days: int | None = None, batch_size: int | None = None
+) -> dict[str, int]:
+    """
+    Permanently delete the notes soft deleted more than `retention_days` ago, then the
+    tags no longer linked to any note, and return what was reclaimed.
+
+    This is the hook for schedulers: run it periodically from a task queue or with
+    `python manage.py purge_deleted_notes` from cron. The defaults come from the
+    `NOTES_PURGE_RETENTION_DAYS` and `NOTES_PURGE_BATCH_SIZE` settings.
+    """
+
+    if retention_days is None:
+        retention_days = settings.NOTES_PURGE_RETENTION_DAYS
+    batch_size = batch_size or settings.NOTES_PURGE_BATCH_SIZE
+
+    cutoff: datetime.datetime = timezone.now() - datetime.timedelta(days=retention_days)
+    purged: dict[str, int] = Note.objects.filter(deleted_at__lt=cutoff).purge(batch_size)
+    purged_tags: dict[str, int] = Tag.objects.purge_orphans(batch_size)
+    purged["tags"] = purged_tags["tags"]
+    purged["bytes"] += purged_tags["bytes"]
+    return purged
@@ -0,0 +1,133 @@
+from django.conf import settings
+from django.db.models import FloatField, Q, QuerySet, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+
+class BaseSearchBackend:
+    """
+    Full text search over note titles and bodies.
+
+    The search index is kept up to date by the database itself (triggers or expression
+    indexes created in the migrations), so every write path including bulk operations
+    and soft deletes is reflected without any application level hooks.
+    """
+
+    rank_annotation = "search_rank"
+    rank_ordering: str
+
+    def search(self, queryset: QuerySet, terms: list[str]) -> QuerySet:
+        """
+        Filter the queryset down to the notes matching all the search terms, annotated
+        with `search_rank` and ordered by relevance.
+        """
+
+        raise NotImplementedError("`search()` must be implemented.")
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """
+    Search backed by the `notes_note_fts` FTS5 table. Its rowids are mapped to notes by
+    `notes_note_fts_docs`, as notes have no integer primary key. Results are ranked with
+    `bm25`, matches in the title weigh more than matches in the body.
+    """
+
+    rank_ordering = "search_rank"
+    title_weight = 4.0
+    body_weight = 1.0
+
+    match_sql = (
+        'SELECT "notes_note_fts_docs"."note_id" FROM "notes_note_fts" '
+        'INNER JOIN "notes_note_fts_docs" '
+        'ON "notes_note_fts_docs"."id" = "notes_note_fts"."rowid" '
+        'WHERE "notes_note_fts" MATCH %s'
+    )
+    rank_sql = (
+        'SELECT bm25("notes_note_fts", %s, %s) FROM "notes_note_fts" '
+        'WHERE "notes_note_fts" MATCH %s AND "notes_note_fts"."rowid" = ('
+        'SELECT "notes_note_fts_docs"."id" FROM "notes_note_fts_docs" '
+        'WHERE "notes_note_fts_docs"."note_id" = "notes_note"."id")'
+    )
+
+    def search(self, queryset: QuerySet, terms: list[str]) -> QuerySet:
+        query = self.get_match_query(terms)
+        rank = RawSQL(
+            self.rank_sql, (self.title_weight, self.body_weight, query), output_field=FloatField()
+        )
+        return (
+            queryset.filter(pk__in=RawSQL(self.match_sql, (query,)))
+            .annotate(**{self.rank_annotation: rank})
+            .order_by(self.rank_ordering, *queryset.query.order_by)
+        )
+
+    @staticmethod
+    def get_match_query(terms: list[str]) -> str:
+        """
+        Quote every term so user input can never be parsed as FTS5 query syntax, and
+        match each one as a prefix. All the terms have to match.
+        """
+
+        return " ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Search on a `tsvector` of the title and body, served by the `notes_note_search_idx`
+    GIN expression index. The planner only uses the index for the exact indexed expression,
+    so both the index (see `get_index`) and the queries are built from `get_vector`.
+    """
+
+    rank_ordering = "-search_rank"
+    config = "english"
+    index_name = "notes_note_search_idx"
+
+    @classmethod
+    def get_vector(cls):
+        from django.contrib.postgres.search import SearchVector
+
+        return SearchVector("title", "body", config=cls.config)
+
+    @classmethod
+    def get_index(cls):
+        """
+        The GIN index of the search vector. Migration 0009 creates it with a copy of this
+        expression, which has to be migrated along when `get_vector` changes.
+        """
+
+        from django.contrib.postgres.indexes import GinIndex
+
+        return GinIndex(cls.get_vector(), name=cls.index_name)
+
+    def search(self, queryset: QuerySet, terms: list[str]) -> QuerySet:
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        vector = self.get_vector()
+        query = SearchQuery(terms[0], config=self.config)
+        for term in terms[1:]:
+            query &= SearchQuery(term, config=self.config)
+        return (
+            queryset.alias(search_vector=vector)
+            .filter(search_vector=query)
+            .annotate(**{self.rank_annotation: SearchRank(vector, query)})
+            .order_by(self.rank_ordering, *queryset.query.order_by)
+        )
+
+
+class ContainsSearchBackend(BaseSearchBackend):
+    """
+    Unindexed `icontains` search for databases without a full text search backend.
+    Every note gets the same rank.
+    """
+
+    rank_ordering = "-search_rank"
+
+    def search(self, queryset: QuerySet, terms: list[str]) -> QuerySet:
+        for term in terms:
+            queryset = queryset.filter(Q(title__icontains=term) | Q(body__icontains=term))
+        return queryset.annotate(**{self.rank_annotation: Value(0.0, output_field=FloatField())})
+
+
+def get_search_backend() -> BaseSearchBackend:
+    """Return an instance of the search backend configured by `NOTES_SEARCH_BACKEND`."""
+
+    return import_string(settings.NOTES_SEARCH_BACKEND)()
@@ -1,8 +1,15 @@
+from collections.abc import Iterable
+
+from django.conf import settings
 from django.db import transaction
+from django.db.models import QuerySet
 
 from rest_framework import serializers
 
-from .models import Note, Tag
+from app.metrics import TimedListSerializer, TimedSerializerMixin
+
+from .fields import get_excerpt
+from .models import Note, NoteImport, Tag
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -13,7 +20,14 @@ class TagSerializer(serializers.ModelSerializer):
         fields = ["id", "title"]
 
 
-class NoteSerializer(serializers.ModelSerializer):
+class TagNoteCountSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Tag
+        fields = ["id", "title", "note_count"]
+        list_serializer_class = TimedListSerializer
+
+
+class NoteSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     creator = serializers.CharField(default=serializers.CurrentUserDefault())
     tags = TagSerializer(many=True, required=False)
 
@@ -25,6 +39,15 @@ class NoteSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["creator"]
 
+    @property
+    def _readable_fields(self):
+        """Only render the fields requested with `?fields=`, see `SparseFieldsetMixin`."""
+
+        fields: set[str] | None = self.context.get("fields")
+        for field in super()._readable_fields:
+            if fields is None or field.field_name in fields:
+                yield field
+
     @transaction.atomic
     def create(self, validated_data) -> Note:
         """Create a note and attach all the provided tags to it."""
@@ -44,3 +67,215 @@ class NoteSerializer(serializers.ModelSerializer):
         if tags is not None:
             instance.update_note_tags(tags)
         return instance
+
+
+class NoteImportRowSerializer(serializers.ModelSerializer):
+    """A single line of an NDJSON import, see `notes/importer.py`."""
+
+    tags = TagSerializer(many=True, required=False)
+
+    class Meta:
+        model = Note
+        fields = ["title", "body", "tags", "is_public"]
+
+
+class NoteImportSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = NoteImport
+        fields = [
+            "id", "name", "lines_processed", "imported_count", "error_count", "created_at",
+            "last_modified_at", "completed_at",
+        ]
+
+
+class NoteReadListSerializer(TimedListSerializer):
+    def to_representation(self, data: Iterable[dict]) -> list[dict]:
+        """Serialize the notes with one aggregated query for the tags of all of them."""
+
+        notes: list[dict] = list(data)
+        tags: dict | None = None
+        if "tags" in self.child.get_field_names():
+            tags = self.child.get_tags([note["id"] for note in notes])
+        return [self.child.to_representation(note, tags) for note in notes]
+
+
+class NoteReadSerializer(TimedSerializerMixin, serializers.BaseSerializer):
+    """
+    Read only counterpart of `NoteSerializer` for the list and retrieve endpoints. Notes
+    are serialized straight from `.values()` rows (see `values`) and all their tags are
+    fetched with a single query, without creating any model instance or running the
+    DRF field machinery per note. The output is identical to `NoteSerializer`.
+
+    Only the fields of the `fields` context are rendered, see `SparseFieldsetMixin`, and
+    their rows only need the `field_values` of those fields.
+    """
+
+    values = (
+        "id", "title", "body", "creator_id", "creator__username", "is_public", "created_at",
+        "last_modified_at",
+    )
+    # The `.values()` columns of each field. Excerpts are cut from the bodies of the rows
+    # being rendered rather than in SQL, where they would be computed for every note sorted
+    # before the LIMIT of a page.
+    field_values: dict[str, tuple[str, ...]] = {
+        "id": ("id",),
+        "title": ("title",),
+        "body": ("body",),
+        "excerpt": ("body",),
+        "tags": ("id",),
+        "creator": ("creator__username",),
+        "is_public": ("is_public",),
+        "created_at": ("created_at",),
+        "last_modified_at": ("last_modified_at",),
+    }
+    default_fields = (
+        "id", "title", "body", "tags", "creator", "is_public", "created_at", "last_modified_at",
+    )
+    datetime_field = serializers.DateTimeField()
+
+    class Meta:
+        list_serializer_class = NoteReadListSerializer
+
+    @staticmethod
+    def get_tag_links(note_ids: list, using: str | None = None) -> QuerySet:
+        # `.values()` rather than `.values_list()`, which `aiterator()` cannot stream on
+        # Django 4.1
+        return (
+            Note.tags.through.objects.using(using).filter(note_id__in=note_ids)
+            .order_by("tag__title")
+            .values("note_id", "tag_id", "tag__title")
+        )
+
+    @staticmethod
+    def group_tags(note_ids: list, links: Iterable[dict]) -> dict:
+        tags: dict = {note_id: [] for note_id in note_ids}
+        for link in links:
+            tags[link["note_id"]].append({"id": str(link["tag_id"]), "title": link["tag__title"]})
+        return tags
+
+    @classmethod
+    def get_tags(cls, note_ids: list, using: str | None = None) -> dict:
+        """
+        Return the serialized tags of the given notes, mapped by note id. `using` is the
+        database to read from, by default the one picked by the database routers.
+        """
+
+        return cls.group_tags(note_ids, cls.get_tag_links(note_ids, using))
+
+    @classmethod
+    async def aget_tags(cls, note_ids: list) -> dict:
+        """Async version of `get_tags`."""
+
+        return cls.group_tags(
+            note_ids, [link async for link in cls.get_tag_links(note_ids).aiterator()]
+        )
+
+    def get_field_names(self) -> set[str] | tuple[str, ...]:
+        fields: set[str] | None = self.context.get("fields")
+        return self.default_fields if fields is None else fields
+
+    def to_representation(self, instance: dict, tags: dict | None = None) -> dict:
+        fields: set[str] | tuple[str, ...] = self.get_field_names()
+        data: dict = {}
+        if "id" in fields:
+            data["id"] = str(instance["id"])
+        if "title" in fields:
+            data["title"] = instance["title"]
+        if "body" in fields:
+            data["body"] = instance["body"]
+        if "excerpt" in fields:
+            data["excerpt"] = get_excerpt(instance["body"], settings.NOTES_EXCERPT_LENGTH)
+        if "tags" in fields:
+            if tags is None:
+                tags = self.get_tags([instance["id"]])
+            data["tags"] = tags[instance["id"]]
+        if "creator" in fields:
+            data["creator"] = instance["creator__username"]
+        if "is_public" in fields:
+            data["is_public"] = instance["is_public"]
+        if "created_at" in fields:
+            data["created_at"] = self.datetime_field.to_representation(instance["created_at"])
+        if "last_modified_at" in fields:
+            data["last_modified_at"] = self.datetime_field.to_representation(
+                instance["last_modified_at"]
+            )
+        return data
+
+
+class NoteSyncListSerializer(TimedListSerializer):
+    def to_representation(self, data: Iterable[dict]) -> list[dict]:
+        """Serialize the changes, fetching the tags of the notes that are not deleted."""
+
+        notes: list[dict] = list(data)
+        tags: dict = self.child.get_tags([note["id"] for note in notes if not note["is_deleted"]])
+        return [self.child.to_representation(note, tags) for note in notes]
+
+
+class NoteSyncSerializer(NoteReadSerializer):
+    """
+    Changes of the sync feed. Notes are serialized like `NoteReadSerializer` does, with
+    `is_deleted` added. Soft deleted notes are tombstones holding only their id and times.
+    """
+
+    values = NoteReadSerializer.values + ("is_deleted", "deleted_at")
+
+    class Meta:
+        list_serializer_class = NoteSyncListSerializer
+
+    def to_representation(self, instance: dict, tags: dict | None = None) -> dict:
+        if instance["is_deleted"]:
+            return {
+                "id": str(instance["id"]),
+                "is_deleted": True,
+                "deleted_at": self.datetime_field.to_representation(instance["deleted_at"]),
+                "last_modified_at": self.datetime_field.to_representation(
+                    instance["last_modified_at"]
+                ),
+            }
+        return {**super().to_representation(instance, tags), "is_deleted": False}
+
+
+class NoteBulkListSerializer(serializers.ListSerializer):
+    max_operations = 100
+
+    def validate(self, attrs: list[dict]) -> list[dict]:
+        """Limit the batch size and only allow a single operation per note."""
+
+        if len(attrs) > self.max_operations:
+            raise serializers.ValidationError(
+                f"Ensure this list has no more than {self.max_operations} operations."
+            )
+
+        note_ids = [operation["id"] for operation in attrs if "id" in operation]
+        if len(note_ids) != len(set(note_ids)):
+            raise serializers.ValidationError(
+                "Each note may only appear once in a bulk request."
+            )
+        return attrs
+
+
+class NoteBulkOperationSerializer(serializers.Serializer):
+    """
+    A single operation of a bulk request. The `data` of create and update operations is
+    validated separately with `NoteSerializer`.
+    """
+
+    CREATE, UPDATE, DELETE = "create", "update", "delete"
+
+    action = serializers.ChoiceField(choices=[CREATE, UPDATE, DELETE])
+    id = serializers.UUIDField(required=False)
+    data = serializers.DictField(required=False)
+
+    class Meta:
+        list_serializer_class = NoteBulkListSerializer
+
+    def validate(self, attrs: dict) -> dict:
+        """Require the note id for updates and deletes, and data for creates and updates."""
+
+        if attrs["action"] == self.CREATE and "id" in attrs:
+            raise serializers.ValidationError({"id": "Notes to be created cannot have an id."})
+        if attrs["action"] != self.CREATE and "id" not in attrs:
+            raise serializers.ValidationError({"id": "This field is required."})
+        if attrs["action"] != self.DELETE and "data" not in attrs:
+            raise serializers.ValidationError({"data": "This field is required."})
+        return attrs
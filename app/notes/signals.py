@@ -0,0 +1,7 @@
+from django.dispatch import Signal
+
+# Sent by `NoteQuerySet` bulk writes, which skip the `post_save` signal.
+# All are sent with `sender=Note` and the affected note instances as `notes`.
+notes_bulk_saved = Signal()
+notes_soft_deleted = Signal()
+notes_restored = Signal()
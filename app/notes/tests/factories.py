@@ -8,7 +8,8 @@ from users.tests.factories import UserFactory
 class TagFactory(DjangoModelFactory):
     """Tag Generation Factory."""
 
-    title = factory.Faker("name")
+    # Titles are unique, random names collide once a test creates dozens of tags
+    title = factory.Sequence(lambda n: f"factory tag {n}")
 
     class Meta:
         model = Tag
@@ -1,18 +1,41 @@
+import csv
+import io
+import itertools
+import json
+from unittest import mock, skipUnless
+
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 from faker import Faker
+from freezegun import freeze_time
 from rest_framework import status
 from rest_framework.authtoken.models import Token
+from rest_framework.generics import GenericAPIView
+from rest_framework.request import Request
 from rest_framework.reverse import reverse
-from rest_framework.test import APIClient, APITestCase
+from rest_framework.test import APIClient, APIRequestFactory, APITestCase
 
-from notes.models import Note
+from app.tests.queries import QueryBudgetAPIClient, QueryBudgetMixin
+from notes.cache import get_cache
+from notes.fieldsets import SparseFieldsetMixin
+from notes.models import Note, NoteImport, Tag
+from notes.pagination import SyncPagination
+from notes.search import PostgresSearchBackend
+from notes.serializers import NoteSerializer, TagNoteCountSerializer
+from notes.views import NoteViewSet
+from users.authentication import token_cache
 
 from .factories import NoteFactory, TagFactory
 
 
-class BaseNotesAPITestCase(APITestCase):
+class BaseNotesAPITestCase(QueryBudgetMixin, APITestCase):
     def setUp(self):
+        get_cache().clear()
+        token_cache.clear()
         self.faker = Faker()
         self.user = get_user_model().objects.create(
             username=self.faker.name(), password=self.faker.password()
@@ -24,7 +47,7 @@ class BaseNotesAPITestCase(APITestCase):
 
         self.user_token = Token.objects.create(user=self.user)
 
-        self.client = APIClient()
+        self.client = QueryBudgetAPIClient()
         self.client.credentials(**{"HTTP_AUTHORIZATION": f"Token {self.user_token.key}"})
 
 
@@ -110,7 +133,8 @@ class NotesListAPITestCase(BaseNotesAPITestCase):
         note_response = response["results"][0]
         self.assertIn("id", note_response)
         self.assertIn("title", note_response)
-        self.assertIn("body", note_response)
+        self.assertIn("excerpt", note_response)
+        self.assertNotIn("body", note_response)
         self.assertIn("creator", note_response)
         self.assertIn("tags", note_response)
         self.assertIn("created_at", note_response)
@@ -196,6 +220,57 @@ class NotesListAPITestCase(BaseNotesAPITestCase):
         for note in expected_notes:
             self.assertIn(str(note.id), response_notes)
 
+    def test_list_notes_filter_by_all_tags(self):
+        tag_foo = TagFactory(title="foo")
+        tag_bar = TagFactory(title="bar")
+        tag_foobar = TagFactory(title="foobar")
+
+        NoteFactory(creator=self.user, tags=(tag_foo,))
+        note_foo_foobar = NoteFactory(creator=self.user, tags=(tag_foo, tag_foobar))
+        note_all = NoteFactory(creator=self.user, tags=(tag_foo, tag_bar, tag_foobar))
+
+        response = self.client.get(
+            reverse("notes:notes-list"), {"tag_titles": "foo,foobar", "match": "all"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {note["id"] for note in response.json()["results"]},
+            {str(note_foo_foobar.id), str(note_all.id)},
+        )
+
+        response = self.client.get(
+            reverse("notes:notes-list"),
+            {"tag_ids": f"{tag_foo.id},{tag_bar.id},{tag_foobar.id}", "match": "all"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [note["id"] for note in response.json()["results"]], [str(note_all.id)]
+        )
+
+        response = self.client.get(
+            reverse("notes:notes-list"), {"tag_titles": "foo", "match": "some"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_notes_filter_by_tags_queries(self):
+        tags = TagFactory.create_batch(5)
+        NoteFactory.create_batch(10, creator=self.user, tags=tags)
+
+        titles: str = ",".join(tag.title for tag in tags)
+        for match in ("any", "all"):
+            # Same 4 queries as an unfiltered list, without any DISTINCT to remove
+            # the duplicate rows of a join on the tags
+            token_cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(
+                    reverse("notes:notes-list"), {"tag_titles": titles, "match": match}
+                )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json()["count"], 10)
+            self.assertEqual(len(context.captured_queries), 4)
+            for query in context.captured_queries:
+                self.assertNotIn("DISTINCT", query["sql"])
+
     def test_list_notes_search_by_content(self):
         foo_note = NoteFactory(
             title="foo with some random text",
@@ -242,6 +317,909 @@ class NotesListAPITestCase(BaseNotesAPITestCase):
         self.assertIn(str(bar_note.id), response_notes)
 
 
+class NotesListCacheAPITestCase(BaseNotesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.tag = TagFactory(title="foo")
+        self.public_note = NoteFactory(creator=self.other_user, is_public=True, tags=[self.tag])
+        self.private_note = NoteFactory(creator=self.user, is_public=False)
+
+    def assertCached(self, params=None, cached=True):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("notes:notes-list"), params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        note_queries = [
+            query for query in context.captured_queries if '"notes_note"' in query["sql"]
+        ]
+        self.assertEqual(not note_queries, cached)
+        return response.json()
+
+    def test_list_response_is_cached_per_viewer_and_params(self):
+        response = self.assertCached(cached=False)
+        self.assertEqual(self.assertCached(), response)
+        self.assertCached({"ordering": "title"}, cached=False)
+        self.assertCached({"ordering": "title"})
+
+        # Other users and anonymous users have their own entries
+        self.client.credentials(**{"HTTP_AUTHORIZATION": f"Token {self.other_user_token.key}"})
+        self.assertEqual(self.assertCached(cached=False)["count"], 1)
+        self.client.credentials(**{})
+        self.assertCached(cached=False)
+        self.assertCached()
+
+    def test_note_changes_invalidate_cache(self):
+        self.assertCached(cached=False)
+        response = self.client.post(
+            reverse("notes:notes-list"), {"title": "new", "body": "body"}, format="json"
+        )
+        self.assertEqual(self.assertCached(cached=False)["count"], 3)
+
+        note_detail_url = reverse("notes:notes-detail", kwargs={"pk": response.json()["id"]})
+        self.client.patch(note_detail_url, {"title": "updated"}, format="json")
+        response = self.assertCached(cached=False)
+        self.assertIn("updated", {note["title"] for note in response["results"]})
+
+        self.client.delete(note_detail_url)
+        self.assertEqual(self.assertCached(cached=False)["count"], 2)
+
+        self.client.post(
+            reverse("notes:notes-bulk"),
+            [{"action": "delete", "id": str(self.private_note.id)}],
+            format="json",
+        )
+        self.assertEqual(self.assertCached(cached=False)["count"], 1)
+
+    def test_public_feed_invalidation(self):
+        self.client.credentials(**{})
+        self.assertCached(cached=False)
+
+        # Private notes are not part of the public feed
+        self.private_note.title = "updated"
+        self.private_note.save()
+        NoteFactory(creator=self.user, is_public=False)
+        self.assertCached()
+
+        # Making a public note private removes it from the public feed
+        public_note = Note.objects.get(pk=self.public_note.pk)
+        public_note.is_public = False
+        public_note.save()
+        self.assertEqual(self.assertCached(cached=False)["count"], 0)
+
+    def test_tag_changes_invalidate_cache(self):
+        self.assertCached(cached=False)
+        self.public_note.tags.add(TagFactory())
+        self.assertCached(cached=False)
+
+        self.tag.title = "bar"
+        self.tag.save()
+        response = self.assertCached(cached=False)
+        tags = {tag["title"] for note in response["results"] for tag in note["tags"]}
+        self.assertIn("bar", tags)
+
+        self.tag.notes.remove(self.public_note)
+        self.assertCached(cached=False)
+
+        Tag.objects.create(title="unused")
+        self.assertCached()
+
+
+class NotesConditionalRequestAPITestCase(BaseNotesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.note = NoteFactory(creator=self.user)
+        self.note_detail_url = reverse("notes:notes-detail", kwargs={"pk": self.note.pk})
+
+    def test_retrieve_if_none_match(self):
+        response = self.client.get(self.note_detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response.headers["ETag"]
+        self.assertIn("Last-Modified", response.headers)
+
+        # Only the note validators are fetched (the token lookup is cached since the
+        # first request), the note is not serialized
+        with self.assertNumQueries(1):
+            response = self.client.get(self.note_detail_url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(response.headers["ETag"], etag)
+
+        self.client.patch(self.note_detail_url, {"title": "updated"}, format="json")
+        response = self.client.get(self.note_detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_retrieve_fieldsets_have_their_own_etags(self):
+        sparse_etag = self.client.get(self.note_detail_url, {"fields": "id"}).headers["ETag"]
+        etag = self.client.get(self.note_detail_url).headers["ETag"]
+        self.assertNotEqual(sparse_etag, etag)
+
+        response = self.client.get(self.note_detail_url, HTTP_IF_NONE_MATCH=sparse_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("body", response.json())
+        response = self.client.get(
+            self.note_detail_url, {"omit": "body"}, HTTP_IF_NONE_MATCH=sparse_etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(
+            self.note_detail_url, {"fields": "id"}, HTTP_IF_NONE_MATCH=sparse_etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Requesting the default fields explicitly is the same representation
+        response = self.client.get(
+            self.note_detail_url,
+            {"fields": ",".join(NoteSerializer.Meta.fields)},
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Writes are checked against the full note, their response gets its own ETag
+        response = self.client.patch(
+            f"{self.note_detail_url}?fields=id", {"title": "updated"}, format="json",
+            HTTP_IF_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.client.get(self.note_detail_url, {"fields": "id"}).headers["ETag"],
+            response.headers["ETag"],
+        )
+
+    def test_tag_and_creator_renames_modify_notes(self):
+        self.note.tags.add(TagFactory(title="foo"))
+        list_etag = self.client.get(reverse("notes:notes-list")).headers["ETag"]
+        etag = self.client.get(self.note_detail_url).headers["ETag"]
+
+        tag = Tag.objects.get(title="foo")
+        tag.title = "bar"
+        tag.save()
+        response = self.client.get(self.note_detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["tags"][0]["title"], "bar")
+        response = self.client.get(reverse("notes:notes-list"), HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Saving the tag without renaming it does not modify the notes
+        etag = response.headers["ETag"]
+        tag.save()
+        response = self.client.get(reverse("notes:notes-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        etag = self.client.get(self.note_detail_url).headers["ETag"]
+        self.user.username = "renamed"
+        self.user.save()
+        response = self.client.get(self.note_detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["creator"], "renamed")
+        response = self.client.get(reverse("notes:notes-list"))
+        self.assertEqual(response.json()["results"][0]["creator"], "renamed")
+
+    def test_retrieve_if_modified_since(self):
+        last_modified = self.client.get(self.note_detail_url).headers["Last-Modified"]
+        response = self.client.get(self.note_detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with freeze_time(timezone.now() + timezone.timedelta(minutes=1)):
+            self.client.patch(self.note_detail_url, {"title": "updated"}, format="json")
+        response = self.client.get(self.note_detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_if_none_match(self):
+        etag = self.client.get(reverse("notes:notes-list")).headers["ETag"]
+
+        # Validators are derived from the cache generations of the list and the token lookup
+        # is cached, so no query is needed
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("notes:notes-list"), HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Validators depend on the query params
+        response = self.client.get(
+            reverse("notes:notes-list"), {"ordering": "title"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        NoteFactory(creator=self.user)
+        response = self.client.get(reverse("notes:notes-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response.headers["ETag"]
+
+        self.client.delete(self.note_detail_url)
+        response = self.client.get(reverse("notes:notes-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_validators_of_visible_notes(self):
+        other_note = NoteFactory(is_public=True)
+        etag = self.client.get(reverse("notes:notes-list")).headers["ETag"]
+
+        # Private notes of other users are not part of the list
+        NoteFactory(is_public=False)
+        response = self.client.get(reverse("notes:notes-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # A public note becoming private leaves the list
+        other_note.is_public = False
+        other_note.save()
+        response = self.client.get(reverse("notes:notes-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_if_modified_since(self):
+        last_modified = self.client.get(reverse("notes:notes-list")).headers["Last-Modified"]
+        response = self.client.get(
+            reverse("notes:notes-list"), HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Removing a note from the list is a modification as well
+        with freeze_time(timezone.now() + timezone.timedelta(minutes=1)):
+            self.client.delete(self.note_detail_url)
+        response = self.client.get(
+            reverse("notes:notes-list"), HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["count"], 0)
+
+    def test_if_match_on_update(self):
+        etag = self.client.get(self.note_detail_url).headers["ETag"]
+
+        response = self.client.patch(
+            self.note_detail_url, {"title": "first"}, format="json", HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        new_etag = response.headers["ETag"]
+        self.assertNotEqual(new_etag, etag)
+        self.assertEqual(self.client.get(self.note_detail_url).headers["ETag"], new_etag)
+
+        # A concurrent update based on the stale representation is rejected
+        response = self.client.patch(
+            self.note_detail_url, {"title": "second"}, format="json", HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.note.refresh_from_db()
+        self.assertEqual(self.note.title, "first")
+
+    def test_if_match_on_delete(self):
+        response = self.client.delete(self.note_detail_url, HTTP_IF_MATCH='"stale"')
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.note.refresh_from_db()
+        self.assertFalse(self.note.is_deleted)
+
+        etag = self.client.get(self.note_detail_url).headers["ETag"]
+        response = self.client.delete(self.note_detail_url, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_permissions_are_checked_before_preconditions(self):
+        note = NoteFactory(creator=self.other_user, is_public=True)
+        note_detail_url = reverse("notes:notes-detail", kwargs={"pk": note.pk})
+        response = self.client.patch(
+            note_detail_url, {"title": "x"}, format="json", HTTP_IF_MATCH='"stale"'
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class NotesSearchAPITestCase(BaseNotesAPITestCase):
+    def search(self, terms, **params):
+        response = self.client.get(reverse("notes:notes-list"), {"search": terms, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [note["id"] for note in response.json()["results"]]
+
+    def test_search_results_are_ranked(self):
+        body_match = NoteFactory(title="groceries", body="buy apples", creator=self.user)
+        title_match = NoteFactory(title="apples", body="some text", creator=self.user)
+        NoteFactory(title="groceries", body="buy pears", creator=self.user)
+
+        self.assertListEqual(self.search("apples"), [str(title_match.id), str(body_match.id)])
+
+        # All terms have to match, terms are matched as prefixes
+        self.assertListEqual(self.search("buy appl"), [str(body_match.id)])
+
+        # An explicit ordering takes precedence over the rank
+        self.assertListEqual(
+            self.search("apples", ordering="title"), [str(title_match.id), str(body_match.id)]
+        )
+
+    def test_search_index_follows_writes(self):
+        note = NoteFactory(title="first title", body="body", creator=self.user)
+        note_detail_url = reverse("notes:notes-detail", kwargs={"pk": note.pk})
+        self.assertListEqual(self.search("first"), [str(note.id)])
+
+        self.client.patch(note_detail_url, {"title": "second title"}, format="json")
+        self.assertListEqual(self.search("first"), [])
+        self.assertListEqual(self.search("second"), [str(note.id)])
+
+        self.client.delete(note_detail_url)
+        self.assertListEqual(self.search("second"), [])
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM notes_note_fts")
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+        response = self.client.post(
+            reverse("notes:notes-bulk"),
+            [{"action": "create", "data": {"title": "bulk title", "body": "body"}}],
+            format="json",
+        )
+        self.assertListEqual(self.search("bulk"), [response.json()[0]["id"]])
+
+    def test_search_visibility(self):
+        NoteFactory(title="secret", is_public=False, creator=self.other_user)
+        public_note = NoteFactory(title="secret", is_public=True, creator=self.other_user)
+        own_note = NoteFactory(title="secret", is_public=False, creator=self.user)
+
+        self.assertSetEqual(set(self.search("secret")), {str(public_note.id), str(own_note.id)})
+
+        self.client.credentials(**{})
+        self.assertListEqual(self.search("secret"), [str(public_note.id)])
+
+    def test_search_query_syntax_is_escaped(self):
+        note = NoteFactory(title='say "hello" AND bye', creator=self.user)
+        for terms in ['"hello"', "AND", "hello*", "NEAR(", "title:hello", '"']:
+            self.search(terms)
+        self.assertListEqual(self.search('"hello"'), [str(note.id)])
+
+    def test_search_with_cursor_pagination(self):
+        notes = NoteFactory.create_batch(25, title="same title", creator=self.user)
+
+        response = self.client.get(reverse("notes:notes-list"), {"search": "same", "cursor": ""})
+        response = response.json()
+        note_ids = [note["id"] for note in response["results"]]
+        response = self.client.get(response["next"]).json()
+        note_ids += [note["id"] for note in response["results"]]
+
+        self.assertEqual(len(note_ids), len(set(note_ids)))
+        self.assertSetEqual(set(note_ids), {str(note.id) for note in notes})
+
+
+class NotesCursorPaginationAPITestCase(BaseNotesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        # Notes created in the same instant share `created_at`, so the `id` tiebreaker
+        # has to keep the pages stable.
+        self.notes = []
+        for days in range(5):
+            with freeze_time(timezone.now() - timezone.timedelta(days=days)):
+                self.notes.extend(NoteFactory.create_batch(6, creator=self.user))
+
+    def walk(self, url, params=None, direction="next"):
+        pages = []
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            response = response.json()
+            self.assertNotIn("count", response)
+            pages.append([note["id"] for note in response["results"]])
+            url, params = response[direction], None
+        return pages
+
+    def test_cursor_pages_follow_created_at_and_id(self):
+        pages = self.walk(reverse("notes:notes-list"), {"cursor": ""})
+        self.assertEqual([len(page) for page in pages], [20, 10])
+
+        expected = sorted(self.notes, key=lambda note: str(note.id))
+        expected = sorted(expected, key=lambda note: note.created_at, reverse=True)
+        self.assertEqual([note_id for page in pages for note_id in page],
+                         [str(note.id) for note in expected])
+
+    def test_previous_cursor_returns_same_pages(self):
+        forward = self.walk(reverse("notes:notes-list"), {"cursor": ""})
+        response = self.client.get(reverse("notes:notes-list"), {"cursor": ""}).json()
+        last_page_url = response["next"]
+        response = self.client.get(last_page_url).json()
+        self.assertIsNone(response["next"])
+
+        backward = self.walk(response["previous"], direction="previous")
+        self.assertEqual(backward, [forward[0]])
+
+    def test_cursor_with_ordering_filter(self):
+        pages = self.walk(reverse("notes:notes-list"), {"cursor": "", "ordering": "title"})
+        expected = sorted(self.notes, key=lambda note: (note.title, str(note.id)))
+        self.assertEqual([note_id for page in pages for note_id in page],
+                         [str(note.id) for note in expected])
+
+    def test_cursor_from_other_ordering_is_rejected(self):
+        response = self.client.get(reverse("notes:notes-list"), {"cursor": ""}).json()
+        response = self.client.get(f"{response['next']}&ordering=title")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get(reverse("notes:notes-list"), {"cursor": "garbage"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_pagination_queries(self):
+        first_page = self.client.get(reverse("notes:notes-list"), {"cursor": ""}).json()
+
+        # No count query, deep pages cost the same as the first one (the token lookup is
+        # cached since the first request):
+        # 1. fetch the page of notes
+        # 2. prefetch tags for the notes fetched in query 1
+        with self.assertNumQueries(2):
+            response = self.client.get(first_page["next"])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class NotesSparseFieldsetAPITestCase(BaseNotesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.tag = TagFactory(title="foo")
+        self.notes = NoteFactory.create_batch(25, creator=self.user, tags=[self.tag])
+        self.note = self.notes[0]
+
+    def get_notes(self, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("notes:notes-list"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()["results"], [query["sql"] for query in queries.captured_queries]
+
+    def test_list_fields(self):
+        # Warm up the token cache
+        self.get_notes({"page": 2})
+        default_notes, default_queries = self.get_notes({})
+        self.assertEqual(
+            list(default_notes[0]),
+            [
+                "id", "title", "excerpt", "tags", "creator", "is_public", "created_at",
+                "last_modified_at",
+            ],
+        )
+
+        notes, queries = self.get_notes({"fields": "id,title,last_modified_at"})
+        self.assertEqual(
+            notes,
+            [
+                {key: note[key] for key in ("id", "title", "last_modified_at")}
+                for note in default_notes
+            ],
+        )
+        # Neither the tags nor the bodies and creators are queried
+        self.assertEqual(len(queries), len(default_queries) - 1)
+        self.assertNotIn('"body"', queries[-1])
+        self.assertNotIn('"users_user"', queries[-1])
+
+        notes, _ = self.get_notes({"fields": "title,body"})
+        self.assertEqual(notes[0], {"title": self.notes[-1].title, "body": self.notes[-1].body})
+
+    def test_list_omit(self):
+        notes, queries = self.get_notes({"omit": "tags,excerpt"})
+        self.assertEqual(
+            list(notes[0]),
+            ["id", "title", "creator", "is_public", "created_at", "last_modified_at"],
+        )
+        self.assertNotIn('"body"', queries[-1])
+
+        notes, _ = self.get_notes({"fields": "id,title,tags", "omit": "title"})
+        self.assertEqual(notes[0], {"id": str(self.notes[-1].id), "tags": [
+            {"id": str(self.tag.id), "title": "foo"},
+        ]})
+
+    def test_unknown_fields(self):
+        for params in ({"fields": "id,secret"}, {"omit": "secret"}):
+            response = self.client.get(reverse("notes:notes-list"), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(
+                response.json(), {list(params)[0]: "Unknown fields: secret."}
+            )
+
+        # Excerpts are only available on reads, nothing is written
+        response = self.client.post(
+            reverse("notes:notes-list") + "?fields=excerpt",
+            {"title": "title", "body": "body"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Note.objects.filter(title="title").exists())
+
+    def walk(self, params):
+        note_ids, url = [], reverse("notes:notes-list")
+        while url:
+            response = self.client.get(url, params).json()
+            note_ids += [note["id"] for note in response["results"]]
+            url, params = response["next"], None
+        return note_ids
+
+    def test_default_fieldset_fields(self):
+        class TagView(SparseFieldsetMixin, GenericAPIView):
+            serializer_class = TagNoteCountSerializer
+            fieldset_actions = ("list",)
+
+        request = Request(APIRequestFactory().get("/", {"omit": "note_count"}))
+        view = TagView(action="list", request=request, format_kwarg=None, args=(), kwargs={})
+        self.assertEqual(view.get_fieldset_fields(), (["id", "title", "note_count"],) * 2)
+        self.assertEqual(view.get_fieldset(request), {"id", "title"})
+
+    def test_cursor_pages(self):
+        # The cursors are built from ordering keys that are not part of the fields
+        for ordering in ("-created_at", "creator", "-is_public"):
+            note_ids = self.walk({"fields": "id", "cursor": "", "ordering": ordering})
+            self.assertEqual(len(note_ids), len(self.notes))
+            self.assertEqual(note_ids, self.walk({"cursor": "", "ordering": ordering}))
+
+    def test_retrieve_fields(self):
+        url = reverse("notes:notes-detail", kwargs={"pk": self.note.pk})
+        response = self.client.get(url, {"fields": "title,excerpt"})
+        self.assertEqual(response.json(), {"title": self.note.title, "excerpt": self.note.body})
+
+        response = self.client.get(url, {"omit": "tags"})
+        self.assertNotIn("tags", response.json())
+        self.assertIn("body", response.json())
+
+    def test_write_fields(self):
+        url = reverse("notes:notes-detail", kwargs={"pk": self.note.pk})
+        response = self.client.patch(
+            url + "?fields=id,last_modified_at",
+            {"title": "updated again", "tags": [{"title": "bar"}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        note = self.client.get(url).json()
+        self.assertEqual(
+            response.json(), {"id": note["id"], "last_modified_at": note["last_modified_at"]}
+        )
+        self.note.refresh_from_db()
+        self.assertEqual(self.note.title, "updated again")
+        self.assertEqual(list(self.note.tags.values_list("title", flat=True)), ["bar"])
+
+        # The tags are neither prefetched nor fetched again after the update to be rendered
+        with CaptureQueriesContext(connection) as default_queries:
+            self.client.patch(url, {"title": "updated"}, format="json")
+        with CaptureQueriesContext(connection) as queries:
+            self.client.patch(url + "?omit=tags", {"title": "updated"}, format="json")
+        self.assertEqual(len(queries), len(default_queries) - 2)
+
+        # Permissions are checked without loading the creator
+        with CaptureQueriesContext(connection) as sparse_queries:
+            self.client.patch(url + "?omit=tags,creator", {"title": "updated"}, format="json")
+        self.assertEqual(len(sparse_queries), len(queries))
+        self.assertNotIn('"users_user"', sparse_queries[1]["sql"])
+
+        response = self.client.post(
+            reverse("notes:notes-list") + "?fields=id",
+            {"title": "title", "body": "body", "tags": [{"title": "foo"}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(list(response.json()), ["id"])
+
+
+@skipUnless(connection.vendor == "sqlite", "Query plan assertions are written for SQLite.")
+class NotesListQueryPlanTestCase(BaseNotesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        NoteFactory.create_batch(3, is_public=True, creator=self.other_user)
+        NoteFactory.create_batch(3, is_public=False, creator=self.user)
+
+    def get_list_query_plan(self, params=None) -> str:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("notes:notes-list"), params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        notes_query = next(
+            query["sql"] for query in context.captured_queries
+            if query["sql"].startswith('SELECT "notes_note"."id"')
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {notes_query}")
+            return "\n".join(row[-1] for row in cursor.fetchall())
+
+    def test_public_list_uses_public_notes_index(self):
+        self.client.credentials(**{})
+        plan = self.get_list_query_plan({"cursor": ""})
+        self.assertIn("USING INDEX note_public_created_at_idx", plan)
+        # The index order matches `-created_at, id` so no sorting is needed
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_authenticated_list_uses_index(self):
+        plan = self.get_list_query_plan({"cursor": ""})
+        # The public and own private notes are read in order from their own index and merged
+        self.assertIn("UNION ALL", plan)
+        self.assertIn("USING INDEX note_public_created_at_idx", plan)
+        self.assertIn("USING INDEX note_creator_created_at_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_own_notes_list_uses_creator_index(self):
+        plan = self.get_list_query_plan({"cursor": "", "is_public": "false"})
+        self.assertIn("USING INDEX note_creator_created_at_idx", plan)
+
+
+@skipUnless(connection.vendor == "postgresql", "PostgreSQL full text search index")
+class NotesPostgresSearchQueryPlanTestCase(BaseNotesAPITestCase):
+    def test_search_uses_index(self):
+        NoteFactory.create_batch(3, creator=self.user, title="foo")
+        queryset = PostgresSearchBackend().search(Note.active_objects.all(), ["foo"])
+        with connection.cursor() as cursor:
+            # The table is too small for the planner to pick the index on its own
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+        self.assertIn(PostgresSearchBackend.index_name, plan)
+
+
+class NotesExportAPITestCase(BaseNotesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.tag_foo = TagFactory(title="foo")
+        self.tag_bar = TagFactory(title="bar")
+        self.notes = NoteFactory.create_batch(
+            3, creator=self.user, tags=(self.tag_foo, self.tag_bar)
+        )
+        self.notes += NoteFactory.create_batch(2, creator=self.user, is_public=True)
+        NoteFactory(creator=self.other_user, is_public=True)
+        NoteFactory(creator=self.user).soft_delete()
+
+    def export(self, export_format, params=None):
+        response = self.client.get(
+            reverse("notes:notes-export", kwargs={"export_format": export_format}), params
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_export_ndjson(self):
+        response, content = self.export("ndjson")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="notes.ndjson"')
+
+        # Only the active notes of the user, in the same shape as the notes API
+        notes = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(
+            [note["id"] for note in notes], [str(note.id) for note in reversed(self.notes)]
+        )
+        list_response = self.client.get(
+            reverse("notes:notes-list"), {"fields": ",".join(NoteSerializer.Meta.fields)}
+        ).json()
+        self.assertEqual(
+            notes,
+            [note for note in list_response["results"] if note["creator"] == self.user.username],
+        )
+
+    def test_export_csv(self):
+        response, content = self.export("csv", {"tag_titles": "foo"})
+        self.assertEqual(response["Content-Type"], "text/csv")
+
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(
+            {row["id"] for row in rows}, {str(note.id) for note in self.notes[:3]}
+        )
+        self.assertEqual(rows[0]["tags"], "bar,foo")
+        self.assertEqual(rows[0]["creator"], self.user.username)
+
+    def test_export_filters(self):
+        _, content = self.export("ndjson", {"is_public": "true", "ordering": "created_at"})
+        self.assertEqual(
+            [json.loads(line)["id"] for line in content.splitlines()],
+            [str(note.id) for note in self.notes[3:]],
+        )
+
+        response = self.client.get(
+            reverse("notes:notes-export", kwargs={"export_format": "csv"}),
+            {"tag_ids": "not-a-uuid"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_requires_authentication(self):
+        self.client.credentials(**{})
+        response = self.client.get(
+            reverse("notes:notes-export", kwargs={"export_format": "csv"})
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_export_queries(self):
+        # 1. fetch user (auth)
+        # 2. stream all the notes
+        # 3. fetch the tags of the notes, a single chunk
+        with self.assertNumQueries(3):
+            _, content = self.export("ndjson")
+        self.assertEqual(len(content.splitlines()), 5)
+
+        # Smaller chunks take a tags query each, beyond the budget of a single chunk: the notes
+        # and the tags of 3 chunks of 2 notes (the token lookup is cached)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {self.user_token.key}")
+        with mock.patch.object(NoteViewSet, "export_chunk_size", 2):
+            with self.assertNumQueries(4):
+                response = client.get(
+                    reverse("notes:notes-export", kwargs={"export_format": "ndjson"})
+                )
+                content = b"".join(response.streaming_content).decode()
+        self.assertEqual(len(content.splitlines()), 5)
+
+
+class NotesImportAPITestCase(BaseNotesAPITestCase):
+    def upload(self, lines, params=None):
+        url = reverse("notes:notes-import")
+        if params:
+            url = f"{url}?{params}"
+        return self.client.post(
+            url, data=b"".join(lines), content_type="application/x-ndjson"
+        )
+
+    @staticmethod
+    def to_lines(*rows):
+        return [json.dumps(row).encode() + b"\n" for row in rows]
+
+    def test_import(self):
+        lines = self.to_lines(
+            {"title": "one", "body": "first", "tags": [{"title": "foo"}]},
+            {"title": "two"},
+            {"title": "three", "body": "third", "is_public": True},
+        )
+        response = self.upload(lines)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["lines_processed"], 3)
+        self.assertEqual(response.data["imported_count"], 2)
+        self.assertEqual(response.data["error_count"], 1)
+        self.assertEqual(response.data["errors"][0]["line"], 2)
+        self.assertIn("body", response.data["errors"][0]["errors"])
+
+        # Imported notes show up in the (cached) notes list of the user
+        notes = self.client.get(reverse("notes:notes-list")).json()["results"]
+        self.assertEqual({note["title"] for note in notes}, {"one", "three"})
+        self.assertEqual(
+            {note["creator"] for note in notes}, {self.user.username}
+        )
+
+    def test_resume(self):
+        lines = self.to_lines(*({"title": f"note {i}", "body": "body"} for i in range(3)))
+        note_import = NoteImport.objects.create(creator=self.user, lines_processed=2)
+
+        response = self.upload(lines, f"resume={note_import.pk}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["id"], str(note_import.pk))
+        self.assertEqual(response.data["lines_processed"], 3)
+        self.assertListEqual(list(Note.objects.values_list("title", flat=True)), ["note 2"])
+
+        # Imports of other users and malformed ids are not found
+        other_import = NoteImport.objects.create(creator=self.other_user)
+        for resume in (other_import.pk, "not-a-uuid"):
+            response = self.upload(lines, f"resume={resume}")
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_import_conflict(self):
+        note_import = NoteImport.objects.create(creator=self.user)
+        lines = self.to_lines({"title": "note", "body": "body"})
+        with mock.patch(
+            "notes.importer.NoteImport.objects.filter"
+        ) as mock_filter:
+            mock_filter.return_value.update.return_value = 0
+            response = self.upload(lines, f"resume={note_import.pk}")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Note.objects.exists())
+
+    def test_empty_body(self):
+        response = self.upload([])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["lines_processed"], 0)
+        self.assertIsNotNone(response.data["completed_at"])
+
+    def test_import_requires_authentication(self):
+        self.client.credentials(**{})
+        response = self.upload(self.to_lines({"title": "note", "body": "body"}))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(NoteImport.objects.exists())
+
+
+class NotesQueryBudgetAPITestCase(BaseNotesAPITestCase):
+    """The query count of the endpoints does not grow with the amount of data."""
+
+    def setUp(self):
+        super().setUp()
+        # Tags created by the requests are new on every call
+        self.runs = itertools.count()
+
+    def test_list_queries(self):
+        def request(size):
+            tags = TagFactory.create_batch(size)
+            NoteFactory.create_batch(size, creator=self.user, tags=tags)
+            NoteFactory.create_batch(size, creator=self.other_user, is_public=True, tags=tags)
+            return self.client.get(reverse("notes:notes-list"))
+
+        # Up to a full page of notes, with up to 15 tags each
+        self.assertConstantQueries(request, (1, 5, 15))
+
+    def test_list_filter_queries(self):
+        def request(size):
+            tags = TagFactory.create_batch(size)
+            NoteFactory.create_batch(size, creator=self.user, title="note", tags=tags)
+            return self.client.get(reverse("notes:notes-list"), {
+                "tag_titles": ",".join(tag.title for tag in tags),
+                "match": "all",
+                "search": "note",
+                "cursor": "",
+            })
+
+        self.assertConstantQueries(request, (1, 5, 15))
+
+    def test_retrieve_queries(self):
+        def request(size):
+            note = NoteFactory(creator=self.user, tags=TagFactory.create_batch(size))
+            return self.client.get(reverse("notes:notes-detail", kwargs={"pk": note.pk}))
+
+        self.assertConstantQueries(request, (1, 10, 50))
+
+    def test_create_queries(self):
+        def request(size):
+            TagFactory.create_batch(size)
+            tags = [{"title": tag.title} for tag in TagFactory.create_batch(size)]
+            run = next(self.runs)
+            tags += [{"title": f"new {run} {index}"} for index in range(size)]
+            return self.client.post(
+                reverse("notes:notes-list"),
+                {"title": "title", "body": "body", "tags": tags},
+                format="json",
+            )
+
+        self.assertConstantQueries(request, (1, 10, 50))
+
+    def test_update_queries(self):
+        def request(size):
+            note = NoteFactory(creator=self.user, tags=TagFactory.create_batch(size))
+            run = next(self.runs)
+            tags = [{"title": f"updated {run} {index}"} for index in range(size)]
+            return self.client.patch(
+                reverse("notes:notes-detail", kwargs={"pk": note.pk}),
+                {"title": "updated", "tags": tags},
+                format="json",
+            )
+
+        self.assertConstantQueries(request, (1, 10, 50))
+
+    def test_delete_queries(self):
+        def request(size):
+            note = NoteFactory(creator=self.user, tags=TagFactory.create_batch(size))
+            return self.client.delete(reverse("notes:notes-detail", kwargs={"pk": note.pk}))
+
+        self.assertConstantQueries(request, (1, 10, 50))
+
+    def test_bulk_queries(self):
+        def request(size):
+            notes = NoteFactory.create_batch(2 * size, creator=self.user)
+            run = next(self.runs)
+            operations = [
+                {"action": "create", "data": {"title": "new", "body": "body", "tags": [
+                    {"title": f"bulk {run} {index}"}
+                ]}}
+                for index in range(size)
+            ]
+            operations += [
+                {"action": "update", "id": str(note.pk), "data": {"tags": [{"title": "foo"}]}}
+                for note in notes[:size]
+            ]
+            operations += [{"action": "delete", "id": str(note.pk)} for note in notes[size:]]
+            return self.client.post(reverse("notes:notes-bulk"), operations, format="json")
+
+        self.assertConstantQueries(request, (1, 5, 30))
+
+    def test_bulk_delete_queries(self):
+        def request(size):
+            tag = TagFactory()
+            NoteFactory.create_batch(size, creator=self.user, tags=TagFactory.create_batch(3))
+            NoteFactory.create_batch(size, creator=self.user, tags=(tag,))
+            return self.client.post(f"{reverse('notes:notes-bulk-delete')}?tag_ids={tag.pk}")
+
+        self.assertConstantQueries(request, (1, 10, 50))
+
+    def test_import_queries(self):
+        def request(size):
+            run = next(self.runs)
+            lines = [
+                json.dumps({
+                    "title": f"note {index}",
+                    "body": "body",
+                    "tags": [{"title": f"import {run} {index}"}, {"title": "foo"}],
+                })
+                for index in range(size)
+            ]
+            return self.client.post(
+                reverse("notes:notes-import"),
+                data="\n".join(lines).encode(),
+                content_type="application/x-ndjson",
+            )
+
+        self.assertConstantQueries(request, (1, 10, 50))
+
+    def test_tags_list_queries(self):
+        def request(size):
+            NoteFactory(creator=self.user, tags=TagFactory.create_batch(size))
+            return self.client.get(reverse("notes:tags-list"))
+
+        self.assertConstantQueries(request, (1, 10, 50))
+
+
 class NotesRetrieveTestCase(BaseNotesAPITestCase):
     def test_note_retrieve_access(self):
         note = NoteFactory(creator=self.user, is_public=True)
@@ -300,6 +1278,197 @@ class NoteDeleteAPITestCase(BaseNotesAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
 
+class NotesBulkDeleteRestoreAPITestCase(BaseNotesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.tag_foo = TagFactory(title="foo")
+        self.tag_bar = TagFactory(title="bar")
+        self.foo_notes = NoteFactory.create_batch(3, creator=self.user, tags=(self.tag_foo,))
+        self.bar_note = NoteFactory(creator=self.user, tags=(self.tag_bar,))
+        self.other_foo_note = NoteFactory(
+            creator=self.other_user, is_public=True, tags=(self.tag_foo,)
+        )
+
+    def bulk(self, action, params):
+        url = reverse(f"notes:notes-bulk-{action}")
+        return self.client.post(f"{url}?{params}" if params else url)
+
+    def test_bulk_delete_and_restore(self):
+        response = self.bulk("delete", "tag_titles=foo")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"deleted": 3})
+
+        # Only the notes of the user are deleted
+        self.assertSetEqual(
+            set(Note.active_objects.values_list("pk", flat=True)),
+            {self.bar_note.pk, self.other_foo_note.pk},
+        )
+        self.tag_foo.refresh_from_db()
+        self.assertEqual(self.tag_foo.note_count, 1)
+        notes = self.client.get(reverse("notes:notes-list")).json()["results"]
+        self.assertEqual(len(notes), 2)
+
+        # Notes that are already deleted are not deleted again
+        response = self.bulk("delete", "tag_titles=foo")
+        self.assertEqual(response.data, {"deleted": 0})
+
+        response = self.bulk("restore", f"ids={self.foo_notes[0].pk},{self.foo_notes[1].pk}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"restored": 2})
+        self.tag_foo.refresh_from_db()
+        self.assertEqual(self.tag_foo.note_count, 3)
+        notes = self.client.get(reverse("notes:notes-list")).json()["results"]
+        self.assertEqual(len(notes), 4)
+
+        restored_note = Note.objects.get(pk=self.foo_notes[0].pk)
+        self.assertFalse(restored_note.is_deleted)
+        self.assertIsNone(restored_note.deleted_at)
+
+    def test_bulk_delete_requires_filters(self):
+        for params in (None, "match=all", "unknown=1"):
+            response = self.bulk("delete", params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Note.active_objects.count(), 5)
+
+        response = self.bulk("restore", "tag_ids=not-a-uuid")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_delete_requires_authentication(self):
+        self.client.credentials(**{})
+        for action in ("delete", "restore"):
+            response = self.bulk(action, "is_public=true")
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(Note.active_objects.count(), 5)
+
+    def test_bulk_delete_queries(self):
+        # 1. fetch user (auth)
+        # 2. savepoint
+        # 3. fetch the matching notes
+        # 4. soft delete them with a single UPDATE
+        # 5. fetch their tag links
+        # 6. decrement the note count of the tags
+        # 7. release savepoint
+        with self.assertNumQueries(7):
+            response = self.bulk("delete", "is_public=false")
+        self.assertEqual(response.data, {"deleted": 4})
+
+
+@override_settings(NOTES_SYNC_SETTLE_SECONDS=0)
+class NotesSyncAPITestCase(BaseNotesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.tag = TagFactory(title="foo")
+        with freeze_time("2026-01-01"):
+            self.notes = NoteFactory.create_batch(3, creator=self.user, tags=[self.tag])
+            NoteFactory(creator=self.other_user, is_public=True)
+
+    def sync(self, url=None):
+        response = self.client.get(url or reverse("notes:notes-sync"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    @freeze_time("2026-01-02")
+    def test_sync(self):
+        data = self.sync()
+        self.assertFalse(data["has_more"])
+        self.assertEqual({note["id"] for note in data["results"]}, {str(n.pk) for n in self.notes})
+        self.assertEqual(data["results"][0]["tags"], [{"id": str(self.tag.pk), "title": "foo"}])
+        self.assertFalse(data["results"][0]["is_deleted"])
+
+        with freeze_time("2026-01-03") as frozen_time:
+            self.client.patch(
+                reverse("notes:notes-detail", args=[self.notes[0].pk]), {"title": "updated"}
+            )
+            frozen_time.tick()
+            self.notes[1].soft_delete()
+            frozen_time.tick()
+            created_note = NoteFactory(creator=self.user)
+
+            # Only the changes since the cursor are returned, in the order they happened
+            changes = self.sync(data["next"])
+            self.assertEqual(
+                [note["id"] for note in changes["results"]],
+                [str(self.notes[0].pk), str(self.notes[1].pk), str(created_note.pk)],
+            )
+            self.assertEqual(changes["results"][0]["title"], "updated")
+            self.assertEqual(changes["results"][1], {
+                "id": str(self.notes[1].pk),
+                "is_deleted": True,
+                "deleted_at": "2026-01-03T00:00:01+0000",
+                "last_modified_at": "2026-01-03T00:00:01+0000",
+            })
+
+            # Without new changes, the next sync resumes from the same cursor
+            unchanged = self.sync(changes["next"])
+            self.assertEqual(unchanged["results"], [])
+            self.assertEqual(unchanged["next"], changes["next"])
+
+    @freeze_time("2026-01-02")
+    def test_pages(self):
+        NoteFactory.create_batch(4, creator=self.user)
+        seen, url = [], None
+        with mock.patch.object(SyncPagination, "page_size", 2):
+            while True:
+                data = self.sync(url)
+                seen += [note["id"] for note in data["results"]]
+                url = data["next"]
+                if not data["has_more"]:
+                    break
+
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len(set(seen)), 7)
+
+    @override_settings(NOTES_SYNC_SETTLE_SECONDS=2)
+    def test_settle_window(self):
+        with freeze_time("2026-01-02") as frozen_time:
+            cursor = self.sync()["next"]
+            note = NoteFactory(creator=self.user)
+            self.assertEqual(self.sync(cursor)["results"], [])
+
+            frozen_time.tick(3)
+            self.assertEqual([n["id"] for n in self.sync(cursor)["results"]], [str(note.pk)])
+
+    @freeze_time("2026-01-02")
+    def test_invalid_cursors(self):
+        cursor = self.sync()["next"]
+        with freeze_time("2026-03-01"):
+            response = self.client.get(cursor)
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+        response = self.client.get(reverse("notes:notes-sync"), {"cursor": "invalid"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_sync_requires_authentication(self):
+        self.client.credentials(**{})
+        response = self.client.get(reverse("notes:notes-sync"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @freeze_time("2026-01-02")
+    def test_sync_queries(self):
+        def request(size):
+            NoteFactory.create_batch(size, creator=self.user, tags=[self.tag])
+            Note.objects.filter(pk__in=[note.pk for note in self.notes[:size]]).soft_delete()
+            return self.client.get(reverse("notes:notes-sync"))
+
+        self.assertConstantQueries(request, (1, 3, 10))
+
+    @freeze_time("2026-01-02")
+    @skipUnless(connection.vendor == "sqlite", "SQLite query plan")
+    def test_sync_uses_index(self):
+        with CaptureQueriesContext(connection) as context:
+            self.sync(self.sync()["next"])
+
+        notes_query = [
+            query["sql"] for query in context.captured_queries
+            if query["sql"].startswith('SELECT "notes_note"."id"')
+        ][-1]
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {notes_query}")
+            plan = "\n".join(row[-1] for row in cursor.fetchall())
+        self.assertIn("USING INDEX note_creator_modified_at_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
 class NotesUpdateAPITestCase(BaseNotesAPITestCase):
     def test_update_created_note(self):
         old_tags = TagFactory.create_batch(2)
@@ -367,3 +1536,211 @@ class NotesUpdateAPITestCase(BaseNotesAPITestCase):
         note_detail_url = reverse("notes:notes-detail", kwargs={"pk": note.pk})
         response = self.client.patch(note_detail_url, request_body, format="json")
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class NotesBulkAPITestCase(BaseNotesAPITestCase):
+    def test_bulk_create_update_delete(self):
+        note_to_update = NoteFactory(creator=self.user, tags=TagFactory.create_batch(2))
+        note_to_delete = NoteFactory(creator=self.user)
+        TagFactory(title="existing")
+
+        request_body = [
+            {
+                "action": "create",
+                "data": {
+                    "title": "first",
+                    "body": self.faker.sentence(),
+                    "tags": [{"title": "existing"}, {"title": "new"}],
+                },
+            },
+            {"action": "create", "data": {"title": "second", "body": self.faker.sentence()}},
+            {
+                "action": "update",
+                "id": str(note_to_update.id),
+                "data": {"title": "updated", "tags": [{"title": "new"}]},
+            },
+            {"action": "delete", "id": str(note_to_delete.id)},
+        ]
+        response = self.client.post(reverse("notes:notes-bulk"), request_body, format="json")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        response = response.json()
+
+        self.assertListEqual(
+            [result["status"] for result in response],
+            [status.HTTP_201_CREATED, status.HTTP_201_CREATED, status.HTTP_200_OK,
+             status.HTTP_204_NO_CONTENT]
+        )
+
+        created_note = Note.objects.get(id=response[0]["id"])
+        self.assertEqual(created_note.title, "first")
+        self.assertEqual(created_note.creator, self.user)
+        self.assertSetEqual(
+            set(created_note.tags.values_list("title", flat=True)), {"existing", "new"}
+        )
+        self.assertEqual(response[0]["data"]["title"], "first")
+        self.assertEqual(len(response[0]["data"]["tags"]), 2)
+        self.assertEqual(Note.objects.get(id=response[1]["id"]).title, "second")
+
+        old_last_modified_at = note_to_update.last_modified_at
+        note_to_update.refresh_from_db()
+        self.assertEqual(note_to_update.title, "updated")
+        self.assertGreater(note_to_update.last_modified_at, old_last_modified_at)
+        self.assertListEqual(list(note_to_update.tags.values_list("title", flat=True)), ["new"])
+        self.assertEqual(response[2]["data"]["title"], "updated")
+
+        note_to_delete.refresh_from_db()
+        self.assertTrue(note_to_delete.is_deleted)
+        self.assertIsNotNone(note_to_delete.deleted_at)
+
+    def test_bulk_per_item_validation_and_permissions(self):
+        other_user_public_note = NoteFactory(creator=self.other_user, is_public=True)
+        other_user_private_note = NoteFactory(creator=self.other_user, is_public=False)
+
+        request_body = [
+            {"action": "create", "data": {"title": "valid", "body": self.faker.sentence()}},
+            {"action": "create", "data": {"body": self.faker.sentence()}},
+            {"action": "update", "id": str(other_user_public_note.id), "data": {"title": "x"}},
+            {"action": "delete", "id": str(other_user_private_note.id)},
+        ]
+        response = self.client.post(reverse("notes:notes-bulk"), request_body, format="json")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        response = response.json()
+
+        self.assertEqual(response[0]["status"], status.HTTP_201_CREATED)
+        self.assertEqual(response[1]["status"], status.HTTP_400_BAD_REQUEST)
+        self.assertIn("title", response[1]["errors"])
+        self.assertEqual(response[2]["status"], status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response[3]["status"], status.HTTP_404_NOT_FOUND)
+
+        self.assertTrue(Note.objects.filter(title="valid", creator=self.user).exists())
+        other_user_public_note.refresh_from_db()
+        self.assertNotEqual(other_user_public_note.title, "x")
+        other_user_private_note.refresh_from_db()
+        self.assertFalse(other_user_private_note.is_deleted)
+
+    def test_bulk_invalid_request(self):
+        note = NoteFactory(creator=self.user)
+        invalid_bodies = [
+            {"action": "create"},
+            [{"action": "update", "data": {"title": "x"}}],
+            [{"action": "delete", "id": str(note.id)}, {"action": "delete", "id": str(note.id)}],
+            [{"action": "create", "data": {"title": "x", "body": "y"}}] * 101,
+        ]
+        for request_body in invalid_bodies:
+            response = self.client.post(reverse("notes:notes-bulk"), request_body, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Note.objects.count(), 1)
+
+        self.client.credentials(**{})
+        response = self.client.post(reverse("notes:notes-bulk"), [], format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bulk_queries(self):
+        notes = NoteFactory.create_batch(10, creator=self.user)
+
+        def get_request_body(size):
+            request_body = [
+                {
+                    "action": "create",
+                    "data": {
+                        "title": self.faker.name(),
+                        "body": self.faker.sentence(),
+                        "tags": [{"title": f"tag {i}"} for i in range(size)],
+                    },
+                }
+                for _ in range(size)
+            ]
+            request_body += [
+                {"action": "update", "id": str(note.id), "data": {"tags": [{"title": "tag 0"}]}}
+                for note in notes[:size]
+            ]
+            request_body += [
+                {"action": "delete", "id": str(note.id)} for note in notes[size:size * 2]
+            ]
+            return request_body
+
+        # The query count does not depend on the number of notes or tags in the batch. The
+        # token lookup is cached first, so both batches run the same queries.
+        self.client.get(reverse("notes:tags-list"))
+        with CaptureQueriesContext(connection) as small_batch:
+            response = self.client.post(
+                reverse("notes:notes-bulk"), get_request_body(2), format="json"
+            )
+            self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+
+        with CaptureQueriesContext(connection) as large_batch:
+            response = self.client.post(
+                reverse("notes:notes-bulk"), get_request_body(5), format="json"
+            )
+            self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+
+        self.assertEqual(len(small_batch), len(large_batch))
+
+
+class TagsListAPITestCase(BaseNotesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.python = TagFactory(title="python")
+        self.pytest = TagFactory(title="Pytest")
+        self.django = TagFactory(title="django")
+        self.unused = TagFactory(title="pyunused")
+        NoteFactory.create_batch(3, creator=self.user, tags=(self.python, self.django))
+        NoteFactory.create_batch(2, creator=self.other_user, tags=(self.pytest,))
+        NoteFactory(creator=self.user, tags=(self.django,))
+
+    def get_tags(self, params=None) -> list[tuple[str, int]]:
+        response = self.client.get(reverse("notes:tags-list"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(tag["title"], tag["note_count"]) for tag in response.json()["results"]]
+
+    def test_list_tags_by_popularity(self):
+        self.assertEqual(self.get_tags(), [("django", 4), ("python", 3), ("Pytest", 2)])
+        self.assertEqual(
+            self.get_tags({"ordering": "title"}),
+            [("Pytest", 2), ("django", 4), ("python", 3)],
+        )
+
+        # Soft deleted notes are not counted
+        Note.objects.filter(creator=self.user).soft_delete()
+        self.assertEqual(self.get_tags(), [("Pytest", 2)])
+
+    def test_list_tags_by_prefix(self):
+        self.assertEqual(self.get_tags({"prefix": "py"}), [("python", 3), ("Pytest", 2)])
+        self.assertEqual(self.get_tags({"prefix": "PYT"}), [("python", 3), ("Pytest", 2)])
+        self.assertEqual(self.get_tags({"prefix": "pyth"}), [("python", 3)])
+        self.assertEqual(self.get_tags({"prefix": "%"}), [])
+
+    def test_list_tags_pages(self):
+        tags = [TagFactory(title=f"tag {i}") for i in range(25)]
+        for tag in tags:
+            NoteFactory(creator=self.user, tags=(tag,))
+
+        titles: list[str] = []
+        url = reverse("notes:tags-list")
+        while url:
+            response = self.client.get(url).json()
+            titles += [tag["title"] for tag in response["results"]]
+            url = response["next"]
+        self.assertEqual(len(titles), 28)
+        self.assertEqual(titles[:3], ["django", "python", "Pytest"])
+
+    def test_list_tags_queries(self):
+        self.client.credentials(**{})
+        # A single query, the counts are stored on the tags
+        with self.assertNumQueries(1):
+            self.get_tags({"prefix": "py"})
+
+    @skipUnless(connection.vendor == "sqlite", "Query plan assertions are written for SQLite.")
+    def test_list_tags_query_plans(self):
+        def get_query_plan(params) -> str:
+            with CaptureQueriesContext(connection) as context:
+                self.get_tags(params)
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {context.captured_queries[-1]['sql']}")
+                return "\n".join(row[-1] for row in cursor.fetchall())
+
+        self.assertIn("USING INDEX notes_tag_title_prefix_idx", get_query_plan({"prefix": "py"}))
+
+        plan = get_query_plan(None)
+        self.assertIn("USING INDEX tag_note_count_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
@@ -0,0 +1,109 @@
+from asgiref.sync import async_to_sync
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from .factories import NoteFactory, TagFactory
+from .test_api import BaseNotesAPITestCase
+
+
+class AsyncNotesReadAPITestCase(BaseNotesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.tag = TagFactory(title="foo")
+        self.own_notes = NoteFactory.create_batch(
+            15, creator=self.user, is_public=False, tags=[self.tag]
+        )
+        self.public_notes = NoteFactory.create_batch(
+            15, creator=self.other_user, is_public=True, title="public foo"
+        )
+        self.private_note = NoteFactory(creator=self.other_user, is_public=False)
+
+    def get(self, name, params=None, token=None, **kwargs):
+        """GET the sync and async endpoints and return both responses."""
+
+        if token is None:
+            token = self.user_token.key
+        self.client.credentials(**{"HTTP_AUTHORIZATION": f"Token {token}"} if token else {})
+        sync_response = self.client.get(reverse(f"notes:notes-{name}", kwargs=kwargs), params)
+        async_response = self.async_get(
+            reverse(f"notes:notes-async-{name}", kwargs=kwargs),
+            params,
+            **({"authorization": f"Token {token}"} if token else {}),
+        )
+        return sync_response, async_response
+
+    @async_to_sync
+    async def async_get(self, *args, **kwargs):
+        return await self.async_client.get(*args, **kwargs)
+
+    def assertSameResponse(self, name, params=None, token=None, **kwargs):
+        sync_response, async_response = self.get(name, params, token, **kwargs)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(async_response["Content-Type"], sync_response["Content-Type"])
+        sync_data, async_data = sync_response.json(), async_response.json()
+        if isinstance(sync_data, dict):
+            # Pagination links point at their own endpoint
+            for link in ("next", "previous"):
+                if sync_data.get(link):
+                    self.assertEqual(
+                        async_data[link], sync_data[link].replace("/notes/", "/notes/async/")
+                    )
+                    sync_data[link] = async_data[link]
+        self.assertEqual(async_data, sync_data)
+        return async_response
+
+    def test_list(self):
+        response = self.assertSameResponse("list")
+        self.assertEqual(response.json()["count"], 30)
+
+        self.assertSameResponse("list", {"page": 2})
+        self.assertSameResponse("list", {"page": 3})
+        self.assertSameResponse("list", {"tag_titles": "foo"})
+        self.assertSameResponse("list", {"is_public": "true", "ordering": "title"})
+        self.assertSameResponse("list", {"search": "public"})
+
+        # Anonymous users only see public notes
+        response = self.assertSameResponse("list", token="")
+        self.assertEqual(response.json()["count"], 15)
+
+    def test_list_cursor_pages(self):
+        response = self.assertSameResponse("list", {"cursor": ""})
+        self.assertSameResponse(
+            "list", {"cursor": response.json()["next"].split("cursor=")[1]}
+        )
+
+    def test_retrieve(self):
+        self.assertSameResponse("detail", pk=self.own_notes[0].pk)
+        self.assertSameResponse("detail", pk=self.public_notes[0].pk)
+        response = self.assertSameResponse("detail", pk=self.private_note.pk)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertSameResponse("detail", pk="not-a-uuid")
+
+    def test_fields(self):
+        response = self.assertSameResponse("list", {"fields": "id,title", "cursor": ""})
+        self.assertEqual(set(response.json()["results"][0]), {"id", "title"})
+        self.assertSameResponse("list", {"omit": "tags,creator", "ordering": "creator"})
+        self.assertSameResponse("detail", {"fields": "title,excerpt"}, pk=self.own_notes[0].pk)
+        response = self.assertSameResponse("list", {"fields": "id,password"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_errors(self):
+        response = self.assertSameResponse("list", token="invalid")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response["WWW-Authenticate"], "Token")
+
+        self.assertSameResponse("list", {"page": 10})
+        self.assertSameResponse("list", {"cursor": "garbage"})
+        self.assertSameResponse("list", {"tag_ids": "not-a-uuid"})
+
+    def test_list_queries(self):
+        self.get("list")
+
+        # 1. count of the notes for pagination
+        # 2. fetch the page of notes
+        # 3. fetch the tags of the notes
+        with self.assertNumQueries(3):
+            response = self.async_get(
+                reverse("notes:notes-async-list"), authorization=f"Token {self.user_token.key}"
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
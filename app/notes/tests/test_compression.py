@@ -0,0 +1,141 @@
+import io
+import random
+from unittest import mock, skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from notes.fields import compress_text, decompress_text, get_excerpt
+from notes.models import Note
+from notes.retention import purge_deleted_notes
+from notes.serializers import NoteSerializer
+
+from .factories import NoteFactory
+from .test_api import BaseNotesAPITestCase
+
+LONG_BODY = "The quick brown fox jumps over the lazy dog. " * 100
+
+
+def get_stored_type(note: Note) -> str:
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT typeof("body") FROM "notes_note" WHERE "id" = %s', [note.pk.hex])
+        return cursor.fetchone()[0]
+
+
+class CompressTextTestCase(TestCase):
+    @override_settings(NOTES_BODY_COMPRESSION_MIN_LENGTH=100)
+    def test_compress(self):
+        compressed = compress_text(LONG_BODY)
+        self.assertIsInstance(compressed, bytes)
+        self.assertLess(len(compressed), len(LONG_BODY) / 10)
+        self.assertEqual(decompress_text(compressed), LONG_BODY)
+
+        # Short and incompressible texts are kept as they are
+        self.assertEqual(compress_text("short"), "short")
+        rng = random.Random(0)
+        incompressible = "".join(chr(rng.randrange(33, 127)) for _ in range(100))
+        self.assertEqual(compress_text(incompressible), incompressible)
+
+    def test_compression_disabled(self):
+        self.assertEqual(compress_text(LONG_BODY), LONG_BODY)
+
+    def test_excerpt(self):
+        self.assertEqual(get_excerpt("short", 10), "short")
+        self.assertEqual(get_excerpt("0123456789", 10), "0123456789")
+        self.assertEqual(get_excerpt("0123456789 and more", 10), "0123456789…")
+        self.assertIsNone(get_excerpt(None, 10))
+
+
+@skipUnless(connection.vendor == "sqlite", "Bodies are only compressed on SQLite")
+@override_settings(NOTES_BODY_COMPRESSION_MIN_LENGTH=100)
+class CompressedBodyTestCase(BaseNotesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.note = NoteFactory(title="long", body=LONG_BODY, creator=self.user)
+        self.short_note = NoteFactory(title="short", body="lazy cat", creator=self.user)
+
+    def search(self, terms):
+        response = self.client.get(reverse("notes:notes-list"), {"search": terms})
+        return {note["title"] for note in response.json()["results"]}
+
+    def test_storage(self):
+        self.assertEqual(get_stored_type(self.note), "blob")
+        self.assertEqual(get_stored_type(self.short_note), "text")
+
+        # Loading and serializing the notes is unchanged
+        note = Note.objects.get(pk=self.note.pk)
+        self.assertEqual(note.body, LONG_BODY)
+        self.assertEqual(NoteSerializer(note).data["body"], LONG_BODY)
+        self.assertEqual(Note.objects.values_list("body", flat=True).get(pk=note.pk), LONG_BODY)
+
+        response = self.client.get(reverse("notes:notes-detail", args=[self.note.pk]))
+        self.assertEqual(response.json()["body"], LONG_BODY)
+
+    def test_search(self):
+        self.assertEqual(self.search("lazy"), {"long", "short"})
+        self.assertEqual(self.search("fox"), {"long"})
+
+        response = self.client.patch(
+            reverse("notes:notes-detail", args=[self.note.pk]), {"body": f"A cat. {LONG_BODY}"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.search("cat"), {"long", "short"})
+
+        self.note.soft_delete()
+        self.assertEqual(self.search("lazy"), {"short"})
+        Note.objects.filter(pk=self.note.pk).restore()
+        self.assertEqual(self.search("fox"), {"long"})
+
+        Note.objects.filter(pk=self.note.pk).soft_delete()
+        purge_deleted_notes(retention_days=0)
+        self.assertEqual(self.search("lazy"), {"short"})
+        self.assertEqual(self.search("fox"), set())
+
+    def test_list_excerpts(self):
+        response = self.client.get(reverse("notes:notes-list"), {"search": "fox"})
+        note = response.json()["results"][0]
+        self.assertNotIn("body", note)
+        self.assertEqual(note["excerpt"], LONG_BODY[:200] + "…")
+
+        response = self.client.get(reverse("notes:notes-list"), {"fields": "title,body"})
+        notes = {note["title"]: note for note in response.json()["results"]}
+        self.assertEqual(notes["long"]["body"], LONG_BODY)
+        self.assertNotIn("excerpt", notes["long"])
+
+    def test_list_excerpts_of_page(self):
+        NoteFactory.create_batch(30, body=LONG_BODY, creator=self.user)
+
+        # Only the bodies of the page are decompressed and cut, not those of every note
+        # sorted before the LIMIT
+        with (
+            mock.patch("notes.fields.decompress_text", wraps=decompress_text) as decompress,
+            mock.patch("notes.serializers.get_excerpt", wraps=get_excerpt) as excerpt,
+        ):
+            response = self.client.get(reverse("notes:notes-list"))
+        self.assertEqual(len(response.json()["results"]), 20)
+        self.assertEqual(excerpt.call_count, 20)
+        compressed: list = [
+            call for call in decompress.call_args_list if isinstance(call.args[0], bytes)
+        ]
+        self.assertEqual(len(compressed), 20)
+
+    @override_settings(NOTES_BODY_COMPRESSION_MIN_LENGTH=None)
+    def test_command(self):
+        notes = NoteFactory.create_batch(3, body=LONG_BODY, creator=self.user)
+        self.assertEqual(get_stored_type(notes[0]), "text")
+
+        stdout = io.StringIO()
+        with override_settings(NOTES_BODY_COMPRESSION_MIN_LENGTH=100):
+            call_command("compress_note_bodies", batch_size=2, stdout=stdout)
+        self.assertIn("Rewrote 5 note bodies", stdout.getvalue())
+        self.assertEqual({get_stored_type(note) for note in notes}, {"blob"})
+        self.assertEqual(Note.objects.get(pk=notes[0].pk).body, LONG_BODY)
+        self.assertEqual(len(self.search("fox")), 4)
+
+        # Rewriting with compression disabled decompresses them
+        call_command("compress_note_bodies", stdout=io.StringIO())
+        self.assertEqual(get_stored_type(notes[0]), "text")
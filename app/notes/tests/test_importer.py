@@ -0,0 +1,181 @@
+import io
+import json
+import tempfile
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from notes.importer import ImportConflict, NoteImporter
+from notes.models import Note, NoteImport, Tag
+from users.tests.factories import UserFactory
+
+from .factories import TagFactory
+
+
+def to_lines(*rows) -> list[bytes]:
+    return [
+        (row if isinstance(row, str) else json.dumps(row)).encode() + b"\n" for row in rows
+    ]
+
+
+class NoteImporterTestCase(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.note_import = NoteImport.objects.create(creator=self.user)
+        self.tag_foo = TagFactory(title="foo")
+
+    def test_import(self):
+        lines = to_lines(
+            {"title": "one", "body": "first", "tags": [{"title": "foo"}, {"title": "bar"}]},
+            {"title": "two", "body": "second", "is_public": True},
+            "",
+            {"title": "three", "body": "third", "tags": [{"title": "bar"}]},
+        )
+        note_import = NoteImporter(self.note_import, batch_size=2).run(lines)
+
+        self.assertEqual(note_import.lines_processed, 4)
+        self.assertEqual(note_import.imported_count, 3)
+        self.assertEqual(note_import.error_count, 0)
+        self.assertIsNotNone(note_import.completed_at)
+
+        notes = {note.title: note for note in Note.objects.filter(creator=self.user)}
+        self.assertEqual(set(notes), {"one", "two", "three"})
+        self.assertTrue(notes["two"].is_public)
+        self.assertSetEqual(
+            set(notes["one"].tags.values_list("title", flat=True)), {"foo", "bar"}
+        )
+
+        # Existing tags are reused and the tag note counts are maintained
+        self.assertEqual(Tag.objects.count(), 2)
+        self.assertEqual(
+            dict(Tag.objects.values_list("title", "note_count")), {"foo": 1, "bar": 2}
+        )
+
+    def test_invalid_lines(self):
+        lines = to_lines(
+            {"title": "valid", "body": "body"},
+            "{not json",
+            {"title": "no body"},
+            ["not", "an", "object"],
+            {"title": "long tag", "body": "body", "tags": [{"title": "x" * 31}]},
+        )
+        importer = NoteImporter(self.note_import)
+        note_import = importer.run(lines)
+
+        self.assertEqual(note_import.imported_count, 1)
+        self.assertEqual(note_import.error_count, 4)
+        self.assertEqual([error["line"] for error in importer.errors], [2, 3, 4, 5])
+        self.assertIn("body", importer.errors[1]["errors"])
+        self.assertIn("tags", importer.errors[3]["errors"])
+        self.assertFalse(Tag.objects.filter(title="x" * 31).exists())
+
+        with mock.patch.object(NoteImporter, "max_reported_errors", 2):
+            importer = NoteImporter(NoteImport.objects.create(creator=self.user))
+            importer.run(lines)
+        self.assertEqual(len(importer.errors), 2)
+        self.assertEqual(importer.note_import.error_count, 4)
+
+    def test_resume(self):
+        lines = to_lines(*({"title": f"note {i}", "body": "body"} for i in range(5)))
+
+        # The import fails while saving the second batch
+        original_bulk_create = Note.objects.bulk_create
+        calls = []
+
+        def failing_bulk_create(notes, *args, **kwargs):
+            calls.append(notes)
+            if len(calls) == 2:
+                raise RuntimeError("Connection lost")
+            return original_bulk_create(notes, *args, **kwargs)
+
+        with mock.patch.object(Note.objects, "bulk_create", side_effect=failing_bulk_create):
+            with self.assertRaises(RuntimeError):
+                NoteImporter(self.note_import, batch_size=2).run(lines)
+
+        # Only the first batch and its checkpoint were committed
+        self.note_import.refresh_from_db()
+        self.assertEqual(self.note_import.lines_processed, 2)
+        self.assertIsNone(self.note_import.completed_at)
+        self.assertEqual(Note.objects.count(), 2)
+
+        note_import = NoteImporter(self.note_import, batch_size=2).run(lines)
+        self.assertEqual(note_import.lines_processed, 5)
+        self.assertEqual(note_import.imported_count, 5)
+        self.assertListEqual(
+            sorted(Note.objects.values_list("title", flat=True)),
+            [f"note {i}" for i in range(5)],
+        )
+
+    def test_concurrent_runs(self):
+        lines = to_lines({"title": "note", "body": "body"})
+        stale_import = NoteImport.objects.get(pk=self.note_import.pk)
+        NoteImporter(self.note_import).run(lines)
+
+        with self.assertRaises(ImportConflict):
+            NoteImporter(stale_import).run(lines + lines)
+        self.assertEqual(Note.objects.count(), 1)
+
+    def test_batch_queries(self):
+        def get_lines(count):
+            return to_lines(*(
+                {"title": f"note {i}", "body": "body", "tags": [{"title": f"tag {i}"}]}
+                for i in range(count)
+            ))
+
+        # 1. savepoint
+        # 2. insert notes
+        # 3. fetch existing tags
+        # 4. insert missing tags
+        # 5. fetch inserted tags
+        # 6. fetch current note tag links
+        # 7. insert links
+        # 8. increment the note count of the tags
+        # 9. update the checkpoint
+        # 10. release savepoint
+        # 11. mark the import as completed
+        with self.assertNumQueries(11):
+            NoteImporter(self.note_import).run(get_lines(10))
+        note_import = NoteImport.objects.create(creator=self.user)
+        with self.assertNumQueries(11):
+            NoteImporter(note_import).run(get_lines(100))
+
+
+class ImportNotesCommandTestCase(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+
+    def test_import_and_resume(self):
+        with tempfile.NamedTemporaryFile(suffix=".ndjson") as file:
+            file.writelines(to_lines(
+                {"title": "one", "body": "body", "tags": [{"title": "foo"}]},
+                {"title": "two"},
+                {"title": "three", "body": "body"},
+            ))
+            file.flush()
+
+            stdout, stderr = io.StringIO(), io.StringIO()
+            call_command(
+                "import_notes", file.name, user=self.user.username, batch_size=2,
+                stdout=stdout, stderr=stderr,
+            )
+            note_import = NoteImport.objects.get()
+            self.assertEqual(note_import.name, file.name)
+            self.assertIn("Imported 2 notes, 1 lines failed", stdout.getvalue())
+            self.assertIn("line 2: ", stderr.getvalue())
+
+            # Nothing is imported twice
+            call_command(
+                "import_notes", file.name, resume=str(note_import.pk), stdout=io.StringIO()
+            )
+            self.assertEqual(Note.objects.filter(creator=self.user).count(), 2)
+
+    def test_errors(self):
+        with self.assertRaisesMessage(CommandError, "--user is required"):
+            call_command("import_notes", "notes.ndjson")
+        with self.assertRaisesMessage(CommandError, "does not exist"):
+            call_command("import_notes", "notes.ndjson", resume="not-a-uuid")
+        with self.assertRaises(CommandError):
+            call_command(
+                "import_notes", "missing.ndjson", user=self.user.username, stdout=io.StringIO()
+            )
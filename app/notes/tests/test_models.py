@@ -1,9 +1,13 @@
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from freezegun import freeze_time
 
-from notes.models import Tag
+from notes.models import Note, NoteQuerySet, Tag
 
 from .factories import NoteFactory, TagFactory
 
@@ -31,6 +35,34 @@ class NoteModelTestCase(TestCase):
         # deleted_at should be populated with correct time
         self.assertEqual(self.note_one.deleted_at, yesterday)
 
+    def test_soft_delete_updated_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.note_one.soft_delete()
+        update = next(query["sql"] for query in queries if query["sql"].startswith("UPDATE"))
+        self.assertNotIn('"title"', update)
+        self.assertIn('"deleted_at"', update)
+
+    def test_queryset_restore(self):
+        Note.objects.filter(pk=self.note_one.pk).soft_delete()
+        self.assertEqual(self.tag_foo_count(), 0)
+
+        with self.assertNumQueries(6):
+            restored = Note.objects.all().restore()
+        self.assertEqual(restored, 1)
+        self.assertEqual(self.tag_foo_count(), 1)
+
+        self.note_one.refresh_from_db()
+        self.assertFalse(self.note_one.is_deleted)
+        self.assertIsNone(self.note_one.deleted_at)
+
+        # Active notes are not restored and do not count twice
+        self.assertEqual(Note.objects.all().restore(), 0)
+        self.assertEqual(self.tag_foo_count(), 1)
+
+    def tag_foo_count(self) -> int:
+        self.tag_foo.refresh_from_db()
+        return self.tag_foo.note_count
+
     def test_update_note_tags(self):
         tags_to_update = [
             {"title": "foobar"},
@@ -48,3 +80,167 @@ class NoteModelTestCase(TestCase):
             set(self.note_two.tags.values_list("title", flat=True)),
             {"bar", "foobar"}
         )
+
+    def test_update_note_tags_queries(self):
+        existing_tags = TagFactory.create_batch(25)
+        tags_to_update = [{"title": tag.title} for tag in existing_tags[:20]]
+        tags_to_update += [{"title": f"new tag {i}"} for i in range(30)]
+
+        # Tag resolution is batched, the query count does not depend on the tag count:
+        # 1. fetch existing tags
+        # 2. insert missing tags
+        # 3. fetch inserted tags
+        # 4. fetch current note tag links
+        # 5. fetch removed links, for the tag note counts
+        # 6. delete removed links
+        # 7. decrement the note count of removed tags
+        # 8. check links to be added (`m2m_changed` has receivers)
+        # 9. insert added links
+        # 10. increment the note count of added tags
+        with self.assertNumQueries(10):
+            self.note_one.update_note_tags(tags_to_update)
+
+        self.assertSetEqual(
+            set(self.note_one.tags.values_list("title", flat=True)),
+            {tag["title"] for tag in tags_to_update}
+        )
+
+        # Unchanged tags only cost the tag lookup and the link diff
+        with self.assertNumQueries(2):
+            self.note_one.update_note_tags(tags_to_update)
+
+
+class TagModelTestCase(TestCase):
+    def test_get_or_create_by_titles(self):
+        foo = TagFactory(title="foo")
+
+        tags = Tag.objects.get_or_create_by_titles(["foo", "bar", "bar"])
+        self.assertSetEqual(set(tags), {"foo", "bar"})
+        self.assertEqual(tags["foo"], foo)
+        self.assertEqual(Tag.objects.count(), 2)
+
+        with self.assertNumQueries(0):
+            self.assertDictEqual(Tag.objects.get_or_create_by_titles([]), {})
+
+    def test_get_or_create_by_titles_concurrent_insert(self):
+        bulk_create = Tag.objects.bulk_create
+
+        def concurrent_bulk_create(*args, **kwargs):
+            # Another request creates the tag between our lookup and insert
+            Tag.objects.create(title="foo")
+            return bulk_create(*args, **kwargs)
+
+        with mock.patch.object(Tag.objects, "bulk_create", side_effect=concurrent_bulk_create):
+            tags = Tag.objects.get_or_create_by_titles(["foo"])
+
+        self.assertEqual(Tag.objects.filter(title="foo").count(), 1)
+        self.assertEqual(tags["foo"], Tag.objects.get(title="foo"))
+
+
+class TagNoteCountTestCase(TestCase):
+    def setUp(self):
+        self.tag_foo = TagFactory(title="foo")
+        self.tag_bar = TagFactory(title="bar")
+        self.note_one = NoteFactory(tags=(self.tag_foo, self.tag_bar))
+        self.note_two = NoteFactory(tags=(self.tag_foo,))
+
+    def assertNoteCounts(self, foo, bar):
+        counts = dict(Tag.objects.values_list("title", "note_count"))
+        self.assertEqual((counts["foo"], counts["bar"]), (foo, bar))
+
+        # The counts always match the links of active notes
+        for tag in Tag.objects.all():
+            self.assertEqual(
+                tag.note_count, tag.notes.filter(is_deleted=False).count(), tag.title
+            )
+
+    def test_links_change_counts(self):
+        self.assertNoteCounts(2, 1)
+
+        self.note_two.tags.add(self.tag_foo, self.tag_bar)
+        self.assertNoteCounts(2, 2)
+
+        # Removing an unlinked tag does not change anything
+        self.note_one.tags.remove(self.tag_foo, TagFactory(title="baz"))
+        self.assertNoteCounts(1, 2)
+
+        self.tag_bar.notes.remove(self.note_one)
+        self.assertNoteCounts(1, 1)
+
+        self.tag_foo.notes.add(self.note_one)
+        self.assertNoteCounts(2, 1)
+
+        self.note_one.tags.clear()
+        self.assertNoteCounts(1, 1)
+
+        self.tag_foo.notes.clear()
+        self.assertNoteCounts(0, 1)
+
+        self.note_one.update_note_tags([{"title": "foo"}, {"title": "bar"}])
+        self.assertNoteCounts(1, 2)
+
+    def test_soft_delete_and_delete_change_counts(self):
+        self.note_one.soft_delete()
+        self.assertNoteCounts(1, 0)
+
+        # Soft deleting again, or changing the tags of a deleted note, is not counted
+        self.note_one.soft_delete()
+        self.note_one.tags.remove(self.tag_foo)
+        self.tag_bar.notes.add(self.note_one)
+        self.assertNoteCounts(1, 0)
+
+        Note.objects.filter(pk=self.note_two.pk).soft_delete()
+        self.assertNoteCounts(0, 0)
+
+        note = NoteFactory(tags=(self.tag_foo, self.tag_bar))
+        self.assertNoteCounts(1, 1)
+        note.delete()
+        self.assertNoteCounts(0, 0)
+
+        # Hard deleting soft deleted notes does not change the counts
+        Note.objects.all().delete()
+        self.assertNoteCounts(0, 0)
+
+    def test_concurrent_soft_delete_and_restore_change_counts(self):
+        update = NoteQuerySet.update
+
+        def change_before_update(change):
+            """Let another transaction change `note_one` after it was selected."""
+
+            def side_effect(queryset, **kwargs):
+                if mock_update.call_count == 1:
+                    change(Note.objects.filter(pk=self.note_one.pk))
+                return update(queryset, **kwargs)
+
+            return side_effect
+
+        with mock.patch.object(
+            NoteQuerySet, "update", autospec=True,
+            side_effect=change_before_update(NoteQuerySet.soft_delete),
+        ) as mock_update:
+            self.assertEqual(Note.objects.all().soft_delete(), 1)
+        # Each note is only removed from the counts once
+        self.assertNoteCounts(0, 0)
+
+        with mock.patch.object(
+            NoteQuerySet, "update", autospec=True,
+            side_effect=change_before_update(NoteQuerySet.restore),
+        ) as mock_update:
+            self.assertEqual(Note.objects.all().restore(), 1)
+        self.assertNoteCounts(2, 1)
+
+    def test_bulk_update_note_tags_changes_counts(self):
+        Note.bulk_update_note_tags({
+            self.note_one: [{"title": "foo"}, {"title": "baz"}],
+            self.note_two: [{"title": "bar"}, {"title": "baz"}],
+        })
+        self.assertNoteCounts(1, 1)
+        self.assertEqual(Tag.objects.get(title="baz").note_count, 2)
+
+    def test_save_does_not_overwrite_count(self):
+        tag = Tag.objects.get(pk=self.tag_foo.pk)
+        NoteFactory(tags=(tag,))
+
+        tag.title = "renamed"
+        tag.save()
+        self.assertEqual(Tag.objects.get(pk=tag.pk).note_count, 3)
@@ -0,0 +1,112 @@
+import io
+from unittest import mock, skipUnless
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from freezegun import freeze_time
+
+from notes.models import Note, Tag, delete_rows
+from notes.retention import purge_deleted_notes
+
+from .factories import NoteFactory, TagFactory
+
+
+class PurgeDeletedNotesTestCase(TestCase):
+    def setUp(self):
+        self.tag_foo = TagFactory(title="foo")
+        self.tag_bar = TagFactory(title="bar")
+        self.tag_old = TagFactory(title="old")
+        self.tag_unused = TagFactory(title="unused")
+
+        self.active_note = NoteFactory(tags=(self.tag_foo,))
+        with freeze_time(timezone.now() - timezone.timedelta(days=40)):
+            self.old_notes = NoteFactory.create_batch(
+                3, title="title", body="body", tags=(self.tag_bar, self.tag_old)
+            )
+            Note.objects.filter(pk__in=[note.pk for note in self.old_notes]).soft_delete()
+        with freeze_time(timezone.now() - timezone.timedelta(days=10)):
+            self.recent_note = NoteFactory(tags=(self.tag_bar,))
+            self.recent_note.soft_delete()
+
+    def test_purge(self):
+        purged = purge_deleted_notes(retention_days=30, batch_size=2)
+        self.assertEqual(
+            purged, {"notes": 3, "tag_links": 6, "tags": 2, "bytes": 3 * 9 + 3 + 6}
+        )
+
+        self.assertSetEqual(
+            set(Note.objects.values_list("pk", flat=True)),
+            {self.active_note.pk, self.recent_note.pk},
+        )
+        self.assertFalse(Note.tags.through.objects.filter(note_id__in=self.old_notes).exists())
+
+        # Tags still linked to a note, even a soft deleted one, are kept
+        self.assertSetEqual(set(Tag.objects.values_list("title", flat=True)), {"foo", "bar"})
+        self.assertEqual(
+            dict(Tag.objects.values_list("title", "note_count")), {"foo": 1, "bar": 0}
+        )
+
+        # Nothing is left to purge
+        self.assertEqual(
+            purge_deleted_notes(retention_days=30),
+            {"notes": 0, "tag_links": 0, "tags": 0, "bytes": 0},
+        )
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite full text search index")
+    def test_purge_search_index(self):
+        purge_deleted_notes(retention_days=0)
+
+        # The delete triggers of the search index also run for the batched deletes
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT "note_id" FROM "notes_note_fts_docs"')
+            self.assertEqual(
+                [row[0] for row in cursor.fetchall()], [self.active_note.pk.hex]
+            )
+
+    def test_active_notes_are_never_purged(self):
+        Note.objects.all().purge()
+        self.assertTrue(Note.objects.filter(pk=self.active_note.pk).exists())
+
+    def test_restored_during_purge(self):
+        restored_note: Note = self.old_notes[0]
+
+        def restore_then_delete(queryset):
+            # Restore a note of the batch once it is selected, before it is deleted
+            if mock_delete_rows.call_count == 1:
+                Note.objects.filter(pk=restored_note.pk).restore()
+            return delete_rows(queryset)
+
+        with mock.patch(
+            "notes.models.delete_rows", side_effect=restore_then_delete
+        ) as mock_delete_rows:
+            purged = purge_deleted_notes(retention_days=30)
+        self.assertEqual((purged["notes"], purged["tag_links"]), (2, 4))
+
+        restored_note = Note.objects.get(pk=restored_note.pk)
+        self.assertFalse(restored_note.is_deleted)
+        self.assertSetEqual(
+            {tag.title for tag in restored_note.tags.all()}, {"bar", "old"}
+        )
+        self.assertEqual(
+            dict(Tag.objects.values_list("title", "note_count")),
+            {"foo": 1, "bar": 1, "old": 1},
+        )
+
+    def test_batch_queries(self):
+        # Per batch of notes: savepoint, fetch ids, delete links, delete notes, release.
+        # Each batch of orphaned tags: savepoint, fetch ids, delete tags, release.
+        # The last (empty) batch of each: savepoint, fetch ids, release.
+        with self.assertNumQueries(5 * 2 + 3 + 4 + 3):
+            purge_deleted_notes(retention_days=30, batch_size=2)
+
+    @override_settings(NOTES_PURGE_RETENTION_DAYS=5)
+    def test_command(self):
+        stdout = io.StringIO()
+        call_command("purge_deleted_notes", stdout=stdout)
+        self.assertIn("Purged 4 notes, 7 tag links and 3 orphaned tags", stdout.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command("purge_deleted_notes", days=-1)
@@ -0,0 +1,47 @@
+from django.db.models import Prefetch
+from django.test import TestCase
+
+from rest_framework.renderers import JSONRenderer
+
+from notes.models import Note, Tag
+from notes.serializers import NoteReadSerializer, NoteSerializer
+
+from .factories import NoteFactory, TagFactory
+
+
+class NoteReadSerializerTestCase(TestCase):
+    def setUp(self):
+        tags = [TagFactory(title=title) for title in ("zeta", "alpha", "ümlaut", 'quo"te')]
+        NoteFactory(title="no tags", body="line\nbreak")
+        NoteFactory(title="all tags", body="<b>ü</b>", tags=tags, is_public=True)
+        NoteFactory(title="some tags", tags=tags[:2])
+
+    def get_querysets(self):
+        notes = Note.active_objects.order_by("-created_at")
+        return (
+            notes.select_related("creator").prefetch_related(
+                Prefetch("tags", queryset=Tag.objects.order_by("title"))
+            ),
+            notes.values(*NoteReadSerializer.values),
+        )
+
+    def test_output_is_identical_to_note_serializer(self):
+        models, values = self.get_querysets()
+        self.assertEqual(
+            JSONRenderer().render(NoteReadSerializer(values, many=True).data),
+            JSONRenderer().render(NoteSerializer(models, many=True).data),
+        )
+
+        for note, row in zip(models, values):
+            self.assertEqual(
+                JSONRenderer().render(NoteReadSerializer(row).data),
+                JSONRenderer().render(NoteSerializer(note).data),
+            )
+
+    def test_list_queries(self):
+        _, values = self.get_querysets()
+
+        # 1. fetch the notes
+        # 2. fetch the tags of all the notes
+        with self.assertNumQueries(2):
+            NoteReadSerializer(values, many=True).data
@@ -1,11 +1,20 @@
+from django.urls import path
+
 from rest_framework.routers import SimpleRouter
 
-from notes.views import NoteViewSet
+from notes.async_views import AsyncNoteReadView
+from notes.views import NoteViewSet, TagViewSet
 
 app_name = "notes"
-urlpatterns = []
+# Before the router urls, so `async/` is not matched as a note id
+urlpatterns = [
+    path("async/", AsyncNoteReadView.as_view(), name="notes-async-list"),
+    path("async/<str:pk>/", AsyncNoteReadView.as_view(), name="notes-async-detail"),
+]
 
 router = SimpleRouter()
+# Registered first, so `tags/` is not matched as a note id
+router.register("tags", TagViewSet, basename="tags")
 router.register("", NoteViewSet, basename="notes")
 
 urlpatterns.extend(router.urls)
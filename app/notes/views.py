@@ -1,26 +1,68 @@
-from django.db.models import Q, QuerySet
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Prefetch, Q, QuerySet
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import OrderingFilter, SearchFilter
-from rest_framework.viewsets import ModelViewSet
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, NotFound, ValidationError as APIValidationError
+from rest_framework.filters import OrderingFilter
+from rest_framework.mixins import ListModelMixin
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+from rest_framework.viewsets import GenericViewSet, ModelViewSet
 
-from .filters import NoteFilter
-from .models import Note
+from app.routers import ReplicaReadMixin
+
+from .cache import CachedListMixin
+from .conditional import ConditionalRequestMixin
+from .export import iter_notes, render_csv, render_ndjson
+from .fieldsets import SparseFieldsetMixin
+from .filters import NoteFilter, NoteSearchFilter, TagFilter
+from .importer import ImportConflict, NoteImporter
+from .models import Note, NoteImport, Tag
+from .pagination import NotePagination, SyncPagination, TagPagination
 from .permissions import IsCreatorOrReadOnly
-from .serializers import NoteSerializer
+from .serializers import (
+    NoteBulkOperationSerializer,
+    NoteImportSerializer,
+    NoteReadSerializer,
+    NoteSerializer,
+    NoteSyncSerializer,
+    TagNoteCountSerializer,
+)
 
 
 # TODO: Add swagger docs information for each endpoint separately.
-class NoteViewSet(ModelViewSet):
+class NoteViewSet(
+    ReplicaReadMixin,
+    SparseFieldsetMixin,
+    ConditionalRequestMixin,
+    CachedListMixin,
+    ModelViewSet,
+):
     """API for handling creation, access and deletion of notes."""
 
     serializer_class = NoteSerializer
     permission_classes = [IsCreatorOrReadOnly]
+    pagination_class = NotePagination
     queryset = Note.active_objects.order_by("-created_at")
-    filter_backends = (DjangoFilterBackend, SearchFilter, OrderingFilter)
+    filter_backends = (DjangoFilterBackend, NoteSearchFilter, OrderingFilter)
     filterset_class = NoteFilter
-    search_fields = ["title", "body"]
     ordering_fields = ["creator", "title", "is_public", "created_at", "last_modified_at"]
+    read_actions = ("list", "retrieve", "export")
+    fieldset_actions = ("list", "retrieve", "create", "update", "partial_update")
+    # The sync cursor moves past every row read, even ones a lagging replica does not have yet
+    primary_read_actions = ("sync",)
+    export_chunk_size = 2000
+    export_formats = {
+        "ndjson": (render_ndjson, "application/x-ndjson"),
+        "csv": (render_csv, "text/csv"),
+    }
 
     def get_queryset(self) -> QuerySet[Note]:
         """
@@ -28,13 +70,345 @@ class NoteViewSet(ModelViewSet):
         Public notes are visible to all users, even unauthenticated users.
         """
 
-        qs: QuerySet = super().get_queryset().select_related("creator").prefetch_related("tags")
+        qs: QuerySet = super().get_queryset()
+        if self.action in self.read_actions:
+            qs = qs.values(*self.get_read_values())
+        else:
+            # Creators and tags are only loaded to be rendered
+            if self.fieldset is None or "creator" in self.fieldset:
+                qs = qs.select_related("creator")
+            if self.fieldset is None or "tags" in self.fieldset:
+                qs = qs.prefetch_related(Prefetch("tags", queryset=Tag.objects.order_by("title")))
+        return self.get_visible_queryset(qs)
+
+    def get_fieldset_fields(self) -> tuple[list[str], list[str]]:
+        """
+        Lists render an `excerpt` of the bodies by default rather than the bodies, which are
+        available with `?fields=`. Only the read actions can render an excerpt.
+        """
+
+        fields: list[str] = list(NoteSerializer.Meta.fields)
+        if self.action not in self.read_actions:
+            return fields, fields
+        available: list[str] = fields + ["excerpt"]
+        if self.action == "list":
+            return available, [field for field in available if field != "body"]
+        return available, fields
+
+    def get_read_values(self) -> list[str]:
+        """
+        Return the fields of the `.values()` rows of the read actions, only loading the
+        columns of the requested fields.
+        """
+
+        if self.fieldset is None:
+            return list(NoteReadSerializer.values)
+
+        fields: list[str] = ["id"]
+        for name, columns in NoteReadSerializer.field_values.items():
+            if name in self.fieldset:
+                fields += columns
+        return list(dict.fromkeys(fields))
+
+    def get_serializer_class(self) -> type[BaseSerializer]:
+        """Serialize list and retrieve responses with the `.values()` based serializer."""
+
+        if self.action in self.read_actions and not getattr(self, "swagger_fake_view", False):
+            return NoteReadSerializer
+        return super().get_serializer_class()
+
+    def get_visible_queryset(self, queryset: QuerySet[Note]) -> QuerySet[Note]:
+        """Filter the given notes down to the ones visible to the requesting user."""
+
         query: Q = Q(is_public=True)
         if self.request.user.is_authenticated:
             query |= Q(creator_id=self.request.user.id)
-        return qs.filter(query)
+        return queryset.filter(query)
+
+    def split_queryset(self, queryset: QuerySet[Note]) -> list[QuerySet[Note]]:
+        """
+        Split the visible notes of authenticated users into the public notes and their own
+        private ones, for keyset pages to read each branch in order from its own index.
+        """
+
+        if not self.request.user.is_authenticated:
+            return [queryset]
+        return [
+            queryset.filter(is_public=True),
+            queryset.filter(is_public=False, creator_id=self.request.user.id),
+        ]
 
     def perform_destroy(self, instance: Note) -> None:
         """Soft delete note instead of removing it from the db."""
 
         instance.soft_delete()
+
+    @action(
+        detail=False,
+        url_path=r"export/(?P<export_format>ndjson|csv)",
+        permission_classes=[IsAuthenticated],
+    )
+    def export(self, request, export_format: str) -> StreamingHttpResponse:
+        """
+        Stream all the notes of the requesting user, with their tags, as NDJSON or CSV.
+        Filters, search and ordering apply like on the list endpoint.
+        """
+
+        # The notes are streamed after the response is returned, bind them to the database
+        # picked for this request
+        queryset: QuerySet = self.filter_queryset(self.get_queryset()).filter(
+            creator_id=request.user.id
+        )
+        queryset = queryset.using(queryset.db)
+        render, content_type = self.export_formats[export_format]
+        response = StreamingHttpResponse(
+            render(iter_notes(queryset, self.export_chunk_size)), content_type=content_type
+        )
+        response["Content-Disposition"] = f'attachment; filename="notes.{export_format}"'
+        return response
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="bulk-delete",
+        url_name="bulk-delete",
+        permission_classes=[IsAuthenticated],
+    )
+    def bulk_delete(self, request) -> Response:
+        """
+        Soft delete all the notes of the requesting user matching the filters in the query
+        string (e.g. `?tag_titles=foo`), with a single UPDATE query.
+        """
+
+        notes: QuerySet[Note] = self.get_bulk_queryset(request, is_deleted=False)
+        return Response({"deleted": notes.soft_delete()})
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="bulk-restore",
+        url_name="bulk-restore",
+        permission_classes=[IsAuthenticated],
+    )
+    def bulk_restore(self, request) -> Response:
+        """Restore all the soft deleted notes of the requesting user matching the filters."""
+
+        notes: QuerySet[Note] = self.get_bulk_queryset(request, is_deleted=True)
+        return Response({"restored": notes.restore()})
+
+    def get_bulk_queryset(self, request, is_deleted: bool) -> QuerySet[Note]:
+        """
+        Return the notes of the requesting user matching the `NoteFilter` filters of the
+        request. At least one filter is required, so an empty query string never affects
+        all of the notes by accident.
+        """
+
+        # `match` only changes how the tag filters combine
+        filters: set[str] = set(NoteFilter.base_filters) - {"match"}
+        if not filters.intersection(request.query_params):
+            raise APIValidationError({"detail": "At least one filter is required."})
+
+        queryset: QuerySet[Note] = Note.objects.filter(
+            creator_id=request.user.id, is_deleted=is_deleted
+        )
+        return DjangoFilterBackend().filter_queryset(request, queryset, self)
+
+    @action(
+        detail=False,
+        permission_classes=[IsAuthenticated],
+        pagination_class=SyncPagination,
+        serializer_class=NoteSyncSerializer,
+    )
+    def sync(self, request) -> Response:
+        """
+        Incremental sync of the notes of the requesting user. Returns the notes created,
+        updated or soft deleted (as tombstones) since the `cursor` of the previous sync, in
+        the order they last changed. Without a cursor, all the notes are returned.
+
+        Cursors are positions in `last_modified_at`, which is not a commit order: a change
+        committed after a later stamped one would be skipped by the cursors past it. Only
+        changes older than `NOTES_SYNC_SETTLE_SECONDS` are returned, which is safe as long
+        as no transaction writing notes lasts longer than that.
+        """
+
+        settled_at = timezone.now() - timezone.timedelta(
+            seconds=settings.NOTES_SYNC_SETTLE_SECONDS
+        )
+        queryset: QuerySet[Note] = Note.objects.filter(
+            creator_id=request.user.id, last_modified_at__lte=settled_at
+        ).values(*NoteSyncSerializer.values)
+        page: list[dict] = self.paginate_queryset(queryset)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        url_name="import",
+        permission_classes=[IsAuthenticated],
+    )
+    def import_notes(self, request) -> Response:
+        """
+        Import notes from an NDJSON request body, one note per line. The body is streamed
+        and imported in batches, the response reports the progress and the first errors.
+
+        An import interrupted by a failed request is resumed by uploading the same body
+        again with `?resume=<import id>`, lines imported before are skipped.
+        """
+
+        resume: str | None = request.query_params.get("resume")
+        if resume:
+            try:
+                note_import = NoteImport.objects.get(pk=resume, creator_id=request.user.id)
+            except (NoteImport.DoesNotExist, ValidationError):
+                raise NotFound()
+        else:
+            note_import = NoteImport.objects.create(creator_id=request.user.id)
+
+        # Lines are read from the request stream, the body is never loaded as a whole
+        importer = NoteImporter(note_import)
+        try:
+            importer.run(request.stream or [])
+        except ImportConflict as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_409_CONFLICT)
+
+        data: dict = NoteImportSerializer(note_import).data
+        data["errors"] = importer.errors
+        return Response(data, status=status.HTTP_200_OK if resume else status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request) -> Response:
+        """
+        Create, update (partially) or soft delete several notes in a single request.
+
+        Each operation is validated and permission checked on its own, exactly like the
+        single note endpoints, and gets its own status in the response. Valid operations
+        are applied even if some of the others fail.
+        """
+
+        serializer = NoteBulkOperationSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        operations: list[dict] = serializer.validated_data
+
+        notes: dict = {
+            note.pk: note
+            for note in self.get_queryset().prefetch_related(None).filter(
+                pk__in=[operation["id"] for operation in operations if "id" in operation]
+            )
+        }
+        results: list[dict] = []
+        creates: list[NoteSerializer] = []
+        updates: list[NoteSerializer] = []
+        deletes: list[Note] = []
+        for operation in operations:
+            result, note = {"action": operation["action"]}, None
+            results.append(result)
+            if operation["action"] != NoteBulkOperationSerializer.CREATE:
+                result["id"] = str(operation["id"])
+                note = notes.get(operation["id"])
+                if note is None:
+                    result.update(status=status.HTTP_404_NOT_FOUND, errors={"detail": "Not found."})
+                    continue
+                try:
+                    self.check_object_permissions(request, note)
+                except APIException as exc:
+                    result.update(status=exc.status_code, errors={"detail": exc.detail})
+                    continue
+
+            if operation["action"] == NoteBulkOperationSerializer.DELETE:
+                result["status"] = status.HTTP_204_NO_CONTENT
+                deletes.append(note)
+                continue
+
+            note_serializer = self.get_serializer(
+                note, data=operation["data"], partial=note is not None
+            )
+            if not note_serializer.is_valid():
+                result.update(status=status.HTTP_400_BAD_REQUEST, errors=note_serializer.errors)
+                continue
+
+            result["serializer"] = note_serializer
+            if note is None:
+                result["status"] = status.HTTP_201_CREATED
+                creates.append(note_serializer)
+            else:
+                result["status"] = status.HTTP_200_OK
+                updates.append(note_serializer)
+
+        self.perform_bulk(creates, updates, deletes)
+
+        saved_notes: dict = {
+            note.pk: note
+            for note in self.get_queryset().filter(
+                pk__in=[serializer.instance.pk for serializer in creates + updates]
+            )
+        }
+        for result in results:
+            note_serializer = result.pop("serializer", None)
+            if note_serializer is not None:
+                note = saved_notes[note_serializer.instance.pk]
+                result["id"] = str(note.pk)
+                result["data"] = self.get_serializer(note).data
+        return Response(results, status=status.HTTP_207_MULTI_STATUS)
+
+    @transaction.atomic
+    def perform_bulk(
+        self,
+        creates: list[NoteSerializer],
+        updates: list[NoteSerializer],
+        deletes: list[Note],
+    ) -> None:
+        """
+        Save validated bulk operations with one `bulk_create`, one `bulk_update`, one
+        soft delete UPDATE and a single batched tag resolution for all the notes.
+        """
+
+        tags_by_note: dict[Note, list[dict]] = {}
+
+        created_notes: list[Note] = []
+        for serializer in creates:
+            data: dict = dict(serializer.validated_data)
+            data["creator"] = self.request.user
+            tags: list[dict] = data.pop("tags", [])
+            serializer.instance = Note(**data)
+            created_notes.append(serializer.instance)
+            if tags:
+                tags_by_note[serializer.instance] = tags
+        Note.objects.bulk_create(created_notes)
+
+        # `bulk_update` does not run `auto_now`, so `last_modified_at` is set explicitly
+        now = timezone.now()
+        update_fields: set[str] = {"last_modified_at"}
+        for serializer in updates:
+            data = dict(serializer.validated_data)
+            data.pop("creator", None)
+            tags: list[dict] | None = data.pop("tags", None)
+            for attr, value in data.items():
+                setattr(serializer.instance, attr, value)
+            serializer.instance.last_modified_at = now
+            update_fields.update(data)
+            if tags is not None:
+                tags_by_note[serializer.instance] = tags
+        if updates:
+            Note.objects.bulk_update(
+                [serializer.instance for serializer in updates], sorted(update_fields)
+            )
+
+        if deletes:
+            Note.objects.filter(pk__in=[note.pk for note in deletes]).soft_delete()
+
+        Note.bulk_update_note_tags(tags_by_note)
+
+
+class TagViewSet(ReplicaReadMixin, ListModelMixin, GenericViewSet):
+    """
+    API for listing the tags in use, most used first. `prefix` searches tag titles for
+    autocompletion.
+    """
+
+    serializer_class = TagNoteCountSerializer
+    pagination_class = TagPagination
+    queryset = Tag.objects.filter(note_count__gt=0).order_by("-note_count")
+    filter_backends = (DjangoFilterBackend, OrderingFilter)
+    filterset_class = TagFilter
+    ordering_fields = ["note_count", "title"]
@@ -0,0 +1,32 @@
+from django.http import HttpRequest, HttpResponse
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.request import Request
+
+from app.async_views import AsyncAPIView
+
+from .serializers import UserRegisterSerializer
+
+
+class AsyncUserRegisterView(AsyncAPIView):
+    """
+    Async counterpart of `UserRegisterView` for ASGI servers. The password is hashed in the
+    password hashing pool and the insert is awaited, so registrations never block the event
+    loop.
+    """
+
+    parser_classes = [JSONParser, FormParser, MultiPartParser]
+
+    async def post(self, request: HttpRequest) -> HttpResponse:
+        try:
+            drf_request = Request(
+                request, parsers=[parser() for parser in self.parser_classes], authenticators=[]
+            )
+            serializer = UserRegisterSerializer(data=drf_request.data)
+            serializer.is_valid(raise_exception=True)
+            serializer.instance = await serializer.acreate(serializer.validated_data)
+        except APIException as exc:
+            return self.handle_exception(exc)
+        return self.render(serializer.data, status.HTTP_201_CREATED)
@@ -0,0 +1,207 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from .models import User
+
+
+class TokenCache:
+    """
+    Cache of token key -> (user, token) lookups.
+
+    Entries are kept in a bounded LRU cache local to the process, in front of an optional
+    cache shared by all processes (`AUTH_TOKEN_CACHE_ALIAS`). Token and user changes
+    invalidate the shared cache and the local cache of the process making the change, see
+    `users/receivers.py`. The local caches of other processes only expire, so their
+    timeout bounds how long a deleted token or deactivated user can still authenticate
+    there: `AUTH_TOKEN_CACHE_TIMEOUT`, or `AUTH_TOKEN_CACHE_LOCAL_TIMEOUT` with a shared
+    cache, which is the one invalidated for every process.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries: OrderedDict[str, tuple[float, tuple[User, Token]]] = OrderedDict()
+
+    @staticmethod
+    def get_shared_cache() -> BaseCache | None:
+        alias: str | None = settings.AUTH_TOKEN_CACHE_ALIAS
+        return caches[alias] if alias else None
+
+    @classmethod
+    def get_local_timeout(cls) -> float:
+        if cls.get_shared_cache() is None:
+            return settings.AUTH_TOKEN_CACHE_TIMEOUT
+        return settings.AUTH_TOKEN_CACHE_LOCAL_TIMEOUT
+
+    @staticmethod
+    def get_shared_key(key: str) -> str:
+        # Tokens are credentials, so they are not stored as plain cache keys
+        return f"auth:token:{hashlib.sha256(key.encode()).hexdigest()}"
+
+    def get(self, key: str) -> tuple[User, Token] | None:
+        value: tuple[User, Token] | None = self.get_local(key)
+        shared_cache: BaseCache | None = self.get_shared_cache()
+        if value is None and shared_cache is not None:
+            value = shared_cache.get(self.get_shared_key(key))
+            if value is not None:
+                self.set_local(key, value)
+        return value
+
+    async def aget(self, key: str) -> tuple[User, Token] | None:
+        """Async version of `get`."""
+
+        value: tuple[User, Token] | None = self.get_local(key)
+        shared_cache: BaseCache | None = self.get_shared_cache()
+        if value is None and shared_cache is not None:
+            value = await shared_cache.aget(self.get_shared_key(key))
+            if value is not None:
+                self.set_local(key, value)
+        return value
+
+    def set(self, key: str, value: tuple[User, Token]) -> None:
+        self.set_local(key, value)
+        shared_cache: BaseCache | None = self.get_shared_cache()
+        if shared_cache is not None:
+            shared_cache.set(self.get_shared_key(key), value, settings.AUTH_TOKEN_CACHE_TIMEOUT)
+
+    async def aset(self, key: str, value: tuple[User, Token]) -> None:
+        """Async version of `set`."""
+
+        self.set_local(key, value)
+        shared_cache: BaseCache | None = self.get_shared_cache()
+        if shared_cache is not None:
+            await shared_cache.aset(
+                self.get_shared_key(key), value, settings.AUTH_TOKEN_CACHE_TIMEOUT
+            )
+
+    def get_local(self, key: str) -> tuple[User, Token] | None:
+        now: float = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at > now:
+                self.entries.move_to_end(key)
+                return value
+            del self.entries[key]
+            return None
+
+    def set_local(self, key: str, value: tuple[User, Token]) -> None:
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.get_local_timeout(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > settings.AUTH_TOKEN_CACHE_MAX_ENTRIES:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        """
+        Remove the given tokens right away and again once the current transaction commits,
+        so a lookup cached by a concurrent request before the commit is not kept.
+        """
+
+        keys: set[str] = set(keys)
+        if not keys:
+            return
+
+        def delete() -> None:
+            with self.lock:
+                for key in keys:
+                    self.entries.pop(key, None)
+            shared_cache: BaseCache | None = self.get_shared_cache()
+            if shared_cache is not None:
+                shared_cache.delete_many([self.get_shared_key(key) for key in keys])
+
+        delete()
+        transaction.on_commit(delete)
+
+    def clear(self) -> None:
+        """Clear the local cache of this process."""
+
+        with self.lock:
+            self.entries.clear()
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    `TokenAuthentication` that caches the token and user lookup, so authenticated requests
+    do not need a query to identify the user. `aauthenticate` authenticates requests of
+    async views.
+    """
+
+    def authenticate(self, request) -> tuple[User, Token] | None:
+        key: str | None = self.get_token_key(request)
+        return None if key is None else self.authenticate_credentials(key)
+
+    async def aauthenticate(self, request) -> tuple[User, Token] | None:
+        """Async version of `authenticate`."""
+
+        key: str | None = self.get_token_key(request)
+        return None if key is None else await self.aauthenticate_credentials(key)
+
+    def get_token_key(self, request) -> str | None:
+        """Return the token of the `Authorization` header, parsed like `TokenAuthentication`."""
+
+        auth: list[bytes] = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) == 1:
+            raise AuthenticationFailed(_("Invalid token header. No credentials provided."))
+        elif len(auth) > 2:
+            raise AuthenticationFailed(
+                _("Invalid token header. Token string should not contain spaces.")
+            )
+
+        try:
+            return auth[1].decode()
+        except UnicodeError:
+            raise AuthenticationFailed(
+                _("Invalid token header. Token string should not contain invalid characters.")
+            )
+
+    def authenticate_credentials(self, key: str) -> tuple[User, Token]:
+        cached: tuple[User, Token] | None = token_cache.get(key)
+        if cached is None:
+            # Inactive users and invalid tokens raise `AuthenticationFailed` and are not cached
+            cached = super().authenticate_credentials(key)
+            token_cache.set(key, cached)
+        return self.copy_credentials(cached)
+
+    async def aauthenticate_credentials(self, key: str) -> tuple[User, Token]:
+        """Async version of `authenticate_credentials`."""
+
+        cached: tuple[User, Token] | None = await token_cache.aget(key)
+        if cached is None:
+            model = self.get_model()
+            try:
+                token = await model.objects.select_related("user").aget(key=key)
+            except model.DoesNotExist:
+                raise AuthenticationFailed(_("Invalid token."))
+            if not token.user.is_active:
+                raise AuthenticationFailed(_("User inactive or deleted."))
+
+            cached = (token.user, token)
+            await token_cache.aset(key, cached)
+        return self.copy_credentials(cached)
+
+    @staticmethod
+    def copy_credentials(cached: tuple[User, Token]) -> tuple[User, Token]:
+        # Requests get their own copies, so changes to them never leak into the cache
+        user, token = cached
+        return copy.copy(user), copy.copy(token)
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+class PasswordHashingPool:
+    """
+    Bounded thread pool hashing passwords with the configured `PASSWORD_HASHERS`.
+
+    Password hashing is deliberately slow. Running it in at most
+    `PASSWORD_HASHING_MAX_WORKERS` threads caps the CPU a burst of registrations can take
+    from other requests, and async views can await a hash without blocking the event loop.
+    The hashers of `hashlib` release the GIL, so the workers hash in parallel.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.executor: ThreadPoolExecutor | None = None
+
+    def get_executor(self) -> ThreadPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASHING_MAX_WORKERS,
+                    thread_name_prefix="password-hashing",
+                )
+            return self.executor
+
+    def hash(self, password: str) -> str:
+        return self.get_executor().submit(make_password, password).result()
+
+    async def ahash(self, password: str) -> str:
+        """Async version of `hash`."""
+
+        return await asyncio.get_running_loop().run_in_executor(
+            self.get_executor(), make_password, password
+        )
+
+    def shutdown(self) -> None:
+        """Stop the workers. The next hash starts a new executor."""
+
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
+
+
+password_hashing_pool = PasswordHashingPool()
+
+
+@receiver(setting_changed)
+def reset_password_hashing_pool(*, setting: str, **kwargs) -> None:
+    if setting == "PASSWORD_HASHING_MAX_WORKERS":
+        password_hashing_pool.shutdown()
@@ -0,0 +1,83 @@
+import itertools
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from users.hashing import password_hashing_pool
+from users.models import User
+from users.serializers import UserRegisterSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Register users concurrently through UserRegisterSerializer and report the "
+        "registrations per second and per CPU core, for each password hasher. The "
+        "registered users are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--registrations", type=int, default=200, help="Registrations per hasher."
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=2 * (os.cpu_count() or 1),
+            help="Concurrent registrations, e.g. the number of server threads.",
+        )
+        parser.add_argument(
+            "--hasher",
+            action="append",
+            dest="hashers",
+            help="Password hasher to benchmark, can be repeated. Defaults to PASSWORD_HASHERS[0].",
+        )
+
+    def handle(self, *args, **options):
+        if min(options["registrations"], options["concurrency"]) < 1:
+            raise CommandError("--registrations and --concurrency must be positive.")
+
+        cores: int = os.cpu_count() or 1
+        self.stdout.write(
+            f"{cores} cores, {settings.PASSWORD_HASHING_MAX_WORKERS} hashing workers, "
+            f"{options['concurrency']} concurrent registrations"
+        )
+        for hasher in options["hashers"] or settings.PASSWORD_HASHERS[:1]:
+            with override_settings(PASSWORD_HASHERS=[hasher]):
+                elapsed: float = self.measure(options["registrations"], options["concurrency"])
+            per_second: float = options["registrations"] / elapsed
+            self.stdout.write(
+                f"  {hasher.rsplit('.', 1)[-1]:<28} {per_second:8.1f} registrations/s  "
+                f"{per_second / cores:7.1f} registrations/s/core"
+            )
+
+    @staticmethod
+    def measure(registrations: int, concurrency: int) -> float:
+        """Register the users from `concurrency` threads and return the elapsed seconds."""
+
+        prefix: str = f"benchmark-{uuid.uuid4().hex[:8]}-"
+        counter = itertools.count()
+        # Hash once beforehand, so starting the hashing workers is not measured
+        password_hashing_pool.hash("password")
+
+        def register(_) -> None:
+            password: str = uuid.uuid4().hex
+            serializer = UserRegisterSerializer(data={
+                "username": f"{prefix}{next(counter)}",
+                "password": password,
+                "password2": password,
+            })
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+
+        try:
+            start: float = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                list(executor.map(register, range(registrations)))
+            return time.perf_counter() - start
+        finally:
+            User.objects.filter(username__startswith=prefix).delete()
@@ -0,0 +1,71 @@
+import statistics
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from notes.cache import get_cache
+from notes.tests.factories import NoteFactory
+from notes.views import NoteViewSet
+from users.authentication import CachedTokenAuthentication, token_cache
+from users.tests.factories import UserFactory
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the queries and latency of GET /notes/ with TokenAuthentication and "
+        "CachedTokenAuthentication, with and without a cached list response. Test data "
+        "is created in a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--notes", type=int, default=20, help="Notes of the user.")
+        parser.add_argument("--repeat", type=int, default=200, help="Requests per run.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=["testserver"]):
+            user = UserFactory()
+            NoteFactory.create_batch(options["notes"], creator=user)
+            client = Client(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}")
+            self.run(client, options["repeat"])
+            transaction.set_rollback(True)
+
+    def run(self, client: Client, repeat: int) -> None:
+        for list_cached in (False, True):
+            self.stdout.write(f"List response cached: {list_cached}")
+            for authentication_class in (TokenAuthentication, CachedTokenAuthentication):
+                token_cache.clear()
+                with mock.patch.object(
+                    NoteViewSet, "authentication_classes", [authentication_class]
+                ):
+                    queries, timings = self.measure(client, repeat, list_cached)
+                self.stdout.write(
+                    f"  {authentication_class.__name__:<27} {queries:5.2f} queries/request  "
+                    f"median {statistics.median(timings) * 1000:7.3f} ms  "
+                    f"min {min(timings) * 1000:7.3f} ms"
+                )
+
+    @staticmethod
+    def measure(
+        client: Client, repeat: int, list_cached: bool
+    ) -> tuple[float, list[float]]:
+        """Return the mean queries per request and the request timings."""
+
+        url: str = reverse("notes:notes-list")
+        client.get(url)
+        timings: list[float] = []
+        with CaptureQueriesContext(connection) as context:
+            for _ in range(repeat):
+                if not list_cached:
+                    get_cache().clear()
+                start = time.perf_counter()
+                client.get(url)
+                timings.append(time.perf_counter() - start)
+        return len(context.captured_queries) / repeat, timings
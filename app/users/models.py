@@ -6,3 +6,11 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.username
+
+    @classmethod
+    def from_db(cls, db, field_names, values) -> "User":
+        """Remember the loaded username, so renames can be detected on save."""
+
+        instance: User = super().from_db(db, field_names, values)
+        instance._loaded_username = instance.__dict__.get("username")
+        return instance
@@ -0,0 +1,25 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+from .models import User
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_token_cache(sender, instance: Token, created: bool = False, **kwargs) -> None:
+    # Rotating a token deletes the old key, a new token cannot be cached yet
+    if not created:
+        token_cache.invalidate([instance.key])
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_token_cache(sender, instance: User, created: bool, **kwargs) -> None:
+    """Cached users must not outlive a change, most importantly a deactivation."""
+
+    if not created:
+        token_cache.invalidate(
+            Token.objects.filter(user_id=instance.pk).values_list("key", flat=True)
+        )
@@ -1,16 +1,19 @@
 from django.contrib.auth.password_validation import validate_password
+from django.db import IntegrityError, transaction
 
+from asgiref.sync import sync_to_async
 from rest_framework import serializers
-from rest_framework.validators import UniqueValidator
 
+from app.metrics import TimedSerializerMixin
+
+from .hashing import password_hashing_pool
 from .models import User
 
 
-class UserRegisterSerializer(serializers.ModelSerializer):
-    username = serializers.CharField(
-        required=True,
-        validators=[UniqueValidator(queryset=User.objects.all())]
-    )
+class UserRegisterSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    # Declared without the `UniqueValidator` of the model field, duplicates are caught by
+    # the unique constraint on insert instead of an extra query beforehand
+    username = serializers.CharField(required=True)
 
     password = serializers.CharField(
         write_only=True, required=True, validators=[validate_password]
@@ -32,9 +35,28 @@ class UserRegisterSerializer(serializers.ModelSerializer):
         return attrs
 
     def create(self, validated_data) -> User:
-        """Register a new user."""
+        """Register a new user, hashing the password in the password hashing pool."""
 
-        return User.objects.create_user(
-            username=validated_data["username"],
-            password=validated_data["password"]
+        return self.insert_user(
+            validated_data["username"], password_hashing_pool.hash(validated_data["password"])
         )
+
+    async def acreate(self, validated_data) -> User:
+        """Async version of `create`."""
+
+        password: str = await password_hashing_pool.ahash(validated_data["password"])
+        return await sync_to_async(self.insert_user)(validated_data["username"], password)
+
+    @staticmethod
+    def insert_user(username: str, password: str) -> User:
+        """Insert the user with an already hashed password, like `create_user` does."""
+
+        try:
+            with transaction.atomic():
+                return User.objects.create(
+                    username=User.normalize_username(username), password=password
+                )
+        except IntegrityError:
+            if User.objects.filter(username=User.normalize_username(username)).exists():
+                raise serializers.ValidationError({"username": ["This field must be unique."]})
+            raise
@@ -1,17 +1,20 @@
+from django.test import Client
 from django.urls import reverse
 
+from asgiref.sync import async_to_sync
 from faker import Faker
 from rest_framework import status
-from rest_framework.test import APIClient, APITestCase
+from rest_framework.test import APITestCase
 
+from app.tests.queries import QueryBudgetAPIClient, QueryBudgetMixin
 from users.models import User
 
 from .factories import UserFactory
 
 
-class UserRegisterApiTestCase(APITestCase):
+class UserRegisterApiTestCase(QueryBudgetMixin, APITestCase):
     def setUp(self):
-        self.client = APIClient()
+        self.client = QueryBudgetAPIClient()
         self.faker = Faker()
 
     def test_register_new_user(self):
@@ -48,3 +51,68 @@ class UserRegisterApiTestCase(APITestCase):
         response = response.json()
         self.assertIn("username", response)
         self.assertEqual(response["username"][0], "This field must be unique.")
+
+    def test_register_queries(self):
+        # The username is not checked before the insert
+        password = self.faker.password()
+        response = self.client.post(
+            reverse("users:register"),
+            {"username": "foobar", "password": password, "password2": password},
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json(), {"username": "foobar"})
+        # Savepoint, insert, release
+        self.assertEqual(response.queries, 3)
+
+    def test_async_register(self):
+        UserFactory(username="foobar")
+        password = self.faker.password()
+        request_body = {"username": "foobar", "password": password, "password2": password}
+        response = self.async_post(reverse("users:async-register"), request_body)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {"username": ["This field must be unique."]})
+
+        request_body["password2"] = "something"
+        response = self.async_post(reverse("users:async-register"), request_body)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {"password": ["Password fields do not match."]})
+
+        request_body.update(username="barfoo", password2=password)
+        response = self.async_post(reverse("users:async-register"), request_body)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json(), {"username": "barfoo"})
+        self.assertTrue(User.objects.get(username="barfoo").check_password(password))
+
+    @async_to_sync
+    async def async_post(self, *args, **kwargs):
+        return await self.async_client.post(*args, **kwargs, content_type="application/json")
+
+    def test_async_register_without_csrf_token(self):
+        password = self.faker.password()
+        response = Client(enforce_csrf_checks=True).post(
+            reverse("users:async-register"),
+            {"username": "foobar", "password": password, "password2": password},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_obtain_token(self):
+        usernames = iter(range(3))
+
+        def request(size):
+            user = UserFactory(username=f"user {next(usernames)}")
+            user.set_password("password")
+            user.save()
+            return self.client.post(
+                reverse("users:token"), {"username": user.username, "password": "password"}
+            )
+
+        # Each request creates the token of a new user
+        self.assertConstantQueries(request, (1, 2))
+        response = self.client.post(
+            reverse("users:token"), {"username": "user 1", "password": "password"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json()["token"], User.objects.get(username="user 1").auth_token.key
+        )
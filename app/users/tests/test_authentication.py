@@ -0,0 +1,96 @@
+from django.core.cache import caches
+from django.test import override_settings
+from django.utils import timezone
+
+from freezegun import freeze_time
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient, APITestCase
+
+from notes.cache import get_cache
+from users.authentication import token_cache
+
+from .factories import UserFactory
+
+
+class CachedTokenAuthenticationTestCase(APITestCase):
+    def setUp(self):
+        get_cache().clear()
+        token_cache.clear()
+        self.user = UserFactory()
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(**{"HTTP_AUTHORIZATION": f"Token {self.token.key}"})
+        self.url = reverse("notes:tags-list")
+
+    def assertAuthenticated(self, queries, authenticated=True):
+        # The tags list is a single query, anything else is the token lookup
+        with self.assertNumQueries(queries + 1 if authenticated else queries):
+            response = self.client.get(self.url)
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_200_OK if authenticated else status.HTTP_401_UNAUTHORIZED,
+        )
+
+    def test_token_lookup_is_cached(self):
+        self.assertAuthenticated(queries=1)
+        self.assertAuthenticated(queries=0)
+
+        # Invalid tokens are never cached
+        self.client.credentials(**{"HTTP_AUTHORIZATION": "Token invalid"})
+        self.assertAuthenticated(queries=1, authenticated=False)
+        self.assertAuthenticated(queries=1, authenticated=False)
+
+    def test_cache_expires(self):
+        self.assertAuthenticated(queries=1)
+        with freeze_time(timezone.now() + timezone.timedelta(seconds=61)):
+            self.assertAuthenticated(queries=1)
+
+    @override_settings(AUTH_TOKEN_CACHE_MAX_ENTRIES=1)
+    def test_cache_is_bounded(self):
+        self.assertAuthenticated(queries=1)
+
+        other_token = Token.objects.create(user=UserFactory())
+        self.client.credentials(**{"HTTP_AUTHORIZATION": f"Token {other_token.key}"})
+        self.assertAuthenticated(queries=1)
+
+        # The least recently used token was evicted
+        self.client.credentials(**{"HTTP_AUTHORIZATION": f"Token {self.token.key}"})
+        self.assertAuthenticated(queries=1)
+
+    def test_token_deletion_invalidates_cache(self):
+        self.assertAuthenticated(queries=1)
+        self.token.delete()
+        self.assertAuthenticated(queries=1, authenticated=False)
+
+    def test_user_deactivation_invalidates_cache(self):
+        self.assertAuthenticated(queries=1)
+        self.user.is_active = False
+        self.user.save()
+        self.assertAuthenticated(queries=1, authenticated=False)
+
+    @override_settings(AUTH_TOKEN_CACHE_ALIAS="default")
+    def test_shared_cache(self):
+        self.assertAuthenticated(queries=1)
+
+        # Another process only has the shared cache
+        token_cache.clear()
+        self.assertAuthenticated(queries=0)
+
+        # Deleting the token removes it from the shared cache as well
+        self.token.delete()
+        token_cache.clear()
+        self.assertAuthenticated(queries=1, authenticated=False)
+
+    @override_settings(AUTH_TOKEN_CACHE_ALIAS="default")
+    def test_shared_cache_local_timeout(self):
+        with freeze_time(timezone.now()) as frozen_time:
+            self.assertAuthenticated(queries=1)
+
+            # Another process deleting the token only invalidates the shared cache and its
+            # own local cache, the local entry of this process expires within a second
+            caches["default"].clear()
+            self.assertIsNotNone(token_cache.get(self.token.key))
+            frozen_time.tick(2)
+            self.assertIsNone(token_cache.get(self.token.key))
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, identify_hasher
+from django.test import SimpleTestCase, override_settings
+
+from asgiref.sync import async_to_sync
+
+from users.hashing import password_hashing_pool
+
+
+class PasswordHashingPoolTestCase(SimpleTestCase):
+    def test_hash(self):
+        self.assertTrue(check_password("password", password_hashing_pool.hash("password")))
+
+    def test_ahash(self):
+        encoded = async_to_sync(password_hashing_pool.ahash)("password")
+        self.assertTrue(check_password("password", encoded))
+
+    @override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.ScryptPasswordHasher"])
+    def test_configured_hasher(self):
+        encoded = password_hashing_pool.hash("password")
+        self.assertEqual(identify_hasher(encoded).algorithm, "scrypt")
+
+    def test_max_workers(self):
+        # Changing the setting restarts the pool with the new number of workers
+        with override_settings(PASSWORD_HASHING_MAX_WORKERS=3):
+            self.assertEqual(password_hashing_pool.get_executor()._max_workers, 3)
+        self.assertEqual(
+            password_hashing_pool.get_executor()._max_workers,
+            settings.PASSWORD_HASHING_MAX_WORKERS,
+        )
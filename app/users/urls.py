@@ -2,6 +2,7 @@ from django.urls import path
 
 from rest_framework.authtoken import views
 
+from .async_views import AsyncUserRegisterView
 from .views import UserRegisterView
 
 app_name = "users"
@@ -9,5 +10,6 @@ app_name = "users"
 
 urlpatterns = [
     path("register/", UserRegisterView.as_view(), name="register"),
+    path("async/register/", AsyncUserRegisterView.as_view(), name="async-register"),
     path("token/", views.obtain_auth_token, name="token"),
 ]